@@ -0,0 +1,518 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('benchmark')
+# One log line per request would distort the client-side timings
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+SCENARIOS = ("search", "icon", "collections", "figma", "mcp", "mcp_batch")
+
+# File key served by the fake Figma API
+BENCH_FILE_KEY = "benchfile"
+
+class Fixtures:
+    """
+    Responses served by the fake Iconify and Figma APIs
+
+    Synthetic data is generated deterministically from the sizes given, so
+    runs are comparable. Recorded responses (see load_recorded) take
+    precedence over the synthetic ones.
+
+    Args:
+        collections: Number of icon collections
+        icons_per_collection: Icons in each collection
+        body_bytes: Approximate size of each icon body
+        figma_nodes: Distinct Figma node ids that can be requested
+        figma_children: Children per Figma node (two levels deep)
+    """
+
+    def __init__(self, collections=20, icons_per_collection=200, body_bytes=400, figma_nodes=50, figma_children=20):
+        self.prefixes = [f"set{number}" for number in range(collections)]
+        self.icon_names = [f"icon-{number}" for number in range(icons_per_collection)]
+        self.body_bytes = body_bytes
+        self.figma_nodes = figma_nodes
+        self.figma_children = figma_children
+        self.recorded = {}
+
+    def load_recorded(self, path):
+        """
+        Load recorded responses
+
+        The file maps request paths to {"status": ..., "body": ...}. A path
+        with a query string only matches that exact request; a path without
+        one matches any query.
+
+        Args:
+            path: JSON file of recorded responses
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            self.recorded.update(json.load(f))
+        logger.info(f"Loaded {len(self.recorded)} recorded responses from {path}")
+
+    def all_icons(self):
+        return [f"{prefix}:{name}" for prefix in self.prefixes for name in self.icon_names]
+
+    def icon_body(self, full_name):
+        # Repeat a path until the body reaches the configured size
+        seed = int(hashlib.md5(full_name.encode("utf-8")).hexdigest()[:6], 16)
+        path = f'<path fill="currentColor" d="M{seed % 24} {seed % 17}h{seed % 9}v{seed % 7}z"/>'
+        return path * max(1, self.body_bytes // len(path))
+
+    def search(self, query, limit):
+        icons = self.all_icons()
+        start = int(hashlib.md5(query.encode("utf-8")).hexdigest()[:8], 16) % len(icons)
+        return {"icons": [icons[(start + offset) % len(icons)] for offset in range(limit)], "total": limit}
+
+    def collection(self, prefix, names):
+        return {
+            "prefix": prefix,
+            "icons": {name: {"body": self.icon_body(f"{prefix}:{name}")} for name in names if name in self.icon_names},
+            "width": 24,
+            "height": 24
+        }
+
+    def collections_catalog(self):
+        return {
+            prefix: {"name": f"Benchmark Set {prefix}", "total": len(self.icon_names), "category": "Benchmark"}
+            for prefix in self.prefixes
+        }
+
+    def figma_node(self, node_id):
+        children = []
+        for number in range(self.figma_children):
+            grandchildren = [
+                {"id": f"{node_id}:{number}:{leaf}", "type": "TEXT", "name": f"Label {leaf}", "characters": f"Text {leaf}",
+                 "style": {"fontSize": 14, "fontWeight": 400}, "fills": [{"type": "SOLID", "color": {"r": 0.1, "g": 0.2, "b": 0.3, "a": 1}}]}
+                for leaf in range(3)
+            ]
+            children.append({
+                "id": f"{node_id}:{number}", "type": "FRAME", "name": f"Row {number}",
+                "absoluteBoundingBox": {"x": 0, "y": number * 40, "width": 320, "height": 40},
+                "fills": [{"type": "SOLID", "color": {"r": 1, "g": 1, "b": 1, "a": 1}}],
+                "cornerRadius": 4, "paddingLeft": 8, "paddingRight": 8, "layoutMode": "HORIZONTAL", "itemSpacing": 4,
+                "children": grandchildren
+            })
+        return {
+            "id": node_id, "type": "COMPONENT", "name": f"Component {node_id.replace(':', ' ')}",
+            "absoluteBoundingBox": {"x": 0, "y": 0, "width": 320, "height": 40 * self.figma_children},
+            "children": children
+        }
+
+    def respond(self, path, query):
+        """
+        Build the response for a request
+
+        Returns:
+            (status, JSON-serializable body or raw bytes)
+        """
+        full_path = f"{path}?{query}" if query else path
+        for key in (full_path, path):
+            if key in self.recorded:
+                recorded = self.recorded[key]
+                return recorded.get("status", 200), recorded.get("body")
+
+        params = parse_qs(query)
+
+        # Figma API
+        if path.startswith("/v1/files/"):
+            parts = path[len("/v1/files/"):].split("/")
+            if len(parts) == 2 and parts[1] == "nodes":
+                ids = params.get("ids", [""])[0].split(",")
+                return 200, {"nodes": {node_id: {"document": self.figma_node(node_id)} for node_id in ids if node_id}}
+            if len(parts) == 2 and parts[1] == "versions":
+                return 200, {"versions": [{"id": "1", "created_at": "2024-01-01T00:00:00Z", "label": "Benchmark"}]}
+            if params.get("depth"):
+                return 200, {"name": "Benchmark", "version": "1", "lastModified": "2024-01-01T00:00:00Z"}
+            nodes = [self.figma_node(f"1:{number}") for number in range(self.figma_nodes)]
+            return 200, {"version": "1", "document": {"id": "0:0", "type": "DOCUMENT", "children": [
+                {"id": "0:1", "type": "CANVAS", "name": "Page", "children": nodes}
+            ]}}
+
+        # Iconify API
+        if path == "/search":
+            return 200, self.search(params.get("query", [""])[0], int(params.get("limit", ["20"])[0]))
+        if path == "/collections":
+            return 200, self.collections_catalog()
+        if path.startswith("/icon/"):
+            full_name = path[len("/icon/"):]
+            return 200, {"body": self.icon_body(full_name), "width": 24, "height": 24}
+        if path.endswith(".json"):
+            prefix = path[1:-len(".json")]
+            return 200, self.collection(prefix, params.get("icons", [""])[0].split(","))
+        if path.endswith(".svg"):
+            full_name = path[1:-len(".svg")]
+            body = self.icon_body(full_name)
+            return 200, f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">{body}</svg>'.encode("utf-8")
+
+        return 404, {"error": "Not found"}
+
+def start_fake_upstream(fixtures, latency=0.0, port=0):
+    """
+    Start the fake Iconify and Figma APIs in a background thread
+
+    Iconify endpoints are served at the root and Figma endpoints under /v1,
+    so both base URLs point at the same server.
+
+    Args:
+        fixtures: Fixtures instance
+        latency: Seconds to wait before answering each request
+        port: Port to listen on (0 picks a free one)
+
+    Returns:
+        (server, base URL)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            url = urlparse(self.path)
+            status, body = fixtures.respond(url.path, url.query)
+            if isinstance(body, bytes):
+                content_type = "image/svg+xml"
+            else:
+                body = json.dumps(body).encode("utf-8")
+                content_type = "application/json"
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def free_port():
+    with ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler) as server:
+        return server.server_address[1]
+
+def start_app(upstream_base, port, work_dir):
+    """
+    Run the service under test in a subprocess pointed at the fake APIs
+
+    Caches are kept in a temporary directory so every run starts cold.
+
+    Returns:
+        subprocess.Popen
+    """
+    env = dict(os.environ)
+    env.update({
+        "ICONIFY_API_BASE": upstream_base,
+        "FIGMA_API_BASE": f"{upstream_base}/v1",
+        "FIGMA_API_KEY": "benchmark",
+        "ICON_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "FIGMA_CODE_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "FIGMA_SYNC_DB": os.path.join(work_dir, "cache", "figma_sync.sqlite3"),
+        "FIGMA_JOBS_DB": os.path.join(work_dir, "cache", "figma_jobs.sqlite3")
+    })
+    # Measure the service, not the Figma rate limit, unless one is set explicitly
+    env.setdefault("FIGMA_RATE_LIMIT", "0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise Exception(f"Service exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/cache-stats", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise Exception(f"Service did not start within {timeout}s")
+
+def peak_rss_mb(pid):
+    """Peak resident set size of a running process in MB, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def scenario_request(scenario, number, fixtures, rng):
+    """
+    Build the request for one iteration of a scenario
+
+    Returns:
+        (method, path, JSON body or None)
+    """
+    icons = fixtures.all_icons()
+    if scenario == "search":
+        return "GET", f"/search-icons?query=query{rng.randrange(100)}&limit=10", None
+    if scenario == "icon":
+        return "GET", f"/icon/{icons[rng.randrange(len(icons))]}", None
+    if scenario == "collections":
+        return "GET", "/collections", None
+    if scenario == "figma":
+        return "POST", "/figma-to-react", {"file_key": BENCH_FILE_KEY, "node_id": f"1:{rng.randrange(fixtures.figma_nodes)}"}
+    if scenario == "mcp":
+        if number % 2:
+            params = {"file_key": BENCH_FILE_KEY, "node_id": f"1:{rng.randrange(fixtures.figma_nodes)}"}
+            return "POST", "/mcp", {"function": "figma_to_react", "params": params}
+        return "POST", "/mcp", {"function": "search_icons", "params": {"query": f"query{rng.randrange(100)}", "limit": 10}}
+    if scenario == "mcp_batch":
+        # What an agent needs for one screen: a batch of icons plus a conversion
+        calls = [{"function": "get_icon", "params": {"icon_name": icons[rng.randrange(len(icons))]}} for _ in range(10)]
+        calls.append({"function": "figma_to_react", "params": {"file_key": BENCH_FILE_KEY, "node_id": f"1:{rng.randrange(fixtures.figma_nodes)}"}})
+        return "POST", "/mcp", calls
+    raise Exception(f"Unknown scenario: {scenario}")
+
+def is_error(data):
+    """Check a JSON response (plain, /mcp or batched /mcp) for errors"""
+    if isinstance(data, list):
+        return any(is_error(item) for item in data)
+    if not isinstance(data, dict):
+        return False
+    if "result" in data or "error" in data:
+        return bool(data.get("error")) or is_error(data.get("result"))
+    return data.get("status") == "error"
+
+def response_failed(response):
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        return is_error(response.json())
+    return False
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+async def run_scenario(base_url, scenario, fixtures, requests, concurrency, warmup, seed):
+    """
+    Drive one scenario under concurrent load
+
+    Returns:
+        Dictionary of request count, errors, requests per second and
+        latency percentiles in milliseconds
+    """
+    rng = random.Random(seed)
+    plan = [scenario_request(scenario, number, fixtures, rng) for number in range(warmup + requests)]
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def send(method, path, body):
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            return time.perf_counter() - start, response_failed(response)
+
+        for method, path, body in plan[:warmup]:
+            await send(method, path, body)
+
+        queue = iter(plan[warmup:])
+
+        async def worker():
+            nonlocal errors
+            for method, path, body in queue:
+                try:
+                    elapsed, failed = await send(method, path, body)
+                except httpx.HTTPError:
+                    elapsed, failed = 0.0, True
+                latencies.append(elapsed)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "rps": round(len(latencies) / duration, 1) if duration else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(args):
+    fixtures = Fixtures(args.collections, args.icons, args.body_bytes, args.figma_nodes, args.figma_children)
+    if args.fixtures:
+        fixtures.load_recorded(args.fixtures)
+
+    upstream, upstream_base = start_fake_upstream(fixtures, args.latency_ms / 1000)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = start_app(upstream_base, port, work_dir)
+        try:
+            wait_until_ready(base_url, process)
+            results = {}
+            for scenario in args.scenarios:
+                logger.info(f"Running {scenario}: {args.requests} requests at concurrency {args.concurrency}")
+                results[scenario] = asyncio.run(run_scenario(
+                    base_url, scenario, fixtures, args.requests, args.concurrency, args.warmup, args.seed
+                ))
+                results[scenario]["rss_mb"] = peak_rss_mb(process.pid)
+                logger.info(f"{scenario}: {json.dumps(results[scenario])}")
+            peak = peak_rss_mb(process.pid)
+        finally:
+            process.terminate()
+            process.wait()
+            upstream.shutdown()
+
+    if peak is None:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak = maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "latency_ms": args.latency_ms,
+            "collections": args.collections,
+            "icons": args.icons,
+            "body_bytes": args.body_bytes,
+            "figma_nodes": args.figma_nodes,
+            "figma_children": args.figma_children,
+            "fixtures": args.fixtures,
+            "seed": args.seed
+        },
+        "peak_rss_mb": round(peak, 1),
+        "scenarios": results
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return report
+
+def compare_reports(base_path, new_path):
+    """
+    Print per-scenario changes between two result files
+
+    Returns:
+        List of (scenario, metric, base, new, percent change)
+    """
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows = []
+    for scenario, new_result in new["scenarios"].items():
+        base_result = base["scenarios"].get(scenario)
+        if base_result is None:
+            continue
+        for metric in ("rps", "p50_ms", "p99_ms"):
+            before, after = base_result[metric], new_result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append((scenario, metric, before, after, change))
+    rows.append(("all", "peak_rss_mb", base["peak_rss_mb"], new["peak_rss_mb"],
+                 (new["peak_rss_mb"] - base["peak_rss_mb"]) / base["peak_rss_mb"] * 100 if base["peak_rss_mb"] else 0.0))
+
+    print(f"{base.get('commit') or base_path} -> {new.get('commit') or new_path}")
+    for scenario, metric, before, after, change in rows:
+        print(f"{scenario:12} {metric:12} {before:>10} {after:>10} {change:+7.1f}%")
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the service against local fake Iconify and Figma APIs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark and save results as JSON")
+    run_parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    run_parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    run_parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario")
+    run_parser.add_argument("--latency-ms", type=float, default=20, help="Fake upstream latency per request")
+    run_parser.add_argument("--collections", type=int, default=20, help="Fake icon collections")
+    run_parser.add_argument("--icons", type=int, default=200, help="Icons per fake collection")
+    run_parser.add_argument("--body-bytes", type=int, default=400, help="Approximate icon body size")
+    run_parser.add_argument("--figma-nodes", type=int, default=50, help="Distinct Figma nodes requested")
+    run_parser.add_argument("--figma-children", type=int, default=20, help="Children per Figma node")
+    run_parser.add_argument("--fixtures", help="JSON file of recorded upstream responses to replay")
+    run_parser.add_argument("--seed", type=int, default=1, help="Seed for the request mix")
+    run_parser.add_argument("--output", default="benchmark-results.json", help="Results file")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("base", help="Results from the baseline commit")
+    compare_parser.add_argument("new", help="Results from the commit under test")
+
+    serve_parser = subparsers.add_parser("serve-fakes", help="Only run the fake Iconify and Figma APIs")
+    serve_parser.add_argument("--port", type=int, default=8900)
+    serve_parser.add_argument("--latency-ms", type=float, default=20)
+    serve_parser.add_argument("--fixtures", help="JSON file of recorded upstream responses to replay")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run_benchmark(args)
+        return 0
+
+    if args.command == "compare":
+        compare_reports(args.base, args.new)
+        return 0
+
+    fixtures = Fixtures()
+    if args.fixtures:
+        fixtures.load_recorded(args.fixtures)
+    server, base = start_fake_upstream(fixtures, args.latency_ms / 1000, args.port)
+    print(f"ICONIFY_API_BASE={base}")
+    print(f"FIGMA_API_BASE={base}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,449 @@
+import os
+import asyncio
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('cache')
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with optional TTL
+
+    Args:
+        max_entries: Maximum number of entries kept
+        ttl: Seconds an entry stays valid (None for no expiry)
+    """
+
+    def __init__(self, max_entries=1000, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+class DiskCache:
+    """
+    Persistent key/value cache stored in a SQLite file
+
+    Values are JSON-encoded. Entries expire after the TTL and the least
+    recently used ones are evicted once max_entries or max_bytes is exceeded.
+
+    Entry count and total size are tracked in memory (and re-read from the
+    file periodically, since other processes may share it), so writes only
+    touch the table when the cache is over budget; it is then trimmed to 90%
+    of the budget in one go. Access times of hits are written in batches.
+
+    Args:
+        path: SQLite database file
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of stored values (None for no limit)
+        ttl: Seconds an entry stays valid (None for no expiry)
+    """
+
+    # Share of the budget kept after an eviction
+    EVICT_TO = 0.9
+    # Pending access times are written once this many hits accumulate, or after this many seconds
+    TOUCH_BATCH_SIZE = 256
+    TOUCH_FLUSH_INTERVAL = 5.0
+    # Seconds between re-reading the totals and between purges of expired entries
+    TOTALS_SYNC_INTERVAL = 60.0
+    EXPIRE_INTERVAL = 60.0
+
+    def __init__(self, path, max_entries=100000, max_bytes=None, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._touched_at = time.time()
+        self._expired_at = time.time()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+        self._conn.commit()
+        self._sync_totals()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get(key, time.time())
+            self._flush_touched_if_due()
+        return default if value is None else value
+
+    def get_many(self, keys):
+        """
+        Look up several keys with one query
+
+        Returns:
+            Dictionary of the keys that were found to their values
+        """
+        keys = list(dict.fromkeys(keys))
+        results = {}
+        with self._lock:
+            now = time.time()
+            rows = []
+            # Stay below SQLite's limit on query parameters
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows += self._conn.execute(
+                    f"SELECT key, value, stored_at FROM cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            expired = []
+            for key, value, stored_at in rows:
+                if self.ttl is not None and now - stored_at > self.ttl:
+                    expired.append(key)
+                    continue
+                self._touched[key] = now
+                results[key] = json.loads(value)
+            if expired:
+                self._delete_keys(expired)
+                self._conn.commit()
+            self.hits += len(results)
+            self.misses += len(keys) - len(results)
+            self._flush_touched_if_due()
+        return results
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        """Store several (key, value) pairs in one transaction"""
+        now = time.time()
+        rows = []
+        # Last value wins when a key repeats
+        for key, value in dict(items).items():
+            encoded = json.dumps(value)
+            rows.append((key, encoded, len(encoded), now, now))
+        if not rows:
+            return
+        with self._lock:
+            for key, _, size, _, _ in rows:
+                previous = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                if previous is None:
+                    self._count += 1
+                    self._bytes += size
+                else:
+                    self._bytes += size - previous[0]
+                self._touched.pop(key, None)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            if self.ttl is not None and now - self._expired_at > self.EXPIRE_INTERVAL:
+                self._expire(now)
+            if now - self._synced_at > self.TOTALS_SYNC_INTERVAL:
+                self._sync_totals()
+            if self._over_budget(1.0):
+                self._evict()
+            self._conn.commit()
+
+    def _get(self, key, now):
+        row = self._conn.execute(
+            "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        value, stored_at = row
+        if self.ttl is not None and now - stored_at > self.ttl:
+            self._delete_keys([key])
+            self._conn.commit()
+            self.misses += 1
+            return None
+
+        self._touched[key] = now
+        self.hits += 1
+        return json.loads(value)
+
+    def _flush_touched_if_due(self):
+        if len(self._touched) >= self.TOUCH_BATCH_SIZE or time.time() - self._touched_at > self.TOUCH_FLUSH_INTERVAL:
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched = {}
+        self._touched_at = time.time()
+
+    def _sync_totals(self):
+        self._count, self._bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        self._synced_at = time.time()
+
+    def _over_budget(self, share):
+        if self._count > self.max_entries * share:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes * share and self._count > 1
+
+    def _delete_keys(self, keys):
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            count, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE key IN ({placeholders})", chunk
+            ).fetchone()
+            self._conn.execute(f"DELETE FROM cache WHERE key IN ({placeholders})", chunk)
+            self._count -= count
+            self._bytes -= size
+        for key in keys:
+            self._touched.pop(key, None)
+
+    def _expire(self, now):
+        cutoff = now - self.ttl
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE stored_at < ?", (cutoff,)
+        ).fetchone()
+        if count:
+            self._conn.execute("DELETE FROM cache WHERE stored_at < ?", (cutoff,))
+            self._count -= count
+            self._bytes -= size
+        self._expired_at = now
+
+    def _evict(self):
+        # Recent hits must count before choosing what to drop
+        self._flush_touched()
+        self._sync_totals()
+        while self._over_budget(self.EVICT_TO):
+            # Drop exactly the excess entries, or the least recently used tenth at a time when over the size limit
+            excess = self._count - int(self.max_entries * self.EVICT_TO)
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at LIMIT ?", (excess if excess > 0 else max(1, self._count // 10),)
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key, _ in rows])
+            self._count -= len(rows)
+            self._bytes -= sum(size for _, size in rows)
+
+    def flush(self):
+        """Write pending access times"""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._delete_keys([key])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self._touched = {}
+            self._count = 0
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "entries": self._count,
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional persistent disk cache
+
+    Reads check memory first, then disk (promoting hits into memory).
+    Writes go to both tiers. The *_async methods do disk I/O in a worker
+    thread so a slow disk never stalls the event loop.
+
+    Args:
+        memory: LRUCache instance
+        disk: DiskCache instance or None
+    """
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        value = self._disk_get(key)
+        return default if value is None else value
+
+    def get_many(self, keys):
+        """
+        Look up several keys, reading the ones not in memory from disk with one query
+
+        Returns:
+            Dictionary of the keys that were found to their values
+        """
+        results, missing = self._memory_get_many(keys)
+        if missing:
+            results.update(self._disk_get_many(missing))
+        return results
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        self._disk_set_many([(key, value)])
+
+    def set_many(self, items):
+        """Store several (key, value) pairs, writing them to disk in one transaction"""
+        items = list(items)
+        for key, value in items:
+            self.memory.set(key, value)
+        self._disk_set_many(items)
+
+    async def get_async(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        return default if value is None else value
+
+    async def get_many_async(self, keys):
+        results, missing = self._memory_get_many(keys)
+        if missing and self.disk is not None:
+            results.update(await asyncio.to_thread(self._disk_get_many, missing))
+        return results
+
+    async def set_async(self, key, value):
+        await self.set_many_async([(key, value)])
+
+    async def set_many_async(self, items):
+        items = list(items)
+        for key, value in items:
+            self.memory.set(key, value)
+        if items and self.disk is not None:
+            await asyncio.to_thread(self._disk_set_many, items)
+
+    def _memory_get_many(self, keys):
+        results = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                results[key] = value
+            else:
+                missing.append(key)
+        return results, missing
+
+    def _disk_get(self, key):
+        if self.disk is None:
+            return None
+        try:
+            value = self.disk.get(key)
+        except Exception as e:
+            logger.error(f"Error reading disk cache: {str(e)}")
+            return None
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def _disk_get_many(self, keys):
+        if self.disk is None:
+            return {}
+        try:
+            results = self.disk.get_many(keys)
+        except Exception as e:
+            logger.error(f"Error reading disk cache: {str(e)}")
+            return {}
+        for key, value in results.items():
+            self.memory.set(key, value)
+        return results
+
+    def _disk_set_many(self, items):
+        if self.disk is None:
+            return
+        try:
+            self.disk.set_many(items)
+        except Exception as e:
+            logger.error(f"Error writing disk cache: {str(e)}")
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
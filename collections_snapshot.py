@@ -0,0 +1,199 @@
+import os
+import json
+import gzip
+import time
+import asyncio
+import logging
+from http_clients import get_async_client
+from iconify_tools import ICONIFY_API_BASE, ICON_CACHE_DIR
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('collections_snapshot')
+
+# Seconds between background refreshes of the collections catalog
+ICON_COLLECTIONS_REFRESH = float(os.getenv("ICON_COLLECTIONS_REFRESH", "3600"))
+
+# Seconds to wait before retrying a failed refresh
+COLLECTIONS_RETRY_DELAY = 60
+
+# gzip level of the precompressed body; higher levels barely shrink JSON but cost far more CPU
+COLLECTIONS_GZIP_LEVEL = 6
+
+def encode_collections(collections):
+    """
+    Encode the /collections response body
+
+    Args:
+        collections: Parsed collections catalog
+
+    Returns:
+        Tuple of (JSON body, gzip-compressed body)
+    """
+    # Same shape as the MCPResponse returned by the other endpoints
+    body = json.dumps({"status": "success", "data": {"collections": collections}, "error": None}).encode("utf-8")
+    return body, gzip.compress(body, compresslevel=COLLECTIONS_GZIP_LEVEL, mtime=0)
+
+class CollectionsSnapshot:
+    """
+    Parsed copy of the Iconify collections catalog, kept in memory and on disk
+
+    The response body is encoded and gzip-compressed once per change, so
+    serving /collections costs no upstream request and no serialization.
+    Refreshes use the upstream ETag/Last-Modified validators, so an unchanged
+    catalog is not downloaded again.
+
+    Args:
+        path: JSON file the snapshot is persisted to, or "" to keep it in memory only
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.collections = None
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0
+        self.body = None
+        self.gzip_body = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self):
+        return self.collections is not None
+
+    def _set(self, collections, etag, last_modified, fetched_at, bodies):
+        self.collections = collections
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.body, self.gzip_body = bodies
+
+    def load(self):
+        """
+        Load the persisted snapshot, if any
+
+        Blocking (file read, parsing and compression); async callers run it
+        in a worker thread.
+
+        Returns:
+            True if a snapshot was loaded
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._set(
+                data["collections"], data.get("etag"), data.get("last_modified"), data.get("fetched_at", 0),
+                encode_collections(data["collections"])
+            )
+            logger.info(f"Loaded {len(self.collections)} icon collections from {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load collections snapshot {self.path}: {str(e)}")
+            return False
+
+    def save(self):
+        """Persist the snapshot, replacing the previous file atomically"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "collections": self.collections,
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "fetched_at": self.fetched_at
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    async def refresh(self):
+        """
+        Fetch the catalog if it changed upstream
+
+        Returns:
+            True if the snapshot was updated, False if upstream reported no change
+        """
+        async with self._lock:
+            return await self._fetch()
+
+    async def _fetch(self):
+        headers = {}
+        if self.ready:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+
+        url = f"{ICONIFY_API_BASE}/collections"
+        response = await get_async_client().get(url, headers=headers)
+
+        if response.status_code == 304 and self.ready:
+            self.fetched_at = time.time()
+            logger.info("Icon collections unchanged")
+            return False
+
+        if response.status_code != 200:
+            logger.error(f"Failed to get collections: {response.text}")
+            raise Exception(f"Failed to get collections: {response.text}")
+
+        # Parsing and compressing the catalog takes tens of milliseconds, keep it off the event loop
+        collections = await asyncio.to_thread(response.json)
+        bodies = await asyncio.to_thread(encode_collections, collections)
+        self._set(collections, response.headers.get("etag"), response.headers.get("last-modified"), time.time(), bodies)
+        logger.info(f"Retrieved {len(collections)} icon collections")
+
+        try:
+            await asyncio.to_thread(self.save)
+        except Exception as e:
+            logger.error(f"Failed to persist collections snapshot: {str(e)}")
+        return True
+
+    async def ensure(self):
+        """
+        Make sure a snapshot is available, fetching it only if there is none
+
+        Returns:
+            The snapshot itself
+        """
+        if not self.ready:
+            async with self._lock:
+                if not self.ready and not await asyncio.to_thread(self.load):
+                    await self._fetch()
+        return self
+
+    async def run(self, interval=None):
+        """
+        Refresh the snapshot forever, sleeping between attempts
+
+        Args:
+            interval: Seconds between refreshes (defaults to ICON_COLLECTIONS_REFRESH)
+        """
+        interval = interval or ICON_COLLECTIONS_REFRESH
+        # Snapshots loaded from disk wait out the rest of their interval
+        delay = max(0, self.fetched_at + interval - time.time()) if self.ready else 0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+                delay = interval
+            except Exception as e:
+                logger.error(f"Failed to refresh icon collections: {str(e)}")
+                delay = min(interval, COLLECTIONS_RETRY_DELAY)
+
+    def stats(self):
+        return {
+            "collections": len(self.collections) if self.ready else 0,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+            "bytes": len(self.body) if self.body else 0,
+            "gzip_bytes": len(self.gzip_body) if self.gzip_body else 0
+        }
+
+collections_snapshot = CollectionsSnapshot(
+    os.path.join(ICON_CACHE_DIR, "collections.json") if ICON_CACHE_DIR else ""
+)
@@ -0,0 +1,301 @@
+import re
+import io
+import json
+import logging
+from metrics import timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_codegen')
+
+# Bump whenever generated output changes, so cached code and ETags are invalidated
+GENERATOR_VERSION = "2"
+
+# Indentation stops growing past this depth so output stays linear in node count
+MAX_INDENT_DEPTH = 32
+
+PADDING_KEYS = ("paddingLeft", "paddingRight", "paddingTop", "paddingBottom")
+
+def parse_node_styles(node):
+    """Extract CSS styles from a Figma node"""
+    styles = {}
+    
+    # Extract dimensions
+    if "absoluteBoundingBox" in node:
+        bbox = node["absoluteBoundingBox"]
+        styles["width"] = f"{bbox.get('width', 'auto')}px"
+        styles["height"] = f"{bbox.get('height', 'auto')}px"
+    
+    # Extract fills (background colors)
+    if "fills" in node and node["fills"]:
+        for fill in node["fills"]:
+            if fill.get("type") == "SOLID" and fill.get("visible", True):
+                color = fill.get("color", {})
+                r = int(color.get("r", 0) * 255)
+                g = int(color.get("g", 0) * 255)
+                b = int(color.get("b", 0) * 255)
+                a = color.get("a", 1)
+                styles["backgroundColor"] = f"rgba({r}, {g}, {b}, {a})"
+                break
+    
+    # Extract border radius
+    if "cornerRadius" in node:
+        styles["borderRadius"] = f"{node['cornerRadius']}px"
+    
+    # Extract strokes (borders)
+    if "strokes" in node and node["strokes"]:
+        for stroke in node["strokes"]:
+            if stroke.get("type") == "SOLID" and stroke.get("visible", True):
+                color = stroke.get("color", {})
+                r = int(color.get("r", 0) * 255)
+                g = int(color.get("g", 0) * 255)
+                b = int(color.get("b", 0) * 255)
+                a = color.get("a", 1)
+                styles["border"] = f"{node.get('strokeWeight', 1)}px solid rgba({r}, {g}, {b}, {a})"
+                break
+    
+    # Add more style properties
+    # Extract padding
+    if "paddingLeft" in node:
+        styles["paddingLeft"] = f"{node['paddingLeft']}px"
+    if "paddingRight" in node:
+        styles["paddingRight"] = f"{node['paddingRight']}px"
+    if "paddingTop" in node:
+        styles["paddingTop"] = f"{node['paddingTop']}px"
+    if "paddingBottom" in node:
+        styles["paddingBottom"] = f"{node['paddingBottom']}px"
+    
+    # Extract opacity
+    if "opacity" in node:
+        styles["opacity"] = str(node["opacity"])
+    
+    # Extract shadows
+    if "effects" in node:
+        for effect in node["effects"]:
+            if effect.get("type") == "DROP_SHADOW" and effect.get("visible", True):
+                color = effect.get("color", {})
+                r = int(color.get("r", 0) * 255)
+                g = int(color.get("g", 0) * 255)
+                b = int(color.get("b", 0) * 255)
+                a = color.get("a", 1)
+                offset = effect.get("offset", {})
+                x = offset.get("x", 0)
+                y = offset.get("y", 0)
+                blur = effect.get("radius", 0)
+                styles["boxShadow"] = f"{x}px {y}px {blur}px rgba({r}, {g}, {b}, {a})"
+                break
+    
+    return styles
+
+def parse_node_styles_bulk(nodes):
+    """Extract CSS styles for many nodes at once, with output identical to parse_node_styles
+
+    Runs as one loop with local lookups and formats each distinct color and
+    pixel value once per batch, since a design file reuses a small palette
+    and a handful of sizes across thousands of nodes.
+    """
+    colors = {}
+    pixels = {}
+
+    def rgba(color):
+        r = color.get("r", 0)
+        g = color.get("g", 0)
+        b = color.get("b", 0)
+        a = color.get("a", 1)
+        # Alpha is printed as-is, so 1, 1.0 and True (and 0.0 and -0.0) must not share an entry
+        try:
+            key = (r, g, b, a.__class__, a if a else str(a))
+            formatted = colors.get(key)
+        except TypeError:
+            return f"rgba({int(r * 255)}, {int(g * 255)}, {int(b * 255)}, {a})"
+        if formatted is None:
+            formatted = colors[key] = f"rgba({int(r * 255)}, {int(g * 255)}, {int(b * 255)}, {a})"
+        return formatted
+
+    def px(value):
+        try:
+            key = (value.__class__, value if value else str(value))
+            formatted = pixels.get(key)
+        except TypeError:
+            return f"{value}px"
+        if formatted is None:
+            formatted = pixels[key] = f"{value}px"
+        return formatted
+
+    results = []
+    append = results.append
+    for node in nodes:
+        styles = {}
+
+        if "absoluteBoundingBox" in node:
+            bbox = node["absoluteBoundingBox"]
+            styles["width"] = px(bbox.get("width", "auto"))
+            styles["height"] = px(bbox.get("height", "auto"))
+
+        fills = node.get("fills")
+        if fills:
+            for fill in fills:
+                if fill.get("type") == "SOLID" and fill.get("visible", True):
+                    styles["backgroundColor"] = rgba(fill.get("color", {}))
+                    break
+
+        if "cornerRadius" in node:
+            styles["borderRadius"] = px(node["cornerRadius"])
+
+        strokes = node.get("strokes")
+        if strokes:
+            for stroke in strokes:
+                if stroke.get("type") == "SOLID" and stroke.get("visible", True):
+                    styles["border"] = f"{node.get('strokeWeight', 1)}px solid {rgba(stroke.get('color', {}))}"
+                    break
+
+        for key in PADDING_KEYS:
+            if key in node:
+                styles[key] = px(node[key])
+
+        if "opacity" in node:
+            styles["opacity"] = str(node["opacity"])
+
+        if "effects" in node:
+            for effect in node["effects"]:
+                if effect.get("type") == "DROP_SHADOW" and effect.get("visible", True):
+                    offset = effect.get("offset", {})
+                    styles["boxShadow"] = f"{offset.get('x', 0)}px {offset.get('y', 0)}px {effect.get('radius', 0)}px {rgba(effect.get('color', {}))}"
+                    break
+
+        append(styles)
+
+    return results
+
+def generate_react_props(node):
+    """Generate React props from node properties"""
+    props = []
+    
+    # Add basic props
+    if "name" in node:
+        name_parts = node["name"].split('=')
+        if len(name_parts) > 1:
+            prop_name = name_parts[0].strip()
+            default_value = name_parts[1].strip()
+            if default_value.lower() in ["true", "false"]:
+                props.append(f"{prop_name}={default_value}")
+            else:
+                props.append(f'{prop_name}="{default_value}"')
+    
+    return props
+
+def component_name_for(node):
+    """Build a valid React component name from a node name"""
+    name = re.sub(r"[^A-Za-z0-9_]", "", node.get("name", "").replace(" ", ""))
+    if not name:
+        return "FigmaComponent"
+    if name[0].isdigit():
+        name = f"Figma{name}"
+    return name[0].upper() + name[1:]
+
+def jsx_text(text):
+    """Render text content as JSX, quoting it when it contains JSX syntax"""
+    if any(char in text for char in "{}<>\n"):
+        return "{" + json.dumps(text) + "}"
+    return text
+
+class StyleTable:
+    """Shares identical style objects between nodes as named constants"""
+
+    def __init__(self):
+        self.names = {}
+        self.entries = []
+
+    def name_for(self, styles):
+        """Get the constant name for a style dict, registering it if new"""
+        key = tuple(styles.items())
+        name = self.names.get(key)
+        if name is None:
+            name = f"s{len(self.entries)}"
+            self.names[key] = name
+            self.entries.append((name, styles))
+        return name
+
+    def write(self, out):
+        """Write the styles object declaration"""
+        out.write("const styles = {\n")
+        for name, styles in self.entries:
+            out.write(f"  {name}: {{\n")
+            for k, v in styles.items():
+                out.write(f"    {k}: '{v}',\n")
+            out.write("  },\n")
+        out.write("};\n\n")
+
+def iter_visible_nodes(root):
+    """Yield a node and its visible descendants in document order"""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(child for child in reversed(node.get("children", [])) if child.get("visible", True))
+
+def bulk_style_parser(root):
+    """Precompute styles for a whole subtree and return a per-node lookup"""
+    nodes = list(iter_visible_nodes(root))
+    styles_by_node = dict(zip(map(id, nodes), parse_node_styles_bulk(nodes)))
+    return lambda node: styles_by_node[id(node)]
+
+def write_node_tree(root, out, styles, style_parser=parse_node_styles):
+    """Write JSX for a node and its whole subtree in one iterative pass"""
+    # Each stack entry is (node, depth, closing); closing entries emit the end tag
+    stack = [(root, 2, False)]
+    while stack:
+        node, depth, closing = stack.pop()
+        indent = "  " * min(depth, MAX_INDENT_DEPTH)
+
+        if closing:
+            out.write(f"{indent}</div>\n")
+            continue
+
+        node_styles = style_parser(node)
+        style_attr = f" style={{styles.{styles.name_for(node_styles)}}}" if node_styles else ""
+        is_root = node is root
+        props_attr = " {...props}" if is_root else ""
+
+        children = [child for child in node.get("children", []) if child.get("visible", True)]
+        text = node.get("characters") if node.get("type") == "TEXT" else None
+
+        if not children and not text and not is_root:
+            out.write(f"{indent}<div{style_attr} />\n")
+            continue
+
+        out.write(f"{indent}<div{style_attr}{props_attr}>\n")
+        child_indent = "  " * min(depth + 1, MAX_INDENT_DEPTH)
+        if text:
+            out.write(f"{child_indent}{jsx_text(text)}\n")
+        if is_root:
+            for prop in generate_react_props(node):
+                out.write(f"{child_indent}{prop}\n")
+
+        stack.append((node, depth, True))
+        for child in reversed(children):
+            stack.append((child, depth + 1, False))
+
+def generate_react_component(node, style_parser=None):
+    """Generate a React component for a Figma node and its entire subtree"""
+    component_name = component_name_for(node)
+    styles = StyleTable()
+    if style_parser is None:
+        with timed("style_parsing"):
+            style_parser = bulk_style_parser(node)
+
+    # Render the body first so the style table is complete before it is written
+    body = io.StringIO()
+    write_node_tree(node, body, styles, style_parser)
+
+    out = io.StringIO()
+    out.write("import React from 'react';\n\n")
+    if styles.entries:
+        styles.write(out)
+    out.write(f"const {component_name} = (props) => {{\n")
+    out.write("  return (\n")
+    out.write(body.getvalue())
+    out.write("  );\n")
+    out.write("};\n\n")
+    out.write(f"export default {component_name};\n")
+    return out.getvalue()
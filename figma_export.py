@@ -0,0 +1,137 @@
+import io
+import re
+import json
+import logging
+import zipfile
+from figma_tools import node_to_react
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_export')
+
+# Node types exported as React components
+COMPONENT_TYPES = ("COMPONENT", "COMPONENT_SET")
+
+def component_file_name(node, used_names):
+    """
+    Build a unique .jsx file name for a component
+
+    Args:
+        node: Component node
+        used_names: Set of names already used in this export (updated)
+
+    Returns:
+        File name
+    """
+    base = re.sub(r"[^A-Za-z0-9_-]+", "", node.get("name", "").replace(" ", "")) or "FigmaComponent"
+    name = base
+    counter = 2
+    while name in used_names:
+        name = f"{base}{counter}"
+        counter += 1
+    used_names.add(name)
+    return f"{name}.jsx"
+
+def iter_component_code(components):
+    """
+    Generate React code for components one at a time
+
+    Args:
+        components: Iterable of component nodes
+
+    Yields:
+        Dictionaries with node_id, name, type, file_name and either code or error
+    """
+    used_names = set()
+    for node in components:
+        result = {
+            "node_id": node.get("id"),
+            "name": node.get("name"),
+            "type": node.get("type"),
+            "file_name": component_file_name(node, used_names)
+        }
+        try:
+            result["code"] = node_to_react(node)
+        except Exception as e:
+            logger.error(f"Failed to convert component {node.get('id')}: {str(e)}")
+            result["error"] = f"Failed to convert Figma to React: {str(e)}"
+        yield result
+
+def export_ndjson(components):
+    """
+    Export components as newline-delimited JSON
+
+    Args:
+        components: Iterable of component nodes (e.g. figma_tools.iter_figma_file_nodes)
+
+    Yields:
+        One encoded JSON line per component
+    """
+    count = 0
+    for result in iter_component_code(components):
+        count += 1
+        yield (json.dumps(result) + "\n").encode("utf-8")
+    logger.info(f"Exported {count} components as NDJSON")
+
+class StreamBuffer(io.RawIOBase):
+    """Write-only, unseekable buffer that hands written bytes back in chunks"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def export_zip(components):
+    """
+    Export components as a zip of .jsx files
+
+    The archive is written to an unseekable stream, so each file is yielded
+    as soon as it is compressed. Conversion errors are collected in
+    errors.json at the end of the archive.
+
+    Args:
+        components: Iterable of component nodes (e.g. figma_tools.iter_figma_file_nodes)
+
+    Yields:
+        Chunks of the zip archive
+    """
+    yield from zip_results(iter_component_code(components))
+
+def zip_results(results):
+    """
+    Write converted components to a zip of .jsx files
+
+    Args:
+        results: Iterable of dictionaries as yielded by iter_component_code
+
+    Yields:
+        Chunks of the zip archive
+    """
+    buffer = StreamBuffer()
+    errors = []
+    count = 0
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for result in results:
+            if "error" in result:
+                errors.append({key: result[key] for key in ("node_id", "name", "error")})
+                continue
+            archive.writestr(result["file_name"], result["code"])
+            count += 1
+            yield buffer.drain()
+
+        if errors:
+            archive.writestr("errors.json", json.dumps(errors, indent=2))
+
+    yield buffer.drain()
+    logger.info(f"Exported {count} components as zip ({len(errors)} errors)")
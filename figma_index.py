@@ -0,0 +1,127 @@
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_index')
+
+class NodeIndex:
+    """
+    Lookup tables over a Figma node tree, built in one iterative pass
+
+    Provides O(1) lookups by id and parent, and lists of nodes by type and
+    by name. Being iterative, it handles arbitrarily deep trees without
+    hitting Python's recursion limit.
+
+    Args:
+        roots: Root nodes to index (e.g. the documents of a nodes response)
+    """
+
+    def __init__(self, roots=()):
+        self.by_id = {}
+        self.parent_ids = {}
+        self.by_type = {}
+        self.by_name = {}
+        for root in roots:
+            self.add_tree(root)
+
+    @classmethod
+    def from_response(cls, node_data):
+        """
+        Index every document in a Figma nodes or file response
+
+        Args:
+            node_data: Response from /files/{key}/nodes or /files/{key}
+
+        Returns:
+            NodeIndex instance
+        """
+        roots = []
+        if "document" in node_data:
+            roots.append(node_data["document"])
+        for item in node_data.get("nodes", {}).values():
+            if item and "document" in item:
+                roots.append(item["document"])
+        return cls(roots)
+
+    def add_tree(self, root, parent_id=None):
+        """
+        Add a node and all its descendants to the index
+
+        Args:
+            root: Node to index
+            parent_id: Id of the node's parent, if known
+        """
+        stack = [(root, parent_id)]
+        while stack:
+            node, parent = stack.pop()
+            node_id = node.get("id")
+            if node_id is not None:
+                # Keep the first occurrence, like a depth-first search would
+                if node_id not in self.by_id:
+                    self.by_id[node_id] = node
+                    self.parent_ids[node_id] = parent
+                self.by_type.setdefault(node.get("type", "Unknown"), []).append(node)
+                if "name" in node:
+                    self.by_name.setdefault(node["name"], []).append(node)
+            stack.extend((child, node_id) for child in reversed(node.get("children", [])))
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, node_id):
+        return node_id in self.by_id
+
+    def get(self, node_id):
+        """Get a node by id, or None"""
+        return self.by_id.get(node_id)
+
+    def parent(self, node_id):
+        """Get a node's parent, or None for roots and unknown ids"""
+        parent_id = self.parent_ids.get(node_id)
+        return self.by_id.get(parent_id) if parent_id is not None else None
+
+    def ancestors(self, node_id):
+        """Get a node's ancestors, nearest first"""
+        result = []
+        parent_id = self.parent_ids.get(node_id)
+        while parent_id is not None:
+            result.append(self.by_id[parent_id])
+            parent_id = self.parent_ids.get(parent_id)
+        return result
+
+    def find_by_type(self, node_type):
+        """Get all nodes of a type, in document order"""
+        return self.by_type.get(node_type, [])
+
+    def find_by_name(self, name):
+        """Get all nodes with an exact name, in document order"""
+        return self.by_name.get(name, [])
+
+    def summary(self):
+        """Get node counts for debugging"""
+        return {
+            "node_count": len(self.by_id),
+            "type_counts": {node_type: len(nodes) for node_type, nodes in self.by_type.items()}
+        }
+
+class NodeResponse(dict):
+    """
+    Figma nodes response that carries its own NodeIndex
+
+    The index is built on first use and lives on the response, so it is
+    cached and evicted together with it (e.g. in figma_node_cache) instead
+    of in a cache of its own. content_hashes does the same for the content
+    hashes of the response's nodes, keyed by node id.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._index = None
+        self.content_hashes = {}
+
+    @property
+    def index(self):
+        """NodeIndex over the response's documents"""
+        if self._index is None:
+            self._index = NodeIndex.from_response(self)
+        return self._index
@@ -0,0 +1,576 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from figma_codegen import generate_react_component
+from figma_tools import fetch_figma_batch_async, extract_target_node, iter_figma_file_nodes, node_content_hash, get_code_cache
+from figma_export import COMPONENT_TYPES, component_file_name
+from figma_scheduler import batch_priority
+from metrics import timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_jobs')
+
+# Jobs and their results are kept here, so they survive restarts
+FIGMA_JOBS_DB = os.getenv("FIGMA_JOBS_DB", os.path.join(".cache", "figma_jobs.sqlite3"))
+
+# Jobs run at the same time
+FIGMA_JOB_WORKERS = int(os.getenv("FIGMA_JOB_WORKERS", "2"))
+
+# Code generation runs in worker processes so large jobs never block the event loop
+FIGMA_CODEGEN_WORKERS = int(os.getenv("FIGMA_CODEGEN_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Finished jobs are deleted after this many seconds
+FIGMA_JOB_RETENTION = int(os.getenv("FIGMA_JOB_RETENTION", str(7 * 24 * 3600)))
+
+JOB_KINDS = ("figma_to_react_batch", "figma_export")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Maximum number of node ids per conversion job
+MAX_JOB_NODES = 10000
+
+# Results are written to the job store in batches of this many, or after
+# this many seconds, whichever comes first
+JOB_RESULT_BATCH = 50
+JOB_FLUSH_INTERVAL = 0.5
+
+class JobStore:
+    """
+    SQLite store of jobs, their progress and their results
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+            "done INTEGER NOT NULL DEFAULT 0, total INTEGER, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_results ("
+            "job_id TEXT NOT NULL, position INTEGER NOT NULL, result TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, position))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def create(self, kind, params):
+        """Record a new queued job and return it"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, kind, params, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(params), QUEUED, time.time())
+                )
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """Get a job, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, kind, params, status, done, total, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, kind, params, status, done, total, error, created_at, started_at, finished_at = row
+        return {
+            "job_id": job_id,
+            "kind": kind,
+            "params": json.loads(params),
+            "status": status,
+            "progress": {"done": done, "total": total},
+            "error": error,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at
+        }
+
+    def get_results(self, job_id, offset=0, limit=None):
+        """Get the stored results of a job in order, starting at offset"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM job_results WHERE job_id = ? AND position >= ? ORDER BY position LIMIT ?",
+                (job_id, offset, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def pending(self):
+        """Ids of queued and running jobs, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self):
+        """Number of jobs by status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def start(self, job_id):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? WHERE job_id = ?", (RUNNING, time.time(), job_id)
+                )
+
+    def set_total(self, job_id, total):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("UPDATE jobs SET total = ? WHERE job_id = ?", (total, job_id))
+
+    def add_results(self, job_id, position, results):
+        """Store results from position on and advance the job's progress in one transaction"""
+        rows = [(job_id, position + i, json.dumps(result)) for i, result in enumerate(results)]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO job_results (job_id, position, result) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET done = MAX(done, ?) WHERE job_id = ?", (position + len(results), job_id)
+                )
+
+    def finish(self, job_id, status, error=None):
+        """Mark a job finished; a succeeded job without a total gets its final count as total"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, "
+                    "total = CASE WHEN ? THEN COALESCE(total, done) ELSE total END WHERE job_id = ?",
+                    (status, error, time.time(), status == SUCCEEDED, job_id)
+                )
+
+    def reset(self, job_id):
+        """Put an interrupted job back in the queue, dropping its partial results"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, done = 0, started_at = NULL WHERE job_id = ?", (QUEUED, job_id)
+                )
+
+    def prune(self, before):
+        """Delete jobs that finished before a timestamp, returning how many were deleted"""
+        placeholders = ",".join("?" * len(FINISHED_STATUSES))
+        with self._lock:
+            with self._conn:
+                job_ids = [row[0] for row in self._conn.execute(
+                    f"SELECT job_id FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+                    FINISHED_STATUSES + (before,)
+                ).fetchall()]
+                self._conn.executemany("DELETE FROM job_results WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+                self._conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+        return len(job_ids)
+
+_job_store = None
+_codegen_pool = None
+
+def get_job_store():
+    """Get the shared job store, opening it on first use"""
+    global _job_store
+    if _job_store is None:
+        _job_store = JobStore(FIGMA_JOBS_DB)
+    return _job_store
+
+def get_codegen_pool():
+    """Get the code generation process pool, starting it on first use"""
+    global _codegen_pool
+    if _codegen_pool is None:
+        _codegen_pool = ProcessPoolExecutor(max_workers=max(1, FIGMA_CODEGEN_WORKERS))
+    return _codegen_pool
+
+def close_codegen_pool():
+    """Shut down the code generation process pool"""
+    global _codegen_pool
+    if _codegen_pool is not None:
+        _codegen_pool.shutdown(wait=False, cancel_futures=True)
+        _codegen_pool = None
+
+async def node_to_react_in_pool(node):
+    """Like figma_tools.node_to_react, but generates uncached code in the process pool"""
+    content_hash = await asyncio.to_thread(node_content_hash, node)
+    cache = get_code_cache()
+    with timed("cache_lookup"):
+        react_code = await cache.get_async(content_hash)
+    if react_code is None:
+        with timed("codegen"):
+            react_code = await asyncio.get_running_loop().run_in_executor(
+                get_codegen_pool(), generate_react_component, node
+            )
+        await cache.set_async(content_hash, react_code)
+    return react_code
+
+async def convert_in_order(conversions, report):
+    """
+    Run conversions with up to FIGMA_CODEGEN_WORKERS at a time, reporting
+    results in the order the conversions were started
+
+    Args:
+        conversions: Async iterable of coroutines, each returning a result
+        report: Coroutine function called with each result
+    """
+    window = deque()
+    try:
+        async for conversion in conversions:
+            window.append(asyncio.ensure_future(conversion))
+            if len(window) >= max(1, FIGMA_CODEGEN_WORKERS):
+                await report(await window.popleft())
+        while window:
+            await report(await window.popleft())
+    finally:
+        for future in window:
+            future.cancel()
+
+def locked_next(lock, iterator, default):
+    with lock:
+        return next(iterator, default)
+
+async def iter_in_thread(iterator, lock):
+    """
+    Consume a blocking iterator in the default thread pool, one item at a time
+
+    Every step holds lock, so close_in_thread can wait for a step that is
+    still running after the consumer was cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    done = object()
+    while True:
+        item = await loop.run_in_executor(None, locked_next, lock, iterator, done)
+        if item is done:
+            return
+        yield item
+
+def close_in_thread(iterator, lock):
+    """
+    Close a generator consumed by iter_in_thread
+
+    Closing a generator while next() runs on a worker thread raises
+    "generator already executing", so the close runs on a worker thread
+    once the in-flight step (if any) has returned. Does not wait for it.
+    """
+    def close():
+        with lock:
+            iterator.close()
+    asyncio.get_running_loop().run_in_executor(None, close)
+
+def check_job(kind, params):
+    """Validate a job submission, raising on bad parameters"""
+    if kind not in JOB_KINDS:
+        raise Exception(f"Unknown job kind: {kind}. Expected one of: {', '.join(JOB_KINDS)}")
+    if not params.get("file_key"):
+        raise Exception("file_key is required")
+    if kind == "figma_to_react_batch":
+        node_ids = params.get("node_ids")
+        if not isinstance(node_ids, list) or not node_ids:
+            raise Exception("node_ids must be a non-empty list")
+        if len(node_ids) > MAX_JOB_NODES:
+            raise Exception(f"At most {MAX_JOB_NODES} node ids per job")
+
+async def run_batch_job(job, report, set_total):
+    """
+    Fetch and convert a list of nodes, like figma_to_react_batch
+
+    Results are {node_id, code} or {node_id, error}, in request order.
+    """
+    params = job["params"]
+    file_key = params["file_key"]
+    node_ids = list(dict.fromkeys(params["node_ids"]))
+    await set_total(len(node_ids))
+
+    with batch_priority():
+        responses, errors = await fetch_figma_batch_async(file_key, node_ids, params.get("chunk_size"))
+
+    async def convert(node_id):
+        try:
+            if node_id in errors:
+                raise Exception(errors[node_id])
+            if responses.get(node_id) is None:
+                raise Exception("Node not found in response")
+            node = extract_target_node(responses[node_id], node_id)
+            return {"node_id": node_id, "code": await node_to_react_in_pool(node)}
+        except Exception as e:
+            return {"node_id": node_id, "error": f"Failed to convert Figma to React: {str(e)}"}
+
+    async def conversions():
+        for node_id in node_ids:
+            yield convert(node_id)
+
+    await convert_in_order(conversions(), report)
+
+async def run_export_job(job, report, set_total):
+    """
+    Stream a file and convert every component, like /figma-export
+
+    Results are the dictionaries of figma_export.iter_component_code. The
+    total is unknown until the whole file has been read.
+    """
+    file_key = job["params"]["file_key"]
+    used_names = set()
+
+    async def convert(node, file_name):
+        result = {"node_id": node.get("id"), "name": node.get("name"), "type": node.get("type"), "file_name": file_name}
+        try:
+            result["code"] = await node_to_react_in_pool(node)
+        except Exception as e:
+            logger.error(f"Failed to convert component {node.get('id')}: {str(e)}")
+            result["error"] = f"Failed to convert Figma to React: {str(e)}"
+        return result
+
+    iterator = iter_figma_file_nodes(file_key, types=COMPONENT_TYPES)
+    lock = threading.Lock()
+
+    async def conversions():
+        async for node in iter_in_thread(iterator, lock):
+            yield convert(node, component_file_name(node, used_names))
+
+    try:
+        await convert_in_order(conversions(), report)
+    finally:
+        close_in_thread(iterator, lock)
+
+JOB_RUNNERS = {
+    "figma_to_react_batch": run_batch_job,
+    "figma_export": run_export_job
+}
+
+class JobQueue:
+    """
+    Runs submitted jobs in FIGMA_JOB_WORKERS background tasks
+
+    Jobs are persisted before they are queued. Jobs that were queued or
+    running when the process stopped are restarted from scratch by start().
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._workers = []
+        self._running = {}
+        self._cancelled = set()
+        self._changed = None
+
+    async def start(self):
+        """Requeue unfinished jobs, prune old ones and start the workers"""
+        store = get_job_store()
+        self._queue = asyncio.Queue()
+        self._changed = asyncio.Event()
+
+        pruned = await asyncio.to_thread(store.prune, time.time() - FIGMA_JOB_RETENTION)
+        pending = await asyncio.to_thread(store.pending)
+        for job_id in pending:
+            await asyncio.to_thread(store.reset, job_id)
+            self._queue.put_nowait(job_id)
+        logger.info(f"Job queue started: {len(pending)} jobs resumed, {pruned} old jobs pruned")
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(max(1, FIGMA_JOB_WORKERS))]
+
+    async def stop(self):
+        """Stop the workers; interrupted jobs resume on the next start"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, kind, params):
+        """
+        Queue a job
+
+        Args:
+            kind: One of JOB_KINDS
+            params: Job parameters (file_key, plus node_ids for conversions)
+
+        Returns:
+            The queued job
+        """
+        if self._queue is None:
+            raise Exception("Job queue is not running")
+        params = params or {}
+        check_job(kind, params)
+        job = await asyncio.to_thread(get_job_store().create, kind, params)
+        self._queue.put_nowait(job["job_id"])
+        logger.info(f"Queued {kind} job {job['job_id']}")
+        return job
+
+    async def cancel(self, job_id):
+        """
+        Cancel a queued or running job; finished jobs are left as they are
+
+        Returns:
+            The job, or None if there is no such job
+        """
+        store = get_job_store()
+        job = await asyncio.to_thread(store.get, job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+        if job_id in self._running:
+            # The worker marks it cancelled once the task has stopped
+            self._cancelled.add(job_id)
+            self._running[job_id].cancel()
+        elif job["status"] == QUEUED:
+            # Also tells a worker that read the job before this write to skip it
+            self._cancelled.add(job_id)
+            await asyncio.to_thread(store.finish, job_id, CANCELLED)
+            self._notify()
+        # Otherwise it finished while the job was being read
+        return await asyncio.to_thread(store.get, job_id)
+
+    async def wait_for_change(self, changed, timeout=1.0):
+        """Wait until a change event (taken from _changed before reading the store) fires, or the timeout passes"""
+        if changed is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def stream_results(self, job_id, offset=0, follow=True):
+        """
+        Yield a job's results from offset as they become available
+
+        Args:
+            job_id: Job id
+            offset: Position of the first result
+            follow: Keep waiting for new results until the job finishes
+
+        Yields:
+            Result dictionaries in order
+        """
+        store = get_job_store()
+        while True:
+            changed = self._changed
+            # Read the status first so results stored before it finished are not missed
+            job = await asyncio.to_thread(store.get, job_id)
+            if job is None:
+                raise Exception(f"Job not found: {job_id}")
+            results = await asyncio.to_thread(store.get_results, job_id, offset)
+            for result in results:
+                yield result
+            offset += len(results)
+            if not follow or job["status"] in FINISHED_STATUSES:
+                return
+            await self.wait_for_change(changed)
+
+    def stats(self):
+        """Job counts by status and the number waiting for a worker"""
+        return {
+            "jobs": get_job_store().counts(),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "workers": len(self._workers)
+        }
+
+    def _notify(self):
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    async def _work(self):
+        store = get_job_store()
+        while True:
+            job_id = await self._queue.get()
+            job = await asyncio.to_thread(store.get, job_id)
+            # Cancelled (or pruned) while queued
+            if job is None or job["status"] != QUEUED or job_id in self._cancelled:
+                self._cancelled.discard(job_id)
+                continue
+            # Run as its own task so cancel() can stop it without stopping the worker
+            self._running[job_id] = asyncio.ensure_future(self._run(job))
+            try:
+                await self._running[job_id]
+            finally:
+                self._running.pop(job_id, None)
+                self._cancelled.discard(job_id)
+
+    async def _run(self, job):
+        store = get_job_store()
+        job_id = job["job_id"]
+        await asyncio.to_thread(store.start, job_id)
+        self._notify()
+
+        # Results are buffered and written in batches off the event loop
+        pending = []
+        position = 0
+        flush_lock = asyncio.Lock()
+        flush_timer = None
+
+        async def flush():
+            nonlocal position
+            async with flush_lock:
+                if not pending:
+                    return
+                batch = pending[:]
+                pending.clear()
+                start = position
+                position += len(batch)
+                await asyncio.to_thread(store.add_results, job_id, start, batch)
+            self._notify()
+
+        async def flush_later():
+            await asyncio.sleep(JOB_FLUSH_INTERVAL)
+            await flush()
+
+        async def report(result):
+            nonlocal flush_timer
+            pending.append(result)
+            if len(pending) >= JOB_RESULT_BATCH:
+                await flush()
+            elif flush_timer is None or flush_timer.done():
+                flush_timer = asyncio.create_task(flush_later())
+
+        async def set_total(total):
+            await asyncio.to_thread(store.set_total, job_id, total)
+
+        logger.info(f"Running {job['kind']} job {job_id}")
+        try:
+            await JOB_RUNNERS[job["kind"]](job, report, set_total)
+            await flush()
+            await asyncio.to_thread(store.finish, job_id, SUCCEEDED)
+            logger.info(f"Finished job {job_id} with {position} results")
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                # Shutting down; left running so start() resumes it
+                raise
+            # Keep the results reported before the cancel
+            await flush()
+            await asyncio.to_thread(store.finish, job_id, CANCELLED)
+            logger.info(f"Cancelled job {job_id} after {position} results")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            await flush()
+            await asyncio.to_thread(store.finish, job_id, FAILED, str(e))
+        finally:
+            if flush_timer is not None:
+                flush_timer.cancel()
+        self._notify()
+
+job_queue = JobQueue()
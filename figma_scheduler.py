@@ -0,0 +1,289 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_scheduler')
+
+# Request priorities
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Shared Figma request quota (FIGMA_RATE_LIMIT=0 disables limiting)
+FIGMA_RATE_LIMIT = float(os.getenv("FIGMA_RATE_LIMIT", "5"))
+FIGMA_BURST = int(os.getenv("FIGMA_BURST", "10"))
+
+# Interactive requests granted per batch request while both are queued
+FIGMA_INTERACTIVE_WEIGHT = int(os.getenv("FIGMA_INTERACTIVE_WEIGHT", "3"))
+
+# Retries of throttled (429) and failed (5xx) requests
+FIGMA_MAX_RETRIES = int(os.getenv("FIGMA_MAX_RETRIES", "3"))
+FIGMA_RETRY_BASE_DELAY = float(os.getenv("FIGMA_RETRY_BASE_DELAY", "0.5"))
+FIGMA_RETRY_MAX_DELAY = float(os.getenv("FIGMA_RETRY_MAX_DELAY", "30"))
+
+# Status codes worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Priority of Figma requests made in the current context
+request_priority = contextvars.ContextVar("figma_request_priority", default=INTERACTIVE)
+
+@contextmanager
+def batch_priority():
+    """Mark Figma requests made inside the block (and tasks started from it) as batch work"""
+    token = request_priority.set(BATCH)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header
+
+    Args:
+        value: Header value, either seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt):
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry attempt
+
+    Returns:
+        Seconds to wait
+    """
+    return random.uniform(0, min(FIGMA_RETRY_MAX_DELAY, FIGMA_RETRY_BASE_DELAY * 2 ** attempt))
+
+class _Waiter:
+    """One queued request, woken when it is granted a token"""
+
+    def __init__(self, priority, loop=None):
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.event = asyncio.Event() if loop is not None else threading.Event()
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+class FigmaScheduler:
+    """
+    Token-bucket scheduler shared by every Figma API call
+
+    Requests queue per priority and are granted tokens in smooth weighted
+    round-robin order, so interactive requests go first without starving
+    batch work. A 429 pauses the bucket for the Retry-After period and
+    halves the rate; successes restore it gradually. Threads and coroutines
+    share the same quota.
+
+    Args:
+        rate: Tokens added per second (0 disables limiting)
+        burst: Bucket size
+        weights: Grant weight per priority
+    """
+
+    def __init__(self, rate, burst, weights):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.weights = weights
+        self.paused_until = 0.0
+        self.throttled_count = 0
+        self.retries = 0
+        self._updated = time.monotonic()
+        self._queues = {priority: deque() for priority in weights}
+        self._credits = {priority: 0 for priority in weights}
+        self._granted = {priority: 0 for priority in weights}
+        self._wait_total = {priority: 0.0 for priority in weights}
+        self._wait_max = {priority: 0.0 for priority in weights}
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _next_priority(self):
+        # Smooth weighted round-robin over the non-empty queues
+        waiting = [priority for priority, queue in self._queues.items() if queue]
+        total = 0
+        for priority in waiting:
+            self._credits[priority] += self.weights[priority]
+            total += self.weights[priority]
+        chosen = max(waiting, key=lambda priority: self._credits[priority])
+        self._credits[chosen] -= total
+        return chosen
+
+    def _dispatch(self):
+        """Grant available tokens; returns seconds until the next grant is possible"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            while self.tokens >= 1 and any(self._queues.values()):
+                priority = self._next_priority()
+                waiter = self._queues[priority].popleft()
+                self.tokens -= 1
+                waited = now - waiter.enqueued_at
+                self._granted[priority] += 1
+                self._wait_total[priority] += waited
+                self._wait_max[priority] = max(self._wait_max[priority], waited)
+                waiter.granted = True
+                waiter.wake()
+            return (1 - self.tokens) / self.rate
+
+    def _enqueue(self, waiter):
+        if waiter.priority not in self._queues:
+            raise Exception(f"Unknown Figma request priority: {waiter.priority}")
+        with self._lock:
+            self._queues[waiter.priority].append(waiter)
+
+    def _abandon(self, waiter):
+        with self._lock:
+            if waiter.granted:
+                # Hand the unused token back
+                self.tokens = min(self.burst, self.tokens + 1)
+            else:
+                self._queues[waiter.priority].remove(waiter)
+
+    def acquire(self, priority=None):
+        """
+        Block until the calling thread may send a Figma request
+
+        Args:
+            priority: INTERACTIVE or BATCH (defaults to the context's priority)
+        """
+        if self.max_rate <= 0:
+            return
+        waiter = _Waiter(priority or request_priority.get())
+        self._enqueue(waiter)
+        while True:
+            delay = self._dispatch()
+            if waiter.granted:
+                return
+            waiter.event.wait(delay)
+
+    async def acquire_async(self, priority=None):
+        """
+        Async version of acquire; waiting does not block the event loop
+
+        Args:
+            priority: INTERACTIVE or BATCH (defaults to the context's priority)
+        """
+        if self.max_rate <= 0:
+            return
+        waiter = _Waiter(priority or request_priority.get(), asyncio.get_running_loop())
+        self._enqueue(waiter)
+        try:
+            while True:
+                delay = self._dispatch()
+                if waiter.granted:
+                    return
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def throttled(self, retry_after):
+        """
+        Record a 429: pause the bucket and halve the rate
+
+        Args:
+            retry_after: Seconds to pause, from Retry-After or backoff
+        """
+        with self._lock:
+            self.throttled_count += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            self.tokens = 0.0
+            self._updated = self.paused_until
+            self.rate = max(self.max_rate / 8, self.rate / 2)
+        logger.warning(f"Figma rate limited, pausing {retry_after:.1f}s at {self.rate:.2f} requests/s")
+
+    def succeeded(self):
+        """Record a successful request, raising a reduced rate back towards the maximum"""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def retry_delay(self, response, attempt):
+        """
+        Work out how long to wait before retrying a failed response
+
+        Throttled responses pause the whole bucket instead, so their retry
+        simply queues again.
+
+        Args:
+            response: Response with a retryable status
+            attempt: Zero-based retry attempt
+
+        Returns:
+            Seconds the caller should sleep before queueing again
+        """
+        self.retries += 1
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if response.status_code == 429:
+            # Jitter keeps queued retries from all firing at the end of the pause
+            self.throttled((retry_after if retry_after is not None else backoff_delay(attempt))
+                           + random.uniform(0, FIGMA_RETRY_BASE_DELAY))
+            return 0
+        return retry_after if retry_after is not None else backoff_delay(attempt)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate": self.rate,
+                "max_rate": self.max_rate,
+                "tokens": round(self.tokens, 2),
+                "paused_for": round(max(0.0, self.paused_until - now), 2),
+                "throttled": self.throttled_count,
+                "retries": self.retries,
+                "queues": {
+                    priority: {
+                        "depth": len(self._queues[priority]),
+                        "granted": self._granted[priority],
+                        "avg_wait": self._wait_total[priority] / self._granted[priority] if self._granted[priority] else 0.0,
+                        "max_wait": self._wait_max[priority]
+                    }
+                    for priority in self._queues
+                }
+            }
+
+figma_scheduler = FigmaScheduler(
+    FIGMA_RATE_LIMIT,
+    FIGMA_BURST,
+    {INTERACTIVE: max(1, FIGMA_INTERACTIVE_WEIGHT), BATCH: 1}
+)
@@ -0,0 +1,150 @@
+import logging
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_stream')
+
+def node_matches(node_type, node_id, types, ids):
+    """Check whether a node is selected by type or id"""
+    return (node_type is not None and node_type in types) or (node_id is not None and node_id in ids)
+
+def iter_tree_matches(node, types=None, ids=None, include_root=True):
+    """
+    Walk an already parsed node tree and yield selected nodes in document order
+
+    Args:
+        node: Root node
+        types: Node types to select (e.g. COMPONENT)
+        ids: Node ids to select
+        include_root: Whether the root itself may be yielded
+
+    Yields:
+        Selected nodes
+    """
+    types = set(types or ())
+    ids = set(ids or ())
+    stack = [(node, include_root)]
+    while stack:
+        current, check = stack.pop()
+        if check and node_matches(current.get("type"), current.get("id"), types, ids):
+            yield current
+        stack.extend((child, True) for child in reversed(current.get("children", [])))
+
+def iter_matching_nodes(events, types=None, ids=None):
+    """
+    Select node subtrees from a stream of ijson parse events
+
+    Only selected subtrees are materialized; everything else is dropped as
+    it streams past, so memory stays proportional to the largest selected
+    subtree rather than the whole document. A map is treated as a node once
+    its "id" and "type" keys are seen; Figma emits both before any nested
+    property, so undecided maps are resolved at their first nested value at
+    the latest. Nodes nested inside a selected node are yielded after it,
+    keeping document order.
+
+    Args:
+        events: Iterable of (prefix, event, value) tuples from ijson.parse
+        types: Node types to select (e.g. COMPONENT, COMPONENT_SET)
+        ids: Node ids to select
+
+    Yields:
+        Selected nodes as dictionaries
+    """
+    types = set(types or ())
+    ids = set(ids or ())
+    # Open containers outside selected subtrees. Map frames buffer their
+    # events until they are known to be selected or not.
+    stack = []
+    builder = None
+    nesting = 0
+
+    def decide(frame):
+        nonlocal builder, nesting
+        pending = frame["pending"]
+        frame["pending"] = None
+        if node_matches(frame["type"], frame["id"], types, ids):
+            builder = ijson.ObjectBuilder()
+            for event, value in pending:
+                builder.event(event, value)
+            nesting = 1
+
+    for _, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                nesting += 1
+            elif event in ("end_map", "end_array"):
+                nesting -= 1
+                if nesting == 0:
+                    node = builder.value
+                    builder = None
+                    stack.pop()
+                    yield from iter_tree_matches(node, types, ids)
+            continue
+
+        top = stack[-1] if stack else None
+
+        if event in ("start_map", "start_array"):
+            # A nested value settles whether the enclosing map is a node
+            if top is not None and top["pending"] is not None:
+                decide(top)
+                if builder is not None:
+                    builder.event(event, value)
+                    nesting += 1
+                    continue
+            if event == "start_map":
+                stack.append({"pending": [(event, value)], "key": None, "type": None, "id": None})
+            else:
+                stack.append({"pending": None, "key": None, "type": None, "id": None})
+        elif event == "map_key":
+            top["key"] = value
+            if top["pending"] is not None:
+                top["pending"].append((event, value))
+        elif event in ("end_map", "end_array"):
+            if top["pending"] is not None:
+                top["pending"].append((event, value))
+                decide(top)
+                if builder is not None:
+                    node = builder.value
+                    builder = None
+                    stack.pop()
+                    yield from iter_tree_matches(node, types, ids)
+                    continue
+            stack.pop()
+        else:
+            if top is not None and top["pending"] is not None:
+                top["pending"].append((event, value))
+                if top["key"] == "type":
+                    top["type"] = value
+                elif top["key"] == "id":
+                    top["id"] = value
+                if top["type"] is not None and top["id"] is not None:
+                    decide(top)
+
+def iter_stream_nodes(stream, types=None, ids=None):
+    """
+    Parse a JSON byte stream incrementally and yield the selected nodes
+
+    Falls back to parsing the whole document when ijson is not installed.
+
+    Args:
+        stream: File-like object with the JSON body
+        types: Node types to select
+        ids: Node ids to select
+
+    Yields:
+        Selected nodes
+    """
+    if ijson is None:
+        import json
+        logger.warning("ijson is not installed, parsing the whole Figma document in memory")
+        document = json.load(stream).get("document", {})
+        yield from iter_tree_matches(document, types, ids)
+        return
+
+    yield from iter_matching_nodes(ijson.parse(stream, use_float=True), types, ids)
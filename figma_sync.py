@@ -0,0 +1,214 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from figma_tools import get_figma_file_versions, get_figma_file_version, iter_figma_file_nodes, node_content_hash, node_to_react
+from figma_export import COMPONENT_TYPES, component_file_name
+from figma_scheduler import batch_priority
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_sync')
+
+# Sync state (last-seen versions, component hashes and code) is kept here
+FIGMA_SYNC_DB = os.getenv("FIGMA_SYNC_DB", os.path.join(".cache", "figma_sync.sqlite3"))
+
+class SyncStore:
+    """
+    SQLite store of the last synced version of each Figma file and the
+    content hash and generated code of each of its components
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "file_key TEXT PRIMARY KEY, version TEXT NOT NULL, synced_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS components ("
+            "file_key TEXT NOT NULL, node_id TEXT NOT NULL, name TEXT, type TEXT, "
+            "file_name TEXT NOT NULL, content_hash TEXT NOT NULL, code TEXT NOT NULL, "
+            "PRIMARY KEY (file_key, node_id))"
+        )
+        self._conn.commit()
+
+    def get_version(self, file_key):
+        """Get the last synced version of a file, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM files WHERE file_key = ?", (file_key,)).fetchone()
+        return row[0] if row else None
+
+    def get_hashes(self, file_key):
+        """Get the stored content hash of every component of a file, by node id"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node_id, content_hash FROM components WHERE file_key = ?", (file_key,)
+            ).fetchall()
+        return dict(rows)
+
+    def get_components(self, file_key):
+        """Get every stored component of a file"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node_id, name, type, file_name, code FROM components WHERE file_key = ? ORDER BY file_name",
+                (file_key,)
+            ).fetchall()
+        return [
+            {"node_id": node_id, "name": name, "type": node_type, "file_name": file_name, "code": code}
+            for node_id, name, node_type, file_name, code in rows
+        ]
+
+    def save(self, file_key, version, components, removed):
+        """
+        Record a sync in one transaction
+
+        Args:
+            file_key: Figma file key
+            version: Version that was synced, or None to leave it unchanged
+            components: Changed components as (result dict, content hash)
+            removed: Node ids of components no longer in the file
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO components (file_key, node_id, name, type, file_name, content_hash, code) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (file_key, result["node_id"], result["name"], result["type"], result["file_name"], content_hash, result["code"])
+                        for result, content_hash in components
+                    ]
+                )
+                self._conn.executemany(
+                    "DELETE FROM components WHERE file_key = ? AND node_id = ?",
+                    [(file_key, node_id) for node_id in removed]
+                )
+                if version is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files (file_key, version, synced_at) VALUES (?, ?, ?)",
+                        (file_key, version, time.time())
+                    )
+
+_sync_store = None
+
+def get_sync_store():
+    """Get the shared sync store, opening it on first use"""
+    global _sync_store
+    if _sync_store is None:
+        _sync_store = SyncStore(FIGMA_SYNC_DB)
+    return _sync_store
+
+def get_latest_version(file_key):
+    """
+    Get the current version of a file and its version history
+
+    Args:
+        file_key: Figma file key
+
+    Returns:
+        (current version id, list of versions newest first)
+    """
+    try:
+        versions = get_figma_file_versions(file_key)
+    except Exception as e:
+        logger.warning(f"Could not get version history of Figma file {file_key}: {str(e)}")
+        versions = []
+    if versions:
+        return versions[0].get("id"), versions
+    # Fall back to the version reported in the file's metadata
+    return get_figma_file_version(file_key), []
+
+def versions_since(versions, previous_version):
+    """Summaries of the versions saved after previous_version, newest first"""
+    result = []
+    for version in versions:
+        if version.get("id") == previous_version:
+            break
+        result.append({key: version.get(key) for key in ("id", "created_at", "label", "description")})
+    return result
+
+def sync_figma_file(file_key, force=False):
+    """
+    Bring the stored React code of a file's components up to date
+
+    Nothing is downloaded beyond the version history when the file has not
+    changed since the last sync. Otherwise the file is streamed, each
+    component subtree is hashed, and only components whose hash changed are
+    regenerated.
+
+    Args:
+        file_key: Figma file key
+        force: Re-check every component even if the version is unchanged
+
+    Returns:
+        Dictionary with version, previous_version, versions (saved since the
+        last sync), changed (components with new code), removed (node ids)
+        and unchanged (count)
+    """
+    store = get_sync_store()
+    with batch_priority():
+        version, versions = get_latest_version(file_key)
+        previous_version = store.get_version(file_key)
+        stored_hashes = store.get_hashes(file_key)
+
+        if version == previous_version and not force:
+            logger.info(f"Figma file {file_key} unchanged at version {version}")
+            return {
+                "version": version,
+                "previous_version": previous_version,
+                "versions": [],
+                "changed": [],
+                "removed": [],
+                "unchanged": len(stored_hashes)
+            }
+
+        changed = []
+        seen = set()
+        used_names = set()
+        unchanged = 0
+        for node in iter_figma_file_nodes(file_key, types=COMPONENT_TYPES):
+            node_id = node.get("id")
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            file_name = component_file_name(node, used_names)
+
+            content_hash = node_content_hash(node)
+            if stored_hashes.get(node_id) == content_hash:
+                unchanged += 1
+                continue
+
+            result = {"node_id": node_id, "name": node.get("name"), "type": node.get("type"), "file_name": file_name}
+            try:
+                result["code"] = node_to_react(node, content_hash)
+            except Exception as e:
+                logger.error(f"Failed to convert component {node_id}: {str(e)}")
+                result["error"] = f"Failed to convert Figma to React: {str(e)}"
+            changed.append((result, content_hash))
+
+    removed = [node_id for node_id in stored_hashes if node_id not in seen]
+    converted = [(result, content_hash) for result, content_hash in changed if "code" in result]
+    # Keep the old version when conversions failed, so the next sync retries them
+    store.save(file_key, version if len(converted) == len(changed) else None, converted, removed)
+    logger.info(f"Synced Figma file {file_key} to version {version}: {len(changed)} changed, {len(removed)} removed, {unchanged} unchanged")
+
+    return {
+        "version": version,
+        "previous_version": previous_version,
+        "versions": versions_since(versions, previous_version),
+        "changed": [result for result, _ in changed],
+        "removed": removed,
+        "unchanged": unchanged
+    }
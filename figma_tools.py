@@ -1,236 +1,497 @@
-import os
-import json
-import requests
-from dotenv import load_dotenv
-from figma_debug import debug_node_response, find_node_by_id, log_node_structure, improve_node_id
-
-# Load environment variables
-load_dotenv()
-
-# Figma API configuration
-FIGMA_API_KEY = os.getenv("FIGMA_API_KEY")
-FIGMA_API_BASE = "https://api.figma.com/v1"
-
-def get_figma_file(file_key):
-    """Get a Figma file's data using the Figma API"""
-    headers = {
-        "X-Figma-Token": FIGMA_API_KEY
-    }
-    
-    url = f"{FIGMA_API_BASE}/files/{file_key}"
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch Figma file: {response.text}")
-    
-    return response.json()
-
-def get_figma_node(file_key, node_id):
-    """Get a specific node from a Figma file"""
-    headers = {
-        "X-Figma-Token": FIGMA_API_KEY
-    }
-    
-    url = f"{FIGMA_API_BASE}/files/{file_key}/nodes?ids={node_id}"
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch Figma node: {response.text}")
-    
-    return response.json()
-
-def parse_node_styles(node):
-    """Extract CSS styles from a Figma node"""
-    styles = {}
-    
-    # Extract dimensions
-    if "absoluteBoundingBox" in node:
-        bbox = node["absoluteBoundingBox"]
-        styles["width"] = f"{bbox.get('width', 'auto')}px"
-        styles["height"] = f"{bbox.get('height', 'auto')}px"
-    
-    # Extract fills (background colors)
-    if "fills" in node and node["fills"]:
-        for fill in node["fills"]:
-            if fill.get("type") == "SOLID" and fill.get("visible", True):
-                color = fill.get("color", {})
-                r = int(color.get("r", 0) * 255)
-                g = int(color.get("g", 0) * 255)
-                b = int(color.get("b", 0) * 255)
-                a = color.get("a", 1)
-                styles["backgroundColor"] = f"rgba({r}, {g}, {b}, {a})"
-                break
-    
-    # Extract border radius
-    if "cornerRadius" in node:
-        styles["borderRadius"] = f"{node['cornerRadius']}px"
-    
-    # Extract strokes (borders)
-    if "strokes" in node and node["strokes"]:
-        for stroke in node["strokes"]:
-            if stroke.get("type") == "SOLID" and stroke.get("visible", True):
-                color = stroke.get("color", {})
-                r = int(color.get("r", 0) * 255)
-                g = int(color.get("g", 0) * 255)
-                b = int(color.get("b", 0) * 255)
-                a = color.get("a", 1)
-                styles["border"] = f"{node.get('strokeWeight', 1)}px solid rgba({r}, {g}, {b}, {a})"
-                break
-    
-    # Add more style properties
-    # Extract padding
-    if "paddingLeft" in node:
-        styles["paddingLeft"] = f"{node['paddingLeft']}px"
-    if "paddingRight" in node:
-        styles["paddingRight"] = f"{node['paddingRight']}px"
-    if "paddingTop" in node:
-        styles["paddingTop"] = f"{node['paddingTop']}px"
-    if "paddingBottom" in node:
-        styles["paddingBottom"] = f"{node['paddingBottom']}px"
-    
-    # Extract opacity
-    if "opacity" in node:
-        styles["opacity"] = str(node["opacity"])
-    
-    # Extract shadows
-    if "effects" in node:
-        for effect in node["effects"]:
-            if effect.get("type") == "DROP_SHADOW" and effect.get("visible", True):
-                color = effect.get("color", {})
-                r = int(color.get("r", 0) * 255)
-                g = int(color.get("g", 0) * 255)
-                b = int(color.get("b", 0) * 255)
-                a = color.get("a", 1)
-                offset = effect.get("offset", {})
-                x = offset.get("x", 0)
-                y = offset.get("y", 0)
-                blur = effect.get("radius", 0)
-                styles["boxShadow"] = f"{x}px {y}px {blur}px rgba({r}, {g}, {b}, {a})"
-                break
-    
-    return styles
-
-def recursive_find_node(node, node_id):
-    """Find a node by its ID in the node tree"""
-    if node.get("id") == node_id:
-        return node
-    
-    if "children" in node:
-        for child in node["children"]:
-            found = recursive_find_node(child, node_id)
-            if found:
-                return found
-    
-    return None
-
-def extract_children(node):
-    """Extract children nodes and their styles"""
-    children = []
-    
-    if "children" in node:
-        for child in node["children"]:
-            styles = parse_node_styles(child)
-            content = ""
-            
-            # Check for text content
-            if child.get("type") == "TEXT" and "characters" in child:
-                content = child["characters"]
-            
-            children.append({
-                "styles": styles,
-                "content": content
-            })
-    
-    return children
-
-def generate_react_props(node):
-    """Generate React props from node properties"""
-    props = []
-    
-    # Add basic props
-    if "name" in node:
-        name_parts = node["name"].split('=')
-        if len(name_parts) > 1:
-            prop_name = name_parts[0].strip()
-            default_value = name_parts[1].strip()
-            if default_value.lower() in ["true", "false"]:
-                props.append(f"{prop_name}={default_value}")
-            else:
-                props.append(f'{prop_name}="{default_value}"')
-    
-    return props
-
-def figma_to_react(file_key, node_id):
-    """Convert a Figma node to a React component"""
-    try:
-        # Get the node data
-        node_data = get_figma_node(file_key, node_id)
-        
-        # Extract the node from the response
-        node = None
-        for key, item in node_data.get("nodes", {}).items():
-            if "document" in item:
-                node = item["document"]
-                break
-        
-        if not node:
-            # Try to find node in the document tree
-            for key, item in node_data.get("nodes", {}).items():
-                if "document" in item:
-                    document = item["document"]
-                    node = recursive_find_node(document, node_id.split(':')[-1])
-                    if node:
-                        break
-        
-        if not node:
-            raise Exception("Node not found in response")
-        
-        # Parse node name to get component name
-        component_name = node.get("name", "FigmaComponent").replace(" ", "")
-        
-        # Parse styles
-        styles = parse_node_styles(node)
-        styles_str = ",\n        ".join([f"{k}: '{v}'" for k, v in styles.items()])
-        
-        # Parse props
-        props = generate_react_props(node)
-        props_str = "\n  ".join(props)
-        
-        # Extract children
-        children = extract_children(node)
-        children_str = ""
-        
-        for child in children:
-            child_styles_str = ",\n          ".join([f"{k}: '{v}'" for k, v in child["styles"].items()])
-            content = child["content"]
-            
-            children_str += f"""
-      <div style={{{{
-          {child_styles_str}
-        }}}}>
-        {content}
-      </div>"""
-        
-        # Generate React component
-        react_code = f"""import React from 'react';
-
-const {component_name} = (props) => {{
-  return (
-    <div 
-      style={{{{
-        {styles_str}
-      }}}}
-      {{...props}}
-    >
-      {children_str}
-      {props_str}
-    </div>
-  );
-}};
-
-export default {component_name};
-"""
-        return react_code
-    
-    except Exception as e:
-        raise Exception(f"Failed to convert Figma to React: {str(e)}")
\ No newline at end of file
+import os
+import json
+import hashlib
+import time
+import logging
+import asyncio
+from dotenv import load_dotenv
+from http_clients import get_async_client, http_get
+from cache import LRUCache, DiskCache, TieredCache
+from singleflight import SingleFlight
+from metrics import timed
+from figma_scheduler import figma_scheduler, batch_priority, FIGMA_MAX_RETRIES, RETRY_STATUSES, BATCH
+from figma_stream import iter_stream_nodes
+from figma_index import NodeIndex, NodeResponse
+from figma_codegen import generate_react_component, GENERATOR_VERSION
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_tools')
+
+# Load environment variables
+load_dotenv()
+
+# Figma API configuration
+FIGMA_API_KEY = os.getenv("FIGMA_API_KEY")
+FIGMA_API_BASE = os.getenv("FIGMA_API_BASE", "https://api.figma.com/v1")
+
+# Node responses cached by (file_key, node_id, file version)
+FIGMA_NODE_CACHE_SIZE = int(os.getenv("FIGMA_NODE_CACHE_SIZE", "256"))
+figma_node_cache = LRUCache(FIGMA_NODE_CACHE_SIZE)
+
+# Concurrent identical Figma calls share one request
+figma_flight = SingleFlight()
+
+# Generated code cached by content hash (set FIGMA_CODE_CACHE_DIR to "" to keep it in memory only)
+FIGMA_CODE_CACHE_DIR = os.getenv("FIGMA_CODE_CACHE_DIR", ".cache")
+FIGMA_CODE_CACHE_MEMORY_SIZE = int(os.getenv("FIGMA_CODE_CACHE_MEMORY_SIZE", "256"))
+FIGMA_CODE_CACHE_BYTES = int(os.getenv("FIGMA_CODE_CACHE_BYTES", str(128 * 1024 * 1024)))
+_code_cache = None
+
+# Maximum number of node ids per Figma request in batch conversions
+FIGMA_BATCH_CHUNK_SIZE = int(os.getenv("FIGMA_BATCH_CHUNK_SIZE", "50"))
+
+def figma_get(url, priority=None, **kwargs):
+    """GET a Figma API url through the shared rate limiter, retrying throttled and 5xx responses with backoff"""
+    for attempt in range(FIGMA_MAX_RETRIES + 1):
+        figma_scheduler.acquire(priority)
+        response = http_get(url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt == FIGMA_MAX_RETRIES:
+            if response.status_code not in RETRY_STATUSES:
+                figma_scheduler.succeeded()
+            return response
+        delay = figma_scheduler.retry_delay(response, attempt)
+        logger.warning(f"Figma returned {response.status_code}, retrying in {delay:.1f}s (attempt {attempt + 1})")
+        response.close()
+        time.sleep(delay)
+
+async def figma_get_async(url, priority=None, **kwargs):
+    """Async version of figma_get using the shared async HTTP client"""
+    for attempt in range(FIGMA_MAX_RETRIES + 1):
+        await figma_scheduler.acquire_async(priority)
+        response = await get_async_client().get(url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt == FIGMA_MAX_RETRIES:
+            if response.status_code not in RETRY_STATUSES:
+                figma_scheduler.succeeded()
+            return response
+        delay = figma_scheduler.retry_delay(response, attempt)
+        logger.warning(f"Figma returned {response.status_code}, retrying in {delay:.1f}s (attempt {attempt + 1})")
+        await asyncio.sleep(delay)
+
+def open_figma_file_stream(file_key):
+    """Open a streaming download of a Figma file's JSON; the caller must close the response"""
+    headers = {
+        "X-Figma-Token": FIGMA_API_KEY
+    }
+    
+    url = f"{FIGMA_API_BASE}/files/{file_key}"
+    # Whole-file downloads only back exports, so they queue as batch work
+    response = figma_get(url, priority=BATCH, headers=headers, stream=True)
+    
+    if response.status_code != 200:
+        text = response.text
+        response.close()
+        raise Exception(f"Failed to fetch Figma file: {text}")
+    
+    # Let urllib3 undo gzip/deflate while we read the raw stream
+    response.raw.decode_content = True
+    return response
+
+def iter_figma_response_nodes(response, types=None, ids=None):
+    """Yield the nodes selected by type or id from an open Figma file stream, closing it when done"""
+    try:
+        yield from iter_stream_nodes(response.raw, types, ids)
+    finally:
+        response.close()
+
+def iter_figma_file_nodes(file_key, types=None, ids=None):
+    """Stream a Figma file and yield only the nodes selected by type or id, discarding the rest of the document as it downloads"""
+    response = open_figma_file_stream(file_key)
+    yield from iter_figma_response_nodes(response, types, ids)
+
+def get_figma_file_version(file_key):
+    """Get a Figma file's current version with a cheap depth=1 metadata request"""
+    headers = {
+        "X-Figma-Token": FIGMA_API_KEY
+    }
+    
+    url = f"{FIGMA_API_BASE}/files/{file_key}?depth=1"
+    response = figma_get(url, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch Figma file version: {response.text}")
+    
+    data = response.json()
+    return data.get("version") or data.get("lastModified")
+
+def get_figma_file_versions(file_key):
+    """Get a Figma file's version history, newest first"""
+    headers = {
+        "X-Figma-Token": FIGMA_API_KEY
+    }
+    
+    url = f"{FIGMA_API_BASE}/files/{file_key}/versions"
+    response = figma_get(url, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch Figma file versions: {response.text}")
+    
+    return response.json().get("versions", [])
+
+def get_figma_node(file_key, node_id):
+    """Get a specific node from a Figma file, sharing the request with identical calls already in flight"""
+    return figma_flight.do(("node", file_key, node_id), load_figma_node, file_key, node_id)
+
+def load_figma_node(file_key, node_id):
+    """Get a specific node from a Figma file, reusing the cached response while the file version is unchanged"""
+    try:
+        version = get_figma_file_version(file_key)
+    except Exception as e:
+        logger.warning(f"Could not check version of Figma file {file_key}, fetching node: {str(e)}")
+        return fetch_figma_node(file_key, node_id)
+    
+    cache_key = (file_key, node_id, version)
+    with timed("cache_lookup"):
+        node_data = figma_node_cache.get(cache_key)
+    if node_data is not None:
+        return node_data
+    
+    node_data = fetch_figma_node(file_key, node_id)
+    figma_node_cache.set(cache_key, node_data)
+    return node_data
+
+def invalidate_figma_cache(file_key=None, node_id=None):
+    """Drop cached node responses for a file, a single node, or everything; returns the number removed"""
+    removed = 0
+    for key in figma_node_cache.keys():
+        if (file_key is None or key[0] == file_key) and (node_id is None or key[1] == node_id):
+            figma_node_cache.delete(key)
+            removed += 1
+    return removed
+
+def fetch_figma_node(file_key, node_id):
+    """Get a specific node from a Figma file"""
+    headers = {
+        "X-Figma-Token": FIGMA_API_KEY
+    }
+    
+    url = f"{FIGMA_API_BASE}/files/{file_key}/nodes?ids={node_id}"
+    response = figma_get(url, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch Figma node: {response.text}")
+    
+    return NodeResponse(response.json())
+
+async def get_figma_file_version_async(file_key):
+    """Async version of get_figma_file_version"""
+    headers = {
+        "X-Figma-Token": FIGMA_API_KEY
+    }
+    
+    url = f"{FIGMA_API_BASE}/files/{file_key}?depth=1"
+    response = await figma_get_async(url, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch Figma file version: {response.text}")
+    
+    data = response.json()
+    return data.get("version") or data.get("lastModified")
+
+async def get_figma_node_async(file_key, node_id):
+    """Async version of get_figma_node"""
+    return await figma_flight.do_async(("node", file_key, node_id), load_figma_node_async, file_key, node_id)
+
+async def load_figma_node_async(file_key, node_id):
+    """Async version of load_figma_node"""
+    try:
+        version = await get_figma_file_version_async(file_key)
+    except Exception as e:
+        logger.warning(f"Could not check version of Figma file {file_key}, fetching node: {str(e)}")
+        return await fetch_figma_node_async(file_key, node_id)
+    
+    cache_key = (file_key, node_id, version)
+    with timed("cache_lookup"):
+        node_data = figma_node_cache.get(cache_key)
+    if node_data is not None:
+        return node_data
+    
+    node_data = await fetch_figma_node_async(file_key, node_id)
+    figma_node_cache.set(cache_key, node_data)
+    return node_data
+
+async def fetch_figma_node_async(file_key, node_id):
+    """Async version of fetch_figma_node using the shared async HTTP client"""
+    headers = {
+        "X-Figma-Token": FIGMA_API_KEY
+    }
+    
+    url = f"{FIGMA_API_BASE}/files/{file_key}/nodes?ids={node_id}"
+    response = await figma_get_async(url, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch Figma node: {response.text}")
+    
+    return NodeResponse(response.json())
+
+def get_node_index(node_data):
+    """Get the NodeIndex for a Figma response; fetched responses build theirs once and keep it"""
+    if isinstance(node_data, NodeResponse):
+        return node_data.index
+    return NodeIndex.from_response(node_data)
+
+def extract_target_node(node_data, node_id):
+    """Extract the requested node document from a Figma nodes response"""
+    with timed("node_search"):
+        node = None
+        for key, item in node_data.get("nodes", {}).items():
+            if item and "document" in item:
+                node = item["document"]
+                break
+        
+        if not node:
+            # Try to find node in the document tree
+            node = get_node_index(node_data).get(node_id.split(':')[-1])
+    
+    if not node:
+        raise Exception("Node not found in response")
+    
+    return node
+
+def get_code_cache():
+    """Get the generated code cache, creating it on first use"""
+    global _code_cache
+    if _code_cache is None:
+        disk = None
+        if FIGMA_CODE_CACHE_DIR:
+            try:
+                disk = DiskCache(
+                    os.path.join(FIGMA_CODE_CACHE_DIR, "react_code.sqlite3"),
+                    max_bytes=FIGMA_CODE_CACHE_BYTES
+                )
+            except Exception as e:
+                logger.error(f"Failed to open code disk cache, using memory only: {str(e)}")
+        _code_cache = TieredCache(LRUCache(FIGMA_CODE_CACHE_MEMORY_SIZE), disk)
+    return _code_cache
+
+def node_content_hash(node):
+    """Stable hash of a normalized node subtree and the generator version, used as cache key and ETag"""
+    payload = json.dumps(node, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{GENERATOR_VERSION}\n{payload}".encode("utf-8")).hexdigest()
+
+async def response_node_hash_async(node_data, node_id, node):
+    """
+    Content hash of a node from a Figma response, computed in a worker thread
+
+    Fetched responses (NodeResponse) keep the hash, and cached responses are
+    per file version, so each node version is hashed once.
+    """
+    hashes = getattr(node_data, "content_hashes", None)
+    if hashes is not None and node_id in hashes:
+        return hashes[node_id]
+    content_hash = await asyncio.to_thread(node_content_hash, node)
+    if hashes is not None:
+        hashes[node_id] = content_hash
+    return content_hash
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate.strip('"') == etag:
+            return True
+    return False
+
+def node_to_react(node, content_hash=None):
+    """Generate React component code for a Figma node and its whole subtree, reusing cached output for identical content"""
+    content_hash = content_hash or node_content_hash(node)
+    cache = get_code_cache()
+    with timed("cache_lookup"):
+        react_code = cache.get(content_hash)
+    if react_code is None:
+        with timed("codegen"):
+            react_code = generate_react_component(node)
+        cache.set(content_hash, react_code)
+    return react_code
+
+async def node_to_react_async(node, content_hash=None):
+    """
+    Async version of node_to_react
+
+    Hashing, code generation and code cache disk I/O all run in worker
+    threads, so converting a large node does not hold up other requests.
+    """
+    content_hash = content_hash or await asyncio.to_thread(node_content_hash, node)
+    cache = get_code_cache()
+    with timed("cache_lookup"):
+        react_code = await cache.get_async(content_hash)
+    if react_code is None:
+        with timed("codegen"):
+            react_code = await asyncio.to_thread(generate_react_component, node)
+        await cache.set_async(content_hash, react_code)
+    return react_code
+
+def figma_to_react(file_key, node_id):
+    """Convert a Figma node to a React component"""
+    try:
+        # Get the node data
+        node_data = get_figma_node(file_key, node_id)
+        
+        # Extract the node from the response
+        node = extract_target_node(node_data, node_id)
+        
+        return node_to_react(node)
+    
+    except Exception as e:
+        raise Exception(f"Failed to convert Figma to React: {str(e)}")
+
+async def figma_to_react_etag_async(file_key, node_id, if_none_match=None):
+    """Convert a Figma node, returning (code, etag); code is None when the client's If-None-Match already matches"""
+    try:
+        # Get the node data
+        node_data = await get_figma_node_async(file_key, node_id)
+        
+        # Extract the node from the response
+        node = extract_target_node(node_data, node_id)
+        
+        etag = await response_node_hash_async(node_data, node_id, node)
+        if etag_matches(if_none_match, etag):
+            return None, etag
+        
+        return await node_to_react_async(node, etag), etag
+    
+    except Exception as e:
+        raise Exception(f"Failed to convert Figma to React: {str(e)}")
+
+def chunk_node_ids(node_ids, chunk_size=None):
+    """Split node ids into unique chunks for multi-id Figma requests"""
+    chunk_size = max(1, chunk_size or FIGMA_BATCH_CHUNK_SIZE)
+    unique_ids = list(dict.fromkeys(node_ids))
+    return [unique_ids[i:i + chunk_size] for i in range(0, len(unique_ids), chunk_size)]
+
+def split_batch_response(node_data, node_ids):
+    """Split a multi-id Figma nodes response into single-node responses keyed by requested id"""
+    nodes = node_data.get("nodes", {})
+    responses = {}
+    for node_id in node_ids:
+        # Figma answers with "1:2" keys even when the request used "1-2"
+        item = nodes.get(node_id, nodes.get(node_id.replace("-", ":")))
+        if item is not None:
+            responses[node_id] = NodeResponse({"nodes": {node_id: item}})
+    return responses
+
+def get_cached_nodes(file_key, node_ids, version):
+    """Split node ids into cached single-node responses and ids that still need fetching"""
+    responses = {}
+    uncached = []
+    for node_id in dict.fromkeys(node_ids):
+        node_data = figma_node_cache.get((file_key, node_id, version)) if version else None
+        if node_data is not None:
+            responses[node_id] = node_data
+        else:
+            uncached.append(node_id)
+    return responses, uncached
+
+def convert_batch_nodes(node_ids, responses, errors):
+    """Convert every node of a batch in request order, reporting fetch errors per node"""
+    return [
+        {"node_id": node_id, "error": f"Failed to convert Figma to React: {errors[node_id]}"}
+        if node_id in errors else convert_batch_node(node_id, responses.get(node_id))
+        for node_id in node_ids
+    ]
+
+async def convert_batch_nodes_async(node_ids, responses, errors):
+    """Async version of convert_batch_nodes"""
+    return [
+        {"node_id": node_id, "error": f"Failed to convert Figma to React: {errors[node_id]}"}
+        if node_id in errors else await convert_batch_node_async(node_id, responses.get(node_id))
+        for node_id in node_ids
+    ]
+
+async def convert_batch_node_async(node_id, node_data):
+    """Async version of convert_batch_node"""
+    try:
+        if node_data is None:
+            raise Exception("Node not found in response")
+        node = extract_target_node(node_data, node_id)
+        content_hash = await response_node_hash_async(node_data, node_id, node)
+        return {"node_id": node_id, "code": await node_to_react_async(node, content_hash)}
+    except Exception as e:
+        return {"node_id": node_id, "error": f"Failed to convert Figma to React: {str(e)}"}
+
+def convert_batch_node(node_id, node_data):
+    """Convert one node of a batch, returning its code or its error"""
+    try:
+        if node_data is None:
+            raise Exception("Node not found in response")
+        node = extract_target_node(node_data, node_id)
+        return {"node_id": node_id, "code": node_to_react(node)}
+    except Exception as e:
+        return {"node_id": node_id, "error": f"Failed to convert Figma to React: {str(e)}"}
+
+def figma_to_react_batch(file_key, node_ids, chunk_size=None):
+    """Convert many Figma nodes to React components using chunked multi-id node requests"""
+    with batch_priority():
+        return convert_figma_batch(file_key, node_ids, chunk_size)
+
+def convert_figma_batch(file_key, node_ids, chunk_size=None):
+    """Fetch and convert the nodes of figma_to_react_batch"""
+    try:
+        version = get_figma_file_version(file_key)
+    except Exception as e:
+        logger.warning(f"Could not check version of Figma file {file_key}, fetching nodes: {str(e)}")
+        version = None
+    
+    # Reuse cached responses for nodes unchanged at this version
+    responses, uncached = get_cached_nodes(file_key, node_ids, version)
+    
+    errors = {}
+    for chunk in chunk_node_ids(uncached, chunk_size):
+        try:
+            chunk_responses = split_batch_response(fetch_figma_node(file_key, ",".join(chunk)), chunk)
+        except Exception as e:
+            for node_id in chunk:
+                errors[node_id] = str(e)
+            continue
+        for node_id, node_data in chunk_responses.items():
+            responses[node_id] = node_data
+            if version:
+                figma_node_cache.set((file_key, node_id, version), node_data)
+    
+    logger.info(f"Converting {len(node_ids)} Figma nodes ({len(uncached)} fetched)")
+    return convert_batch_nodes(node_ids, responses, errors)
+
+async def figma_to_react_batch_async(file_key, node_ids, chunk_size=None):
+    """Async version of figma_to_react_batch; chunks are fetched concurrently"""
+    with batch_priority():
+        return await convert_figma_batch_async(file_key, node_ids, chunk_size)
+
+async def convert_figma_batch_async(file_key, node_ids, chunk_size=None):
+    """Async version of convert_figma_batch"""
+    responses, errors = await fetch_figma_batch_async(file_key, node_ids, chunk_size)
+    return await convert_batch_nodes_async(node_ids, responses, errors)
+
+async def fetch_figma_batch_async(file_key, node_ids, chunk_size=None):
+    """Fetch the single-node responses of a batch concurrently, returning (responses, fetch errors) keyed by node id"""
+    try:
+        version = await get_figma_file_version_async(file_key)
+    except Exception as e:
+        logger.warning(f"Could not check version of Figma file {file_key}, fetching nodes: {str(e)}")
+        version = None
+    
+    # Reuse cached responses for nodes unchanged at this version
+    responses, uncached = get_cached_nodes(file_key, node_ids, version)
+    
+    chunks = chunk_node_ids(uncached, chunk_size)
+    chunk_results = await asyncio.gather(
+        *[fetch_figma_node_async(file_key, ",".join(chunk)) for chunk in chunks],
+        return_exceptions=True
+    )
+    
+    errors = {}
+    for chunk, result in zip(chunks, chunk_results):
+        if isinstance(result, Exception):
+            for node_id in chunk:
+                errors[node_id] = str(result)
+            continue
+        for node_id, node_data in split_batch_response(result, chunk).items():
+            responses[node_id] = node_data
+            if version:
+                figma_node_cache.set((file_key, node_id, version), node_data)
+    
+    logger.info(f"Fetched {len(uncached)} of {len(node_ids)} Figma nodes")
+    return responses, errors
\ No newline at end of file
@@ -0,0 +1,154 @@
+import os
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import observe_upstream
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('http_clients')
+
+# Connection pool configuration, shared by the sync and async clients
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# Pooled sync sessions, one per upstream host
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Shared async HTTP client, created at app startup
+_async_client = None
+
+def get_session(url):
+    """
+    Get the pooled session for the host of a URL
+
+    Each upstream host (api.figma.com, api.iconify.design, ...) gets its own
+    requests.Session with a keep-alive connection pool, so repeated calls
+    reuse TCP and TLS connections instead of handshaking every time.
+
+    Args:
+        url: Request URL
+
+    Returns:
+        requests.Session for the URL's host
+    """
+    host = urlparse(url).netloc
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            logger.info(f"Creating pooled HTTP session for {host} (pool size {HTTP_POOL_SIZE})")
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Connection"] = "keep-alive"
+            _sessions[host] = session
+    return session
+
+def http_get(url, **kwargs):
+    """
+    GET a URL through the pooled session for its host
+
+    Applies the configured connect/read timeouts unless the caller passes
+    its own timeout.
+
+    Args:
+        url: Request URL
+        **kwargs: Extra arguments for requests.Session.get
+
+    Returns:
+        requests.Response
+    """
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    host = urlparse(url).netloc
+    start = time.perf_counter()
+    try:
+        response = get_session(url).get(url, **kwargs)
+    except Exception:
+        observe_upstream(host, "error", time.perf_counter() - start)
+        raise
+    observe_upstream(host, response.status_code, time.perf_counter() - start)
+    return response
+
+def close_sessions():
+    """
+    Close all pooled sync sessions
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+async def start_request_timer(request):
+    request.extensions["started_at"] = time.perf_counter()
+
+async def record_response(response):
+    started_at = response.request.extensions.get("started_at")
+    if started_at is not None:
+        observe_upstream(response.request.url.host, response.status_code, time.perf_counter() - started_at)
+
+def create_async_client():
+    """
+    Create an async HTTP client with the configured pool size and timeouts
+
+    Returns:
+        httpx.AsyncClient instance
+    """
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_SIZE,
+        max_keepalive_connections=HTTP_POOL_SIZE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    # Hooks record upstream request counts and latency for /metrics
+    event_hooks = {"request": [start_request_timer], "response": [record_response]}
+    return httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True, event_hooks=event_hooks)
+
+async def start_async_client():
+    """
+    Create the shared async HTTP client
+
+    Called once from the FastAPI startup hook so every request handler
+    reuses the same connection pool.
+    """
+    global _async_client
+    if _async_client is None:
+        logger.info("Starting shared async HTTP client")
+        _async_client = create_async_client()
+    return _async_client
+
+async def close_async_client():
+    """
+    Close the shared async HTTP client and release its connections
+    """
+    global _async_client
+    if _async_client is not None:
+        logger.info("Closing shared async HTTP client")
+        await _async_client.aclose()
+        _async_client = None
+
+def get_async_client():
+    """
+    Get the shared async HTTP client
+
+    Falls back to creating the client lazily when used outside the app
+    (e.g. from a script), so callers never have to check for startup.
+
+    Returns:
+        httpx.AsyncClient instance
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = create_async_client()
+    return _async_client
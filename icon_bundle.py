@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from cache import LRUCache
+from singleflight import SingleFlight
+from iconify_tools import get_icons_svg_async
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('icon_bundle')
+
+# Built bundles cached by a hash of the format and sorted icon list, and
+# rebuilt after ICON_BUNDLE_CACHE_TTL seconds to pick up changed icon data
+ICON_BUNDLE_CACHE_SIZE = int(os.getenv("ICON_BUNDLE_CACHE_SIZE", "200"))
+ICON_BUNDLE_CACHE_TTL = float(os.getenv("ICON_BUNDLE_CACHE_TTL", "3600"))
+bundle_cache = LRUCache(ICON_BUNDLE_CACHE_SIZE, ttl=ICON_BUNDLE_CACHE_TTL)
+bundle_flight = SingleFlight()
+
+# Maximum number of icons per bundle
+MAX_BUNDLE_ICONS = 500
+
+BUNDLE_FORMATS = ("svg", "js")
+
+# Longest X-Missing-Icons header value; proxies commonly reject headers past 8 KB
+MAX_MISSING_ICONS_HEADER = 2048
+
+COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+BETWEEN_TAGS_PATTERN = re.compile(r">\s+<")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def minify_svg(body):
+    """
+    Strip comments and redundant whitespace from SVG markup
+
+    Args:
+        body: SVG markup
+
+    Returns:
+        Minified markup
+    """
+    body = COMMENT_PATTERN.sub("", body)
+    body = BETWEEN_TAGS_PATTERN.sub("><", body)
+    return WHITESPACE_PATTERN.sub(" ", body).strip()
+
+def symbol_id(icon_name):
+    """Turn a full icon name (prefix:name) into a valid element id"""
+    return re.sub(r"[^A-Za-z0-9_-]", "-", icon_name)
+
+def bundle_key(icon_names, bundle_format):
+    """
+    Hash a bundle request
+
+    Args:
+        icon_names: Full icon names; order and duplicates do not matter
+        bundle_format: "svg" or "js"
+
+    Returns:
+        Hex digest used as cache key
+    """
+    payload = "\n".join([bundle_format] + sorted(set(icon_names)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def missing_icons_header(missing):
+    """
+    List missing icons for the X-Missing-Icons header
+
+    Args:
+        missing: Full names of icons that were not found
+
+    Returns:
+        Comma-separated names, cut after the last whole name that fits in
+        MAX_MISSING_ICONS_HEADER characters (X-Missing-Icons-Count has the total)
+    """
+    value = ",".join(missing)
+    if len(value) <= MAX_MISSING_ICONS_HEADER:
+        return value
+    return value[:value.rfind(",", 0, MAX_MISSING_ICONS_HEADER + 1)].rstrip(",")
+
+def dedupe_icons(icons):
+    """
+    Group icons with identical artwork
+
+    Args:
+        icons: List of (icon name, SVG data)
+
+    Returns:
+        List of (minified body, width, height, icon names) in first-seen order
+    """
+    groups = {}
+    for icon_name, svg_data in icons:
+        key = (minify_svg(svg_data["body"]), svg_data.get("width", 24), svg_data.get("height", 24))
+        groups.setdefault(key, []).append(icon_name)
+    return [(body, width, height, names) for (body, width, height), names in groups.items()]
+
+def build_symbol_sprite(icons):
+    """
+    Build an SVG sprite with one <symbol> per icon
+
+    Icons with identical artwork (e.g. aliases) reference the first symbol
+    with <use> instead of repeating the body.
+
+    Args:
+        icons: List of (icon name, SVG data)
+
+    Returns:
+        SVG document
+    """
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" style="display:none">']
+    for body, width, height, names in dedupe_icons(icons):
+        first_id = symbol_id(names[0])
+        parts.append(f'<symbol id="{first_id}" viewBox="0 0 {width} {height}">{body}</symbol>')
+        for name in names[1:]:
+            parts.append(f'<symbol id="{symbol_id(name)}" viewBox="0 0 {width} {height}"><use href="#{first_id}"/></symbol>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+def build_js_bundle(icons):
+    """
+    Build an ES module exporting icon data keyed by full icon name
+
+    Bodies are stored once and shared by icons with identical artwork.
+
+    Args:
+        icons: List of (icon name, SVG data)
+
+    Returns:
+        JavaScript source
+    """
+    bodies = []
+    entries = []
+    for position, (body, width, height, names) in enumerate(dedupe_icons(icons)):
+        bodies.append(json.dumps(body))
+        for name in names:
+            entries.append(f"{json.dumps(name)}:i({position},{json.dumps(width)},{json.dumps(height)})")
+    return (
+        f"const b=[{','.join(bodies)}];\n"
+        "const i=(n,w,h)=>({body:b[n],width:w,height:h});\n"
+        f"export default {{{','.join(entries)}}};\n"
+    )
+
+async def build_icon_bundle(icon_names, bundle_format="svg"):
+    """
+    Build (or reuse) a sprite or JS bundle for a set of icons
+
+    Args:
+        icon_names: Full icon names (prefix:name)
+        bundle_format: "svg" for a <symbol> sprite, "js" for an ES module
+
+    Returns:
+        Dictionary with content, etag (a hash of the content, None when
+        icons are missing) and the names of icons that were not found
+    """
+    if bundle_format not in BUNDLE_FORMATS:
+        raise Exception(f"Unsupported bundle format: {bundle_format}")
+    icon_names = sorted(set(icon_names))
+    if not icon_names:
+        raise Exception("No icons requested")
+    if len(icon_names) > MAX_BUNDLE_ICONS:
+        raise Exception(f"At most {MAX_BUNDLE_ICONS} icons per bundle")
+
+    cache_key = bundle_key(icon_names, bundle_format)
+    bundle = bundle_cache.get(cache_key)
+    if bundle is not None:
+        return bundle
+
+    async def build():
+        svg_results = await get_icons_svg_async(icon_names)
+        icons = [(name, svg_results[name]) for name in icon_names if svg_results.get(name, {}).get("body")]
+        missing = [name for name in icon_names if not svg_results.get(name, {}).get("body")]
+        content = build_symbol_sprite(icons) if bundle_format == "svg" else build_js_bundle(icons)
+        # The ETag hashes the content, so changed artwork never matches an old
+        # one. Missing icons may be transient upstream failures, so such
+        # bundles are neither cached nor given an ETag.
+        etag = None if missing else hashlib.sha256(content.encode("utf-8")).hexdigest()
+        bundle = {"content": content, "etag": etag, "missing": missing}
+        if not missing:
+            bundle_cache.set(cache_key, bundle)
+        logger.info(f"Built {bundle_format} bundle of {len(icons)} icons ({len(content)} bytes)")
+        return bundle
+
+    return await bundle_flight.do_async(cache_key, build)
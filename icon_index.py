@@ -0,0 +1,437 @@
+import os
+import re
+import json
+import bisect
+import heapq
+import logging
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('icon_index')
+
+# Ranking weights per matched field
+FULL_NAME_WEIGHT = 6
+NAME_WEIGHT = 4
+PREFIX_WEIGHT = 2
+TAG_WEIGHT = 1
+
+# Sorts after every character, so [term, term + TOKEN_END) spans all tokens starting with term
+TOKEN_END = "\U0010ffff"
+
+TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens
+
+    Args:
+        text: Text to split (icon name, tag, query)
+
+    Returns:
+        List of tokens
+    """
+    return [token for token in TOKEN_SPLIT.split(text.lower()) if token]
+
+def icon_tokens(prefix, name, tags, collection_name):
+    """
+    Get the index tokens of one icon with their field weights
+
+    Args:
+        prefix: Collection prefix
+        name: Icon name within the collection
+        tags: List of tags (collection categories)
+        collection_name: Display name of the collection
+
+    Returns:
+        Dictionary of token to weight (the highest weight per token)
+    """
+    weights = {}
+
+    def add(token, weight):
+        if weights.get(token, 0) < weight:
+            weights[token] = weight
+
+    add(name.lower(), FULL_NAME_WEIGHT)
+    for token in tokenize(name):
+        add(token, NAME_WEIGHT)
+    for token in tokenize(prefix):
+        add(token, PREFIX_WEIGHT)
+    for token in tokenize(collection_name):
+        add(token, TAG_WEIGHT)
+    for tag in tags:
+        for token in tokenize(tag):
+            add(token, TAG_WEIGHT)
+    return weights
+
+def score_terms(terms, expand, posting_count, postings):
+    """
+    Score the icons matching every query term
+
+    Terms are processed from the one with the fewest postings, so later
+    terms only have to check the icons still in the running.
+
+    Args:
+        terms: Query tokens
+        expand: Function of a term to a list of (token, exact match) for
+            the index tokens equal to or starting with it
+        posting_count: Function of a token to its number of postings
+        postings: Function of a token to a dictionary of icon id to weight
+
+    Returns:
+        Dictionary of icon id to score (empty when a term matches nothing)
+    """
+    expanded = []
+    for term in terms:
+        tokens = expand(term)
+        if not tokens:
+            return {}
+        expanded.append((sum(posting_count(token) for token, _ in tokens), tokens))
+    expanded.sort(key=lambda item: item[0])
+
+    scores = None
+    for _, tokens in expanded:
+        term_scores = {}
+        for token, exact in tokens:
+            factor = 2 if exact else 1
+            token_postings = postings(token)
+            if scores is not None and len(scores) < len(token_postings):
+                # Probe the remaining candidates instead of walking a long list
+                matches = ((icon_id, token_postings[icon_id]) for icon_id in scores if icon_id in token_postings)
+            else:
+                matches = token_postings.items()
+            for icon_id, weight in matches:
+                if scores is not None and icon_id not in scores:
+                    continue
+                score = weight * factor
+                if term_scores.get(icon_id, 0) < score:
+                    term_scores[icon_id] = score
+
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {icon_id: scores[icon_id] + score for icon_id, score in term_scores.items()}
+        if not scores:
+            return {}
+    return scores
+
+def top_ranked(candidates, sort_key, limit, accept=None):
+    """
+    Pick the best candidates without sorting all of them
+
+    Args:
+        candidates: Iterable of candidates (re-iterable)
+        sort_key: Function of a candidate to its rank (lowest first)
+        limit: Number of candidates wanted
+        accept: Optional filter, applied lazily to the best candidates only
+
+    Returns:
+        Up to limit accepted candidates, best first
+    """
+    size = limit
+    while True:
+        best = heapq.nsmallest(size, candidates, key=sort_key)
+        results = [candidate for candidate in best if accept is None or accept(candidate)]
+        if len(results) >= limit or len(best) < size:
+            return results[:limit]
+        # The filter rejected too many; look further down the ranking
+        size *= 4
+
+def resolve_collection_icon(data, name):
+    """
+    Resolve one icon from Iconify collection JSON, following aliases
+
+    Args:
+        data: Collection JSON (icons, aliases, width, height)
+        name: Icon name within the collection (without prefix)
+
+    Returns:
+        SVG data (body, width, height) or None if the icon does not exist
+    """
+    icons = data.get("icons", {})
+    aliases = data.get("aliases", {})
+    icon = icons.get(name)
+    overrides = {}
+
+    # Follow alias chains to the parent icon, keeping the alias's own overrides
+    seen = set()
+    current = name
+    while icon is None and current in aliases and current not in seen:
+        seen.add(current)
+        alias = aliases[current]
+        for key, value in alias.items():
+            if key != "parent":
+                overrides.setdefault(key, value)
+        current = alias.get("parent")
+        icon = icons.get(current)
+
+    if icon is None or "body" not in icon:
+        return None
+
+    # Iconify defaults icon dimensions to 16 when the collection omits them
+    return {
+        "body": icon["body"],
+        "width": overrides.get("width", icon.get("width", data.get("width", 16))),
+        "height": overrides.get("height", icon.get("height", data.get("height", 16)))
+    }
+
+def icon_style(body):
+    """
+    Classify an icon body as "fill" or "stroke" the way Iconify search does
+
+    Args:
+        body: SVG body
+
+    Returns:
+        "stroke" for outline icons drawn with strokes, otherwise "fill"
+    """
+    if "stroke=" in body and 'fill="none"' in body:
+        return "stroke"
+    return "fill"
+
+class IconIndex:
+    """
+    In-process inverted index over Iconify collection JSON
+
+    Indexes icon names, aliases, collection categories (tags) and prefixes,
+    supports prefix matching of query terms and ranks results by field
+    weight. Icon bodies are resolved on demand from the loaded collections
+    or icon stores. Stores that carry their own search index are searched in
+    place and their results merged with the in-memory ones.
+    """
+
+    def __init__(self):
+        self.collections = {}
+        self.stores = []
+        self._names = []
+        self._ids = {}
+        self._hidden = set()
+        self._postings = {}
+        self._tokens = []
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names) + sum(len(store) for store in self.stores if store.searchable)
+
+    def _index_icon(self, prefix, name, tags, collection_name, hidden):
+        """Add postings for one icon; returns False if already indexed"""
+        full_name = f"{prefix}:{name}"
+        if full_name in self._ids:
+            return False
+
+        icon_id = len(self._names)
+        self._names.append(full_name)
+        self._ids[full_name] = icon_id
+
+        if hidden:
+            self._hidden.add(icon_id)
+
+        for token, weight in icon_tokens(prefix, name, tags, collection_name).items():
+            self._postings.setdefault(token, {})[icon_id] = weight
+        return True
+
+    def add_collection(self, data):
+        """
+        Add one Iconify collection (@iconify/json format) to the index
+
+        Args:
+            data: Collection JSON with prefix, icons and optional aliases,
+                categories and info
+
+        Returns:
+            Number of icons and aliases indexed
+        """
+        prefix = data.get("prefix")
+        if not prefix or "icons" not in data:
+            return 0
+
+        with self._lock:
+            self.collections[prefix] = data
+
+            # Map icon names to their categories, used as tags
+            tags = {}
+            for category, names in data.get("categories", {}).items():
+                for name in names:
+                    tags.setdefault(name, []).append(category)
+
+            info_name = data.get("info", {}).get("name", "")
+
+            names = list(data.get("icons", {}).keys()) + list(data.get("aliases", {}).keys())
+            for name in names:
+                hidden = data.get("icons", {}).get(name, {}).get("hidden", False)
+                self._index_icon(prefix, name, tags.get(name, []), info_name, hidden)
+
+            self._dirty = True
+            return len(names)
+
+    def add_store(self, store):
+        """
+        Add a memory-mapped icon store to the index
+
+        Stores built with a search index are searched in place through the
+        mapping. Older stores without one have their names and tags indexed
+        in memory; bodies always stay in the store and are read on lookup.
+
+        Args:
+            store: icon_store.IconStore instance
+
+        Returns:
+            Number of icons added
+        """
+        with self._lock:
+            self.stores.append(store)
+            if store.searchable:
+                logger.info(f"Searching {len(store)} icons in place from store {store.path}")
+                return len(store)
+
+            logger.warning(f"Icon store {store.path} has no search index; indexing it in memory (rebuild it to avoid this)")
+            count = 0
+            for full_name, tags, hidden in store.iter_entries():
+                prefix, name = full_name.split(":", 1)
+                if self._index_icon(prefix, name, tags, store.collections.get(prefix, ""), hidden):
+                    count += 1
+
+            self._dirty = True
+            logger.info(f"Indexed {count} icons from store {store.path}")
+            return count
+
+    def load_file(self, path):
+        """
+        Load one collection JSON file
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            Number of icons indexed (0 for files that are not collections)
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            return 0
+        return self.add_collection(data)
+
+    def load_directory(self, directory):
+        """
+        Load every collection JSON file under a directory
+
+        Works with an unpacked @iconify/json package or loose collection
+        files. Files that are not collections are skipped.
+
+        Args:
+            directory: Directory to scan recursively
+
+        Returns:
+            Number of icons indexed
+        """
+        total = 0
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    total += self.load_file(path)
+                except Exception as e:
+                    logger.error(f"Failed to load icon collection {path}: {str(e)}")
+        logger.info(f"Indexed {total} icons from {len(self.collections)} collections in {directory}")
+        return total
+
+    def _expand_term(self, term):
+        """Find index tokens equal to or starting with a query term, as (token, exact match)"""
+        if self._dirty:
+            with self._lock:
+                self._tokens = sorted(self._postings)
+                self._dirty = False
+
+        start = bisect.bisect_left(self._tokens, term)
+        end = bisect.bisect_left(self._tokens, term + TOKEN_END, start)
+        return [(token, token == term) for token in self._tokens[start:end]]
+
+    def search(self, query, style=None, limit=20, prefix=None):
+        """
+        Search the index
+
+        Every query term must match (exactly or as a token prefix). Exact
+        token matches score double prefix matches. Ties go to the shorter
+        icon name.
+
+        Args:
+            query: Search query
+            style: Optional filter for style (fill, stroke)
+            limit: Maximum number of results to return
+            prefix: Optional collection prefix to restrict results to
+
+        Returns:
+            Full icon names (prefix:name), best match first
+        """
+        terms = tokenize(query)
+        if not terms or limit < 1:
+            return []
+        style = style.lower() if style and style.lower() in ["fill", "stroke"] else None
+
+        stores = [store for store in self.stores if store.searchable]
+        if not stores:
+            return [full_name for _, full_name in self._search_ranked(terms, limit, prefix, style)]
+
+        # Take the best of every source; a name found in several counts once
+        size = limit
+        while True:
+            ranked = self._search_ranked(terms, size, prefix, style)
+            exhausted = len(ranked) < size
+            for store in stores:
+                store_ranked = store.search_ranked(terms, size, prefix, style)
+                exhausted = exhausted and len(store_ranked) < size
+                ranked += store_ranked
+
+            results = []
+            seen = set()
+            for _, full_name in sorted(ranked):
+                if full_name not in seen:
+                    seen.add(full_name)
+                    results.append(full_name)
+            if len(results) >= limit or exhausted:
+                return results[:limit]
+            size *= 2
+
+    def _search_ranked(self, terms, limit, prefix, style):
+        """Search the in-memory postings; returns ((-score, name length, name), name) pairs"""
+        scores = score_terms(terms, self._expand_term, lambda token: len(self._postings[token]), self._postings.__getitem__)
+
+        names = self._names
+        candidates = [icon_id for icon_id in scores if icon_id not in self._hidden]
+        if prefix:
+            candidates = [icon_id for icon_id in candidates if names[icon_id].startswith(f"{prefix}:")]
+
+        def accept(icon_id):
+            icon = self.get_icon(names[icon_id])
+            return icon is not None and icon_style(icon["body"]) == style
+
+        def rank(icon_id):
+            return (-scores[icon_id], len(names[icon_id]), names[icon_id])
+
+        ranked = top_ranked(candidates, rank, limit, accept if style else None)
+        return [(rank(icon_id), names[icon_id]) for icon_id in ranked]
+
+    def get_icon(self, icon_name):
+        """
+        Get SVG data for an icon from the loaded collections
+
+        Args:
+            icon_name: Full icon name (prefix:name)
+
+        Returns:
+            SVG data (body, width, height) or None if not indexed
+        """
+        parts = icon_name.split(":")
+        if len(parts) != 2:
+            return None
+        data = self.collections.get(parts[0])
+        if data is not None:
+            return resolve_collection_icon(data, parts[1])
+        for store in self.stores:
+            icon = store.get(icon_name)
+            if icon is not None:
+                return icon
+        return None
@@ -0,0 +1,244 @@
+import os
+import re
+import math
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from cache import LRUCache
+from singleflight import SingleFlight
+from iconify_tools import get_icon_svg_data_async, get_icons_svg_async
+
+try:
+    import cairosvg
+except (ImportError, OSError):
+    # OSError: the package is installed but the cairo library is not
+    cairosvg = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('icon_raster')
+
+# Rendering runs in worker processes so it never blocks the event loop
+ICON_RASTER_WORKERS = int(os.getenv("ICON_RASTER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Rendered PNGs cached by (icon, size, color)
+ICON_RASTER_CACHE_SIZE = int(os.getenv("ICON_RASTER_CACHE_SIZE", "1000"))
+raster_cache = LRUCache(ICON_RASTER_CACHE_SIZE)
+
+# Limits on requested bitmaps
+ICON_RASTER_MAX_SIZE = int(os.getenv("ICON_RASTER_MAX_SIZE", "1024"))
+MAX_SPRITE_ICONS = 256
+
+DEFAULT_SIZE = 24
+
+# Hex colors or CSS color names; anything else could inject markup into the SVG
+COLOR_PATTERN = re.compile(r"^(#[0-9a-fA-F]{3,8}|[a-zA-Z]+)$")
+
+_raster_pool = None
+raster_flight = SingleFlight()
+
+def get_raster_pool():
+    """Get the rendering process pool, starting it on first use"""
+    global _raster_pool
+    if _raster_pool is None:
+        _raster_pool = ProcessPoolExecutor(max_workers=max(1, ICON_RASTER_WORKERS))
+    return _raster_pool
+
+def close_raster_pool():
+    """Shut down the rendering process pool"""
+    global _raster_pool
+    if _raster_pool is not None:
+        _raster_pool.shutdown(wait=False, cancel_futures=True)
+        _raster_pool = None
+
+def check_raster_options(size, color):
+    """
+    Validate rasterization options
+
+    Args:
+        size: Bitmap height in pixels
+        color: Color for currentColor, or None
+
+    Returns:
+        (size, color) with defaults applied
+    """
+    if cairosvg is None:
+        raise Exception("PNG rendering requires cairosvg (pip install cairosvg) and the cairo library")
+    size = size or DEFAULT_SIZE
+    if size < 1 or size > ICON_RASTER_MAX_SIZE:
+        raise Exception(f"Size must be between 1 and {ICON_RASTER_MAX_SIZE}")
+    if color and not COLOR_PATTERN.match(color):
+        raise Exception(f"Invalid color: {color}")
+    return size, color or None
+
+def scaled_width(svg_data, size):
+    """Width of an icon scaled to the given height, keeping its aspect ratio"""
+    width = float(svg_data.get("width") or DEFAULT_SIZE)
+    height = float(svg_data.get("height") or DEFAULT_SIZE)
+    return max(1, round(size * width / height))
+
+def icon_svg_element(svg_data, size, x=0, y=0):
+    """
+    Build an <svg> element for an icon scaled to a height
+
+    Args:
+        svg_data: SVG data (body, width, height)
+        size: Height in pixels
+        x, y: Position, for placing the icon inside a sprite sheet
+
+    Returns:
+        SVG markup
+    """
+    width = svg_data.get("width") or DEFAULT_SIZE
+    height = svg_data.get("height") or DEFAULT_SIZE
+    return (
+        f'<svg x="{x}" y="{y}" width="{scaled_width(svg_data, size)}" height="{size}" '
+        f'viewBox="0 0 {width} {height}">{svg_data["body"]}</svg>'
+    )
+
+def svg_document(content, width, height, color=None):
+    """Wrap SVG markup in a standalone document, replacing currentColor the way Iconify does"""
+    if color:
+        content = content.replace("currentColor", color)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}">{content}</svg>'
+    )
+
+def build_sprite_svg(icons, size, columns=None):
+    """
+    Lay icons out on a grid in one SVG document
+
+    Args:
+        icons: List of (icon name, SVG data) in sheet order
+        size: Cell height in pixels; cells are as wide as the widest icon
+        columns: Icons per row (defaults to a roughly square sheet)
+
+    Returns:
+        (SVG markup without the outer document, sheet width, sheet height,
+        layout of icon name to {x, y, width, height})
+    """
+    columns = max(1, min(columns or math.ceil(math.sqrt(len(icons))), len(icons)))
+    cell_width = max(scaled_width(svg_data, size) for _, svg_data in icons)
+    elements = []
+    layout = {}
+    for position, (icon_name, svg_data) in enumerate(icons):
+        x = (position % columns) * cell_width
+        y = (position // columns) * size
+        elements.append(icon_svg_element(svg_data, size, x, y))
+        layout[icon_name] = {"x": x, "y": y, "width": scaled_width(svg_data, size), "height": size}
+    rows = math.ceil(len(icons) / columns)
+    return "".join(elements), columns * cell_width, rows * size, layout
+
+def render_png(document):
+    """Rasterize an SVG document to PNG bytes (runs in a worker process)"""
+    return cairosvg.svg2png(bytestring=document.encode("utf-8"))
+
+async def render_in_pool(document):
+    """Rasterize an SVG document in the process pool"""
+    return await asyncio.get_running_loop().run_in_executor(get_raster_pool(), render_png, document)
+
+async def render_icon_png(icon_name, size=None, color=None):
+    """
+    Render an icon as a PNG, served from the render cache when possible
+
+    Args:
+        icon_name: Full icon name (prefix:name)
+        size: Height in pixels (defaults to 24)
+        color: Color used for currentColor (hex or CSS name)
+
+    Returns:
+        PNG bytes
+    """
+    size, color = check_raster_options(size, color)
+    cache_key = (icon_name, size, color)
+    png = raster_cache.get(cache_key)
+    if png is not None:
+        return png
+
+    async def render():
+        svg_data = await get_icon_svg_data_async(icon_name)
+        if not svg_data.get("body"):
+            raise Exception(f"Icon not found: {icon_name}")
+        document = svg_document(icon_svg_element(svg_data, size), scaled_width(svg_data, size), size, color)
+        png = await render_in_pool(document)
+        raster_cache.set(cache_key, png)
+        return png
+
+    return await raster_flight.do_async(cache_key, render)
+
+def check_sprite_icons(icon_names):
+    """Deduplicate the icons of a sprite sheet, keeping their order, and check the count"""
+    icon_names = list(dict.fromkeys(icon_names))
+    if not icon_names:
+        raise Exception("No icons requested")
+    if len(icon_names) > MAX_SPRITE_ICONS:
+        raise Exception(f"At most {MAX_SPRITE_ICONS} icons per sprite sheet")
+    return icon_names
+
+async def fetch_sprite_icons(icon_names):
+    """Fetch the SVG data of a sprite sheet's icons, as (icon name, SVG data) for the ones found"""
+    svg_results = await get_icons_svg_async(icon_names)
+    icons = [(name, svg_results[name]) for name in icon_names if svg_results.get(name, {}).get("body")]
+    if not icons:
+        raise Exception("None of the requested icons were found")
+    return icons
+
+async def render_sprite_png(icon_names, size=None, color=None, columns=None):
+    """
+    Render several icons into one PNG sprite sheet
+
+    Args:
+        icon_names: Full icon names (prefix:name), in sheet order
+        size: Cell height in pixels (defaults to 24)
+        color: Color used for currentColor (hex or CSS name)
+        columns: Icons per row (defaults to a roughly square sheet)
+
+    Returns:
+        PNG bytes; see get_sprite_layout for the icon positions
+    """
+    size, color = check_raster_options(size, color)
+    icon_names = check_sprite_icons(icon_names)
+
+    cache_key = ("sprite", tuple(icon_names), size, color, columns)
+    cached = raster_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def render():
+        content, width, height, _ = build_sprite_svg(await fetch_sprite_icons(icon_names), size, columns)
+        png = await render_in_pool(svg_document(content, width, height, color))
+        raster_cache.set(cache_key, png)
+        return png
+
+    return await raster_flight.do_async(cache_key, render)
+
+async def get_sprite_layout(icon_names, size=None, columns=None):
+    """
+    Get the icon positions of the sprite sheet render_sprite_png draws for
+    the same icons, size and columns (the color does not change the layout)
+
+    Args:
+        icon_names: Full icon names (prefix:name), in sheet order
+        size: Cell height in pixels (defaults to 24)
+        columns: Icons per row (defaults to a roughly square sheet)
+
+    Returns:
+        Dictionary with the sheet width and height and icons, a dictionary
+        of icon name to {x, y, width, height}
+    """
+    size, _ = check_raster_options(size, None)
+    icon_names = check_sprite_icons(icon_names)
+
+    cache_key = ("sprite_layout", tuple(icon_names), size, columns)
+    cached = raster_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def build():
+        _, width, height, layout = build_sprite_svg(await fetch_sprite_icons(icon_names), size, columns)
+        result = {"width": width, "height": height, "icons": layout}
+        raster_cache.set(cache_key, result)
+        return result
+
+    return await raster_flight.do_async(cache_key, build)
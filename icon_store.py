@@ -0,0 +1,394 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import logging
+import argparse
+from icon_index import resolve_collection_icon, icon_tokens, icon_style, score_terms, top_ranked, tokenize
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('icon_store')
+
+# File layout, in the order written (all integers little-endian):
+#
+#   header   magic, entry count, offsets of the entry table, strings and
+#            metadata sections, metadata length (see HEADER)
+#   search   offsets of the token table and postings, token count (see SEARCH_HEADER)
+#   bodies   UTF-8 icon bodies, back to back
+#   entries  fixed-size records sorted by "prefix:name" (see ENTRY)
+#   tokens   fixed-size records sorted by token (see TOKEN)
+#   postings (entry position, weight) records, grouped by token (see POSTING)
+#   strings  UTF-8 keys, comma-separated tags and tokens referenced above
+#   meta     JSON with collection info ({"collections": {prefix: name}})
+#
+# The token table and postings are the search index (the same tokens and
+# weights IconIndex builds in memory), so a store is searched straight from
+# the mapping. Stores with the old magic have no search index.
+STORE_MAGIC = b"ICONSTR2"
+STORE_MAGIC_V1 = b"ICONSTR1"
+HEADER = struct.Struct("<8sIQQQI")
+SEARCH_HEADER = struct.Struct("<QQI")
+# key offset, key length, tags length, hidden flag, tags offset,
+# width, height, body offset, body length
+ENTRY = struct.Struct("<IHHBxxxIddQI")
+# token offset, token length, first posting, posting count
+TOKEN = struct.Struct("<IHxxII")
+# entry position, weight
+POSTING = struct.Struct("<IB")
+
+# Sorts after every UTF-8 byte sequence, so [key, key + KEY_END) spans all keys starting with key
+KEY_END = b"\xff"
+
+def build_store(data_dir, output_path):
+    """
+    Convert Iconify collection JSON into a compact icon store file
+
+    Every icon and alias is resolved to its final body and dimensions, so
+    lookups never need the collection JSON at runtime. Icon names, tags and
+    collection names are tokenized into a search index stored alongside.
+
+    Args:
+        data_dir: Directory of Iconify collection JSON (e.g. @iconify/json)
+        output_path: Store file to write
+
+    Returns:
+        Number of icons written
+    """
+    records = []
+    collections = {}
+
+    for root, _, files in os.walk(data_dir):
+        for filename in sorted(files):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(root, filename)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"Failed to read {path}: {str(e)}")
+                continue
+
+            prefix = data.get("prefix") if isinstance(data, dict) else None
+            if not prefix or "icons" not in data or prefix in collections:
+                continue
+            collections[prefix] = data.get("info", {}).get("name", "")
+
+            tags = {}
+            for category, names in data.get("categories", {}).items():
+                for name in names:
+                    tags.setdefault(name, []).append(category)
+
+            for name in dict.fromkeys(list(data["icons"]) + list(data.get("aliases", {}))):
+                icon = resolve_collection_icon(data, name)
+                if icon is None:
+                    continue
+                hidden = bool(data["icons"].get(name, {}).get("hidden"))
+                records.append((
+                    f"{prefix}:{name}".encode("utf-8"),
+                    ",".join(tags.get(name, [])).encode("utf-8"),
+                    hidden,
+                    icon
+                ))
+
+    records.sort(key=lambda record: record[0])
+
+    # Postings refer to entries by position, so build them after sorting.
+    # Hidden icons resolve by name but are never search results.
+    postings = {}
+    for position, (key, tags, hidden, _) in enumerate(records):
+        if hidden:
+            continue
+        prefix, name = key.decode("utf-8").split(":", 1)
+        tag_list = tags.decode("utf-8").split(",") if tags else []
+        for token, weight in icon_tokens(prefix, name, tag_list, collections[prefix]).items():
+            postings.setdefault(token.encode("utf-8"), []).append((position, weight))
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * (HEADER.size + SEARCH_HEADER.size))
+
+        # Bodies
+        body_refs = []
+        for _, _, _, icon in records:
+            body = icon["body"].encode("utf-8")
+            body_refs.append((f.tell(), len(body)))
+            f.write(body)
+
+        # Entries, with keys and tags laid out in the strings section
+        entry_offset = f.tell()
+        strings = bytearray()
+        for (key, tags, hidden, icon), (body_offset, body_length) in zip(records, body_refs):
+            key_offset = len(strings)
+            strings += key
+            tags_offset = len(strings)
+            strings += tags
+            f.write(ENTRY.pack(
+                key_offset, len(key), len(tags), int(hidden), tags_offset,
+                float(icon["width"]), float(icon["height"]), body_offset, body_length
+            ))
+
+        # Token table and postings, with tokens laid out in the strings section
+        tokens_offset = f.tell()
+        first_posting = 0
+        for token in sorted(postings):
+            token_offset = len(strings)
+            strings += token
+            f.write(TOKEN.pack(token_offset, len(token), first_posting, len(postings[token])))
+            first_posting += len(postings[token])
+
+        postings_offset = f.tell()
+        for token in sorted(postings):
+            f.write(b"".join(POSTING.pack(position, weight) for position, weight in postings[token]))
+
+        strings_offset = f.tell()
+        f.write(strings)
+
+        meta_offset = f.tell()
+        meta = json.dumps({"collections": collections}).encode("utf-8")
+        f.write(meta)
+
+        f.seek(0)
+        f.write(HEADER.pack(STORE_MAGIC, len(records), entry_offset, strings_offset, meta_offset, len(meta)))
+        f.write(SEARCH_HEADER.pack(tokens_offset, postings_offset, len(postings)))
+
+    os.replace(tmp_path, output_path)
+    logger.info(f"Wrote {len(records)} icons and {len(postings)} search tokens from {len(collections)} collections to {output_path}")
+    return len(records)
+
+def number(value):
+    """Return whole-number floats as ints, matching the collection JSON"""
+    return int(value) if value.is_integer() else value
+
+class IconStore:
+    """
+    Read-only, memory-mapped view of an icon store file
+
+    Only the header and metadata are parsed on open; icons are found by a
+    binary search over the sorted entry table and read straight from the
+    mapping, so worker processes share the OS page cache and open time does
+    not grow with the size of the library. Searches read the token table
+    and postings from the mapping the same way.
+
+    Args:
+        path: Store file built by build_store
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, self._entry_offset, self._strings_offset, meta_offset, meta_length = \
+            HEADER.unpack_from(self._map, 0)
+        if magic not in (STORE_MAGIC, STORE_MAGIC_V1):
+            self.close()
+            raise Exception(f"Not an icon store file: {path}")
+
+        self.searchable = magic == STORE_MAGIC
+        if self.searchable:
+            self._tokens_offset, self._postings_offset, self._token_count = SEARCH_HEADER.unpack_from(self._map, HEADER.size)
+
+        meta = json.loads(self._map[meta_offset:meta_offset + meta_length])
+        self.collections = meta.get("collections", {})
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self._map, self._entry_offset + position * ENTRY.size)
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._map[start:start + length]
+
+    def _token(self, position):
+        return TOKEN.unpack_from(self._map, self._tokens_offset + position * TOKEN.size)
+
+    def _lower_bound(self, count, record, key, lo=0):
+        """Binary search a sorted table for the first record whose string is >= key"""
+        hi = count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            fields = record(mid)
+            if self._string(fields[0], fields[1]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, icon_name):
+        key = icon_name.encode("utf-8")
+        position = self._lower_bound(self.count, self._entry, key)
+        if position < self.count:
+            entry = self._entry(position)
+            if self._string(entry[0], entry[1]) == key:
+                return entry
+        return None
+
+    def _expand_term(self, term):
+        """Find tokens equal to or starting with a query term, as (token position, exact match)"""
+        key = term.encode("utf-8")
+        start = self._lower_bound(self._token_count, self._token, key)
+        end = self._lower_bound(self._token_count, self._token, key + KEY_END, start)
+        return [(position, self._token(position)[1] == len(key)) for position in range(start, end)]
+
+    def _postings(self, token_position):
+        _, _, first, count = self._token(token_position)
+        start = self._postings_offset + first * POSTING.size
+        return dict(POSTING.iter_unpack(self._map[start:start + count * POSTING.size]))
+
+    def search_ranked(self, terms, limit, prefix=None, style=None):
+        """
+        Search the stored index
+
+        Scores and ranks the same way as IconIndex.search.
+
+        Args:
+            terms: Query tokens (see icon_index.tokenize)
+            limit: Maximum number of results to return
+            prefix: Optional collection prefix to restrict results to
+            style: Optional filter for style ("fill" or "stroke")
+
+        Returns:
+            List of ((-score, name length, name), full icon name), best first
+        """
+        if not self.searchable or not terms or limit < 1:
+            return []
+
+        scores = score_terms(terms, self._expand_term, lambda position: self._token(position)[3], self._postings)
+
+        # Entries are sorted by name, so a collection is one range of positions
+        candidates = scores.keys()
+        if prefix:
+            key = f"{prefix}:".encode("utf-8")
+            lo = self._lower_bound(self.count, self._entry, key)
+            hi = self._lower_bound(self.count, self._entry, key + KEY_END, lo)
+            candidates = [position for position in candidates if lo <= position < hi]
+
+        def accept(position):
+            _, _, _, _, _, _, _, body_offset, body_length = self._entry(position)
+            return icon_style(self._map[body_offset:body_offset + body_length].decode("utf-8")) == style
+
+        # Position order is name order, and names are ASCII in practice, so
+        # the key length stands in for the name length
+        ranked = top_ranked(
+            candidates,
+            lambda position: (-scores[position], self._entry(position)[1], position),
+            limit,
+            accept if style else None
+        )
+
+        results = []
+        for position in ranked:
+            key_offset, key_length = self._entry(position)[:2]
+            full_name = self._string(key_offset, key_length).decode("utf-8")
+            results.append(((-scores[position], len(full_name), full_name), full_name))
+        return results
+
+    def search(self, query, style=None, limit=20, prefix=None):
+        """
+        Search the stored index
+
+        Args:
+            query: Search query
+            style: Optional filter for style (fill, stroke)
+            limit: Maximum number of results to return
+            prefix: Optional collection prefix to restrict results to
+
+        Returns:
+            Full icon names (prefix:name), best match first
+        """
+        style = style.lower() if style and style.lower() in ["fill", "stroke"] else None
+        return [full_name for _, full_name in self.search_ranked(tokenize(query), limit, prefix, style)]
+
+    def get(self, icon_name):
+        """
+        Get SVG data for an icon
+
+        Args:
+            icon_name: Full icon name (prefix:name)
+
+        Returns:
+            SVG data (body, width, height) or None if the icon is not stored
+        """
+        entry = self._find(icon_name)
+        if entry is None:
+            return None
+        _, _, _, _, _, width, height, body_offset, body_length = entry
+        return {
+            "body": self._map[body_offset:body_offset + body_length].decode("utf-8"),
+            "width": number(width),
+            "height": number(height)
+        }
+
+    def __contains__(self, icon_name):
+        return self._find(icon_name) is not None
+
+    def iter_entries(self):
+        """
+        Iterate over stored icons without reading their bodies
+
+        Yields:
+            Tuples of (full icon name, list of tags, hidden flag)
+        """
+        for position in range(self.count):
+            key_offset, key_length, tags_length, hidden, tags_offset = self._entry(position)[:5]
+            key = self._string(key_offset, key_length).decode("utf-8")
+            tags = self._string(tags_offset, tags_length).decode("utf-8")
+            yield key, tags.split(",") if tags else [], bool(hidden)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a compact icon store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Convert Iconify collection JSON into a store file")
+    build_parser.add_argument("data_dir", help="Directory of Iconify collection JSON")
+    build_parser.add_argument("output", help="Store file to write")
+
+    get_parser = subparsers.add_parser("get", help="Print one icon from a store file")
+    get_parser.add_argument("store", help="Store file")
+    get_parser.add_argument("icon_name", help="Full icon name (prefix:name)")
+
+    search_parser = subparsers.add_parser("search", help="Search a store file")
+    search_parser.add_argument("store", help="Store file")
+    search_parser.add_argument("query", help="Search query")
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum number of results")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_store(args.data_dir, args.output)
+        return 0
+
+    store = IconStore(args.store)
+    if args.command == "search":
+        if not store.searchable:
+            store.close()
+            print(f"Store has no search index; rebuild it: {args.store}", file=sys.stderr)
+            return 1
+        for icon_name in store.search(args.query, limit=args.limit):
+            print(icon_name)
+        store.close()
+        return 0
+
+    icon = store.get(args.icon_name)
+    store.close()
+    if icon is None:
+        print(f"Icon not found: {args.icon_name}", file=sys.stderr)
+        return 1
+    print(json.dumps(icon))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
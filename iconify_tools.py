@@ -1,171 +1,851 @@
-import requests
-import logging
-import json
-
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger('iconify_tools')
-
-# Iconify API configuration
-ICONIFY_API_BASE = "https://api.iconify.design"
-
-def get_icon_svg_data(icon_name):
-    """
-    Get raw SVG data for an icon
-    
-    Args:
-        icon_name: Full icon name (prefix:name)
-    
-    Returns:
-        SVG data including body, width, height
-    """
-    try:
-        # First, try to get the JSON data
-        json_url = f"{ICONIFY_API_BASE}/icon/{icon_name}?format=json"
-        json_response = requests.get(json_url)
-        
-        if json_response.status_code == 200:
-            return json_response.json()
-            
-        # If JSON fails, try direct SVG
-        svg_url = f"{ICONIFY_API_BASE}/{icon_name}.svg"
-        svg_response = requests.get(svg_url)
-        
-        if svg_response.status_code == 200:
-            # We got raw SVG, extract the content
-            svg_content = svg_response.text
-            # Create a basic structure similar to the JSON response
-            return {
-                "body": svg_content,
-                "width": 24,  # Default values
-                "height": 24
-            }
-            
-        # If both fail, try the proxy endpoint
-        proxy_url = f"https://icon.iconly.io/{icon_name}.svg"
-        proxy_response = requests.get(proxy_url)
-        
-        if proxy_response.status_code == 200:
-            svg_content = proxy_response.text
-            return {
-                "body": svg_content,
-                "width": 24,
-                "height": 24
-            }
-            
-        logger.warning(f"Failed to get SVG for {icon_name}, status: {json_response.status_code}")
-        return {"body": "", "width": 24, "height": 24}
-        
-    except Exception as e:
-        logger.error(f"Error getting SVG for {icon_name}: {str(e)}")
-        return {"body": "", "width": 24, "height": 24}
-
-def search_icons(query, style=None, limit=20):
-    """
-    Search for icons using the Iconify API
-    
-    Args:
-        query: Search query
-        style: Optional filter for style (fill, stroke)
-        limit: Maximum number of results to return
-    
-    Returns:
-        List of icons matching the search
-    """
-    try:
-        # Build search query with style parameter if provided
-        search_query = query
-        if style and style.lower() in ["fill", "stroke"]:
-            search_query = f"{query} style={style}"
-        
-        logger.info(f"Searching for icons with query: {search_query}, limit: {limit}")
-        
-        # Make API request
-        url = f"{ICONIFY_API_BASE}/search?query={search_query}&limit={limit}"
-        response = requests.get(url)
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to search icons: {response.text}")
-            raise Exception(f"Failed to search icons: {response.text}")
-        
-        data = response.json()
-        logger.info(f"Search returned {len(data.get('icons', []))} icons")
-        icons = data.get("icons", [])
-        
-        # Format results
-        results = []
-        for icon_name in icons:
-            # Icon names are in format "prefix:name"
-            parts = icon_name.split(":")
-            if len(parts) == 2:
-                prefix, name = parts
-                
-                # Get direct SVG data
-                logger.info(f"Fetching SVG data for icon: {icon_name}")
-                svg_data = get_icon_svg_data(icon_name)
-                
-                # Log what we got
-                logger.info(f"SVG data for {icon_name}: width={svg_data.get('width')}, height={svg_data.get('height')}, body length={len(svg_data.get('body', ''))}")
-                
-                results.append({
-                    "prefix": prefix,
-                    "name": name,
-                    "full_name": icon_name,
-                    "svg_url": f"{ICONIFY_API_BASE}/{icon_name}.svg",
-                    "svg_body": svg_data.get("body", ""),
-                    "width": svg_data.get("width", 24),
-                    "height": svg_data.get("height", 24)
-                })
-                
-                # Limit to prevent too many requests
-                if len(results) >= 10:
-                    break
-        
-        logger.info(f"Returning {len(results)} processed icons")
-        return results
-    
-    except Exception as e:
-        logger.error(f"Failed to search icons: {str(e)}")
-        raise Exception(f"Failed to search icons: {str(e)}")
-
-def get_icon_svg(icon_name):
-    """
-    Get SVG data for an icon
-    
-    Args:
-        icon_name: Full icon name (prefix:name)
-    
-    Returns:
-        SVG data for the icon
-    """
-    try:
-        logger.info(f"Getting SVG data for icon: {icon_name}")
-        return get_icon_svg_data(icon_name)
-    
-    except Exception as e:
-        logger.error(f"Failed to get icon SVG: {str(e)}")
-        raise Exception(f"Failed to get icon SVG: {str(e)}")
-
-def get_icon_collections():
-    """
-    Get list of available icon collections
-    
-    Returns:
-        List of icon collections
-    """
-    try:
-        logger.info("Getting icon collections")
-        url = f"{ICONIFY_API_BASE}/collections"
-        response = requests.get(url)
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to get collections: {response.text}")
-            raise Exception(f"Failed to get collections: {response.text}")
-        
-        collections = response.json()
-        logger.info(f"Retrieved {len(collections)} icon collections")
-        return collections
-    
-    except Exception as e:
-        logger.error(f"Failed to get icon collections: {str(e)}")
-        raise Exception(f"Failed to get icon collections: {str(e)}")
\ No newline at end of file
+import os
+import logging
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http_clients import get_async_client, http_get
+from cache import LRUCache, DiskCache, TieredCache
+from icon_index import IconIndex, resolve_collection_icon
+from icon_store import IconStore
+from singleflight import SingleFlight
+from metrics import timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('iconify_tools')
+
+# Iconify API configuration
+ICONIFY_API_BASE = os.getenv("ICONIFY_API_BASE", "https://api.iconify.design")
+
+# Maximum number of concurrent SVG fetches per search
+ICONIFY_MAX_WORKERS = int(os.getenv("ICONIFY_MAX_WORKERS", "8"))
+
+# Maximum number of icons returned with SVG data per search
+MAX_SEARCH_RESULTS = 10
+
+# Icon SVG cache configuration (set ICON_CACHE_DIR to "" to disable the disk tier)
+ICON_CACHE_DIR = os.getenv("ICON_CACHE_DIR", ".cache")
+ICON_CACHE_MEMORY_SIZE = int(os.getenv("ICON_CACHE_MEMORY_SIZE", "2000"))
+ICON_CACHE_DISK_SIZE = int(os.getenv("ICON_CACHE_DISK_SIZE", "100000"))
+ICON_CACHE_DISK_BYTES = int(os.getenv("ICON_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+ICON_CACHE_TTL = float(os.getenv("ICON_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Offline icon index: a directory of Iconify collection JSON (e.g. @iconify/json).
+# When set, searches and icon lookups are answered locally.
+ICONIFY_DATA_DIR = os.getenv("ICONIFY_DATA_DIR", "")
+
+# Compact memory-mapped icon store built with `python icon_store.py build`.
+# Used the same way as ICONIFY_DATA_DIR without loading collection JSON.
+ICONIFY_STORE_PATH = os.getenv("ICONIFY_STORE_PATH", "")
+
+_icon_cache = None
+_local_index = None
+_local_index_lock = threading.Lock()
+_icon_store = None
+
+# Concurrent identical upstream calls share one request
+iconify_flight = SingleFlight()
+
+def get_icon_cache():
+    """
+    Get the shared icon SVG cache, creating it on first use
+    
+    Returns:
+        TieredCache of full icon name to SVG data
+    """
+    global _icon_cache
+    if _icon_cache is None:
+        disk = None
+        if ICON_CACHE_DIR:
+            try:
+                disk = DiskCache(
+                    os.path.join(ICON_CACHE_DIR, "icons.sqlite3"),
+                    max_entries=ICON_CACHE_DISK_SIZE,
+                    max_bytes=ICON_CACHE_DISK_BYTES,
+                    ttl=ICON_CACHE_TTL
+                )
+            except Exception as e:
+                logger.error(f"Failed to open icon disk cache, using memory only: {str(e)}")
+        _icon_cache = TieredCache(LRUCache(ICON_CACHE_MEMORY_SIZE, ttl=ICON_CACHE_TTL), disk)
+    return _icon_cache
+
+def get_icon_store():
+    """
+    Get the memory-mapped icon store, opening ICONIFY_STORE_PATH on first use
+    
+    Returns:
+        IconStore, or None when no store is configured or it cannot be opened
+    """
+    global _icon_store
+    if not ICONIFY_STORE_PATH:
+        return None
+    if _icon_store is None:
+        with _local_index_lock:
+            if _icon_store is None:
+                try:
+                    _icon_store = IconStore(ICONIFY_STORE_PATH)
+                    logger.info(f"Opened icon store with {len(_icon_store)} icons")
+                except Exception as e:
+                    logger.error(f"Failed to open icon store: {str(e)}")
+                    _icon_store = False
+    return _icon_store or None
+
+def get_local_index():
+    """
+    Get the offline icon index, loading ICONIFY_DATA_DIR and
+    ICONIFY_STORE_PATH on first use
+    
+    Returns:
+        IconIndex, or None when nothing is configured or no icons were loaded
+    """
+    global _local_index
+    if not ICONIFY_DATA_DIR and not ICONIFY_STORE_PATH:
+        return None
+    if _local_index is None:
+        store = get_icon_store()
+        with _local_index_lock:
+            if _local_index is None:
+                index = IconIndex()
+                try:
+                    if ICONIFY_DATA_DIR:
+                        index.load_directory(ICONIFY_DATA_DIR)
+                    if store is not None:
+                        index.add_store(store)
+                except Exception as e:
+                    logger.error(f"Failed to load offline icon index: {str(e)}")
+                _local_index = index
+    return _local_index if len(_local_index) else None
+
+async def get_local_index_async():
+    """
+    Async version of get_local_index; the first load (seconds for a full
+    @iconify/json checkout) runs in a worker thread instead of the event loop
+    
+    Returns:
+        IconIndex, or None when nothing is configured or no icons were loaded
+    """
+    if _local_index is not None or (not ICONIFY_DATA_DIR and not ICONIFY_STORE_PATH):
+        return get_local_index()
+    return await asyncio.to_thread(get_local_index)
+
+def get_local_icon(icon_name):
+    """
+    Get SVG data for an icon from the icon store or the offline index
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data, or None when the icon is not available locally
+    """
+    store = get_icon_store()
+    if store is not None:
+        svg_data = store.get(icon_name)
+        if svg_data is not None:
+            return svg_data
+    
+    if not ICONIFY_DATA_DIR:
+        return None
+    index = get_local_index()
+    if index is None:
+        return None
+    return index.get_icon(icon_name)
+
+def search_local_icons(query, style=None, limit=20):
+    """
+    Search the offline index
+    
+    Args:
+        query: Search query
+        style: Optional filter for style (fill, stroke)
+        limit: Maximum number of results to return
+    
+    Returns:
+        List of icons in the same format as search_icons
+    """
+    index = get_local_index()
+    with timed("local_search"):
+        icon_names = index.search(query, style, min(limit, MAX_SEARCH_RESULTS))
+        svg_results = {icon_name: index.get_icon(icon_name) for icon_name in icon_names}
+    logger.info(f"Local search for {query} returned {len(icon_names)} icons")
+    return format_search_results(icon_names, svg_results)
+
+def cache_icon_data(icon_name, svg_data):
+    """
+    Store SVG data in the icon cache, skipping failed (empty) lookups
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+        svg_data: SVG data including body, width, height
+    """
+    if svg_data and svg_data.get("body"):
+        get_icon_cache().set(icon_name, svg_data)
+
+def cache_icons(icons):
+    """
+    Store many icons in the icon cache in one write, skipping failed (empty) lookups
+    
+    Args:
+        icons: Dictionary of full icon name to SVG data
+    """
+    get_icon_cache().set_many((name, svg_data) for name, svg_data in icons.items() if svg_data and svg_data.get("body"))
+
+async def cache_icons_async(icons):
+    """Async version of cache_icons; disk writes run in a worker thread"""
+    await get_icon_cache().set_many_async(
+        (name, svg_data) for name, svg_data in icons.items() if svg_data and svg_data.get("body")
+    )
+
+def get_cached_icons(icon_names):
+    """
+    Look up many icons in the offline index and the icon cache
+    
+    Args:
+        icon_names: Full icon names (prefix:name)
+    
+    Returns:
+        Tuple of (dictionary of full icon name to SVG data, list of icon
+        names that need fetching)
+    """
+    with timed("cache_lookup"):
+        results, not_local = get_local_icons(icon_names)
+        results.update(get_icon_cache().get_many(not_local))
+    return results, [icon_name for icon_name in not_local if icon_name not in results]
+
+async def get_cached_icons_async(icon_names):
+    """Async version of get_cached_icons; disk reads run in a worker thread"""
+    await get_local_index_async()
+    with timed("cache_lookup"):
+        results, not_local = get_local_icons(icon_names)
+        results.update(await get_icon_cache().get_many_async(not_local))
+    return results, [icon_name for icon_name in not_local if icon_name not in results]
+
+def get_local_icons(icon_names):
+    """Split icon names into SVG data found offline and names that were not"""
+    results = {}
+    not_local = []
+    for icon_name in icon_names:
+        svg_data = get_local_icon(icon_name)
+        if svg_data is not None:
+            results[icon_name] = svg_data
+        else:
+            not_local.append(icon_name)
+    return results, not_local
+
+def get_icon_svg_data(icon_name):
+    """
+    Get raw SVG data for an icon, served from the icon cache when possible
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data including body, width, height
+    """
+    with timed("cache_lookup"):
+        svg_data = get_local_icon(icon_name)
+        if svg_data is None:
+            svg_data = get_icon_cache().get(icon_name)
+    if svg_data is not None:
+        return svg_data
+    
+    return iconify_flight.do(("icon", icon_name), fetch_and_cache_icon, icon_name)
+
+def fetch_and_cache_icon(icon_name):
+    """Fetch an icon from the Iconify API and store it in the icon cache"""
+    svg_data = fetch_icon_svg_data(icon_name)
+    cache_icon_data(icon_name, svg_data)
+    return svg_data
+
+def fetch_icon_svg_data(icon_name):
+    """
+    Fetch raw SVG data for an icon from the Iconify API
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data including body, width, height
+    """
+    try:
+        # First, try to get the JSON data
+        json_url = f"{ICONIFY_API_BASE}/icon/{icon_name}?format=json"
+        json_response = http_get(json_url)
+        
+        if json_response.status_code == 200:
+            return json_response.json()
+            
+        # If JSON fails, try direct SVG
+        svg_url = f"{ICONIFY_API_BASE}/{icon_name}.svg"
+        svg_response = http_get(svg_url)
+        
+        if svg_response.status_code == 200:
+            # We got raw SVG, extract the content
+            svg_content = svg_response.text
+            # Create a basic structure similar to the JSON response
+            return {
+                "body": svg_content,
+                "width": 24,  # Default values
+                "height": 24
+            }
+            
+        # If both fail, try the proxy endpoint
+        proxy_url = f"https://icon.iconly.io/{icon_name}.svg"
+        proxy_response = http_get(proxy_url)
+        
+        if proxy_response.status_code == 200:
+            svg_content = proxy_response.text
+            return {
+                "body": svg_content,
+                "width": 24,
+                "height": 24
+            }
+            
+        logger.warning(f"Failed to get SVG for {icon_name}, status: {json_response.status_code}")
+        return {"body": "", "width": 24, "height": 24}
+        
+    except Exception as e:
+        logger.error(f"Error getting SVG for {icon_name}: {str(e)}")
+        return {"body": "", "width": 24, "height": 24}
+
+def parse_collection_icons(data, names):
+    """
+    Extract SVG data for the requested icons from an Iconify collection response
+
+    Args:
+        data: Parsed /{prefix}.json response
+        names: Icon names within the collection (without prefix)
+
+    Returns:
+        Dictionary of icon name to SVG data (body, width, height). Icons
+        missing from the response are omitted.
+    """
+    if not isinstance(data, dict):
+        # The API answers 404 with a bare number body for unknown prefixes
+        return {}
+
+    results = {}
+    for name in names:
+        svg_data = resolve_collection_icon(data, name)
+        if svg_data is not None:
+            results[name] = svg_data
+
+    return results
+
+def get_collection_icons_data(prefix, names):
+    """
+    Get SVG data for several icons of one collection in a single request
+
+    Uses the Iconify /{prefix}.json?icons=a,b,c endpoint. Aliases are
+    resolved against their parent icon.
+
+    Args:
+        prefix: Collection prefix (e.g. mdi)
+        names: Icon names within the collection (without prefix)
+
+    Returns:
+        Dictionary of icon name to SVG data (body, width, height) for every
+        icon the collection returned. Missing icons are omitted.
+    """
+    url = f"{ICONIFY_API_BASE}/{prefix}.json?icons={','.join(names)}"
+    response = http_get(url)
+
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch {prefix} icons: {response.text}")
+
+    return parse_collection_icons(response.json(), names)
+
+def group_icon_names(icon_names):
+    """
+    Group full icon names by collection prefix
+
+    Args:
+        icon_names: Full icon names (prefix:name)
+
+    Returns:
+        Dictionary of prefix to unique icon names, in first-seen order
+    """
+    by_prefix = {}
+    for icon_name in icon_names:
+        parts = icon_name.split(":")
+        if len(parts) != 2:
+            continue
+        prefix, name = parts
+        names = by_prefix.setdefault(prefix, [])
+        if name not in names:
+            names.append(name)
+    return by_prefix
+
+def merge_icon_batches(by_prefix, batches):
+    """
+    Merge per-collection batch results into full icon names
+
+    Args:
+        by_prefix: Dictionary of prefix to requested icon names
+        batches: Dictionary of prefix to batch results
+
+    Returns:
+        Tuple of (dictionary of full icon name to SVG data, list of full
+        icon names missing from the batches)
+    """
+    results = {}
+    missing = []
+    for prefix, names in by_prefix.items():
+        for name in names:
+            full_name = f"{prefix}:{name}"
+            if name in batches[prefix]:
+                results[full_name] = batches[prefix][name]
+            else:
+                missing.append(full_name)
+    return results, missing
+
+def get_icons_svg(icon_names, max_workers=None):
+    """
+    Get SVG data for many icons at once
+
+    Icon names are grouped by prefix so each collection costs one upstream
+    request. Collections are fetched concurrently. Icons the batch endpoint
+    does not return fall back to get_icon_svg_data.
+
+    Args:
+        icon_names: Full icon names (prefix:name)
+        max_workers: Maximum number of concurrent requests
+            (defaults to ICONIFY_MAX_WORKERS)
+
+    Returns:
+        Dictionary of full icon name to SVG data (body, width, height)
+    """
+    cached, uncached = get_cached_icons(icon_names)
+    by_prefix = group_icon_names(uncached)
+    if not by_prefix:
+        return cached
+
+    def fetch_prefix(prefix):
+        try:
+            return get_collection_icons_data(prefix, by_prefix[prefix])
+        except Exception as e:
+            logger.error(f"Error getting {prefix} icons: {str(e)}")
+            return {}
+
+    workers = max(1, min(max_workers or ICONIFY_MAX_WORKERS, len(by_prefix)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batches = dict(zip(by_prefix, executor.map(fetch_prefix, by_prefix)))
+        results, missing = merge_icon_batches(by_prefix, batches)
+        cache_icons(results)
+
+        # Fall back to per-icon requests for anything the batch missed
+        if missing:
+            logger.info(f"Falling back to single icon requests for {len(missing)} icons")
+            for full_name, svg_data in zip(missing, executor.map(get_icon_svg_data, missing)):
+                results[full_name] = svg_data
+
+    results.update(cached)
+    return results
+
+def build_search_url(query, style=None, limit=20):
+    """
+    Build the Iconify search URL for a query
+
+    Args:
+        query: Search query
+        style: Optional filter for style (fill, stroke)
+        limit: Maximum number of results to return
+
+    Returns:
+        Search URL
+    """
+    # Build search query with style parameter if provided
+    search_query = query
+    if style and style.lower() in ["fill", "stroke"]:
+        search_query = f"{query} style={style}"
+
+    logger.info(f"Searching for icons with query: {search_query}, limit: {limit}")
+    return f"{ICONIFY_API_BASE}/search?query={search_query}&limit={limit}"
+
+def select_search_results(data):
+    """
+    Pick the icon names to return from an Iconify search response
+
+    Args:
+        data: Parsed search response
+
+    Returns:
+        Full icon names (prefix:name), in the order returned by the API
+    """
+    logger.info(f"Search returned {len(data.get('icons', []))} icons")
+    icons = data.get("icons", [])
+
+    # Icon names are in format "prefix:name"
+    icon_names = [icon_name for icon_name in icons if len(icon_name.split(":")) == 2]
+
+    # Limit to prevent too many requests
+    return icon_names[:MAX_SEARCH_RESULTS]
+
+def format_search_results(icon_names, svg_results):
+    """
+    Build search results from icon names and their SVG data
+
+    Args:
+        icon_names: Full icon names, in result order
+        svg_results: Dictionary of full icon name to SVG data
+
+    Returns:
+        List of icon results
+    """
+    # Format results in the search API's order
+    results = []
+    for icon_name in icon_names:
+        prefix, name = icon_name.split(":")
+        svg_data = svg_results.get(icon_name, {"body": "", "width": 24, "height": 24})
+
+        # Log what we got, without paying for the formatting unless debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"SVG data for {icon_name}: width={svg_data.get('width')}, height={svg_data.get('height')}, body length={len(svg_data.get('body', ''))}")
+
+        results.append({
+            "prefix": prefix,
+            "name": name,
+            "full_name": icon_name,
+            "svg_url": f"{ICONIFY_API_BASE}/{icon_name}.svg",
+            "svg_body": svg_data.get("body", ""),
+            "width": svg_data.get("width", 24),
+            "height": svg_data.get("height", 24)
+        })
+
+    logger.info(f"Returning {len(results)} processed icons")
+    return results
+
+def search_icons(query, style=None, limit=20, max_workers=None):
+    """
+    Search for icons using the offline index when configured, otherwise
+    the Iconify API
+    
+    Args:
+        query: Search query
+        style: Optional filter for style (fill, stroke)
+        limit: Maximum number of results to return
+        max_workers: Maximum number of concurrent SVG fetches
+            (defaults to ICONIFY_MAX_WORKERS)
+    
+    Returns:
+        List of icons matching the search, in the order returned by the API
+    """
+    try:
+        if get_local_index() is not None:
+            return search_local_icons(query, style, limit)
+        
+        return iconify_flight.do(("search", query, style, limit), search_remote_icons, query, style, limit, max_workers)
+    
+    except Exception as e:
+        logger.error(f"Failed to search icons: {str(e)}")
+        raise Exception(f"Failed to search icons: {str(e)}")
+
+def search_remote_icons(query, style=None, limit=20, max_workers=None):
+    """
+    Search for icons with the Iconify API and fetch their SVG data
+    
+    Args:
+        query: Search query
+        style: Optional filter for style (fill, stroke)
+        limit: Maximum number of results to return
+        max_workers: Maximum number of concurrent SVG fetches
+    
+    Returns:
+        List of icons matching the search, in the order returned by the API
+    """
+    url = build_search_url(query, style, limit)
+    response = http_get(url)
+    
+    if response.status_code != 200:
+        logger.error(f"Failed to search icons: {response.text}")
+        raise Exception(f"Failed to search icons: {response.text}")
+    
+    icon_names = select_search_results(response.json())
+    if not icon_names:
+        logger.info("Returning 0 processed icons")
+        return []
+    
+    # Fetch SVG data in one batched request per collection
+    svg_results = get_icons_svg(icon_names, max_workers)
+    return format_search_results(icon_names, svg_results)
+
+def get_icon_svg(icon_name):
+    """
+    Get SVG data for an icon
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data for the icon
+    """
+    try:
+        logger.info(f"Getting SVG data for icon: {icon_name}")
+        return get_icon_svg_data(icon_name)
+    
+    except Exception as e:
+        logger.error(f"Failed to get icon SVG: {str(e)}")
+        raise Exception(f"Failed to get icon SVG: {str(e)}")
+
+def get_icon_collections():
+    """
+    Get list of available icon collections
+    
+    Returns:
+        List of icon collections
+    """
+    try:
+        return iconify_flight.do(("collections",), fetch_icon_collections)
+    
+    except Exception as e:
+        logger.error(f"Failed to get icon collections: {str(e)}")
+        raise Exception(f"Failed to get icon collections: {str(e)}")
+
+def fetch_icon_collections():
+    """
+    Fetch the list of icon collections from the Iconify API
+    
+    Returns:
+        List of icon collections
+    """
+    logger.info("Getting icon collections")
+    url = f"{ICONIFY_API_BASE}/collections"
+    response = http_get(url)
+    
+    if response.status_code != 200:
+        logger.error(f"Failed to get collections: {response.text}")
+        raise Exception(f"Failed to get collections: {response.text}")
+    
+    collections = response.json()
+    logger.info(f"Retrieved {len(collections)} icon collections")
+    return collections
+
+async def get_icon_svg_data_async(icon_name):
+    """
+    Async version of get_icon_svg_data, served from the icon cache when possible
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data including body, width, height
+    """
+    await get_local_index_async()
+    with timed("cache_lookup"):
+        svg_data = get_local_icon(icon_name)
+        if svg_data is None:
+            svg_data = await get_icon_cache().get_async(icon_name)
+    if svg_data is not None:
+        return svg_data
+    
+    return await iconify_flight.do_async(("icon", icon_name), fetch_and_cache_icon_async, icon_name)
+
+async def fetch_and_cache_icon_async(icon_name):
+    """Async version of fetch_and_cache_icon"""
+    svg_data = await fetch_icon_svg_data_async(icon_name)
+    await cache_icons_async({icon_name: svg_data})
+    return svg_data
+
+async def fetch_icon_svg_data_async(icon_name):
+    """
+    Async version of fetch_icon_svg_data using the shared async HTTP client
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data including body, width, height
+    """
+    client = get_async_client()
+    try:
+        # First, try to get the JSON data
+        json_url = f"{ICONIFY_API_BASE}/icon/{icon_name}?format=json"
+        json_response = await client.get(json_url)
+        
+        if json_response.status_code == 200:
+            return json_response.json()
+        
+        # If JSON fails, try direct SVG, then the proxy endpoint
+        for svg_url in [f"{ICONIFY_API_BASE}/{icon_name}.svg", f"https://icon.iconly.io/{icon_name}.svg"]:
+            svg_response = await client.get(svg_url)
+            if svg_response.status_code == 200:
+                return {
+                    "body": svg_response.text,
+                    "width": 24,
+                    "height": 24
+                }
+        
+        logger.warning(f"Failed to get SVG for {icon_name}, status: {json_response.status_code}")
+        return {"body": "", "width": 24, "height": 24}
+    
+    except Exception as e:
+        logger.error(f"Error getting SVG for {icon_name}: {str(e)}")
+        return {"body": "", "width": 24, "height": 24}
+
+async def get_collection_icons_data_async(prefix, names):
+    """
+    Async version of get_collection_icons_data
+    
+    Args:
+        prefix: Collection prefix (e.g. mdi)
+        names: Icon names within the collection (without prefix)
+    
+    Returns:
+        Dictionary of icon name to SVG data (body, width, height)
+    """
+    url = f"{ICONIFY_API_BASE}/{prefix}.json?icons={','.join(names)}"
+    response = await get_async_client().get(url)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch {prefix} icons: {response.text}")
+    
+    return parse_collection_icons(response.json(), names)
+
+async def get_icons_svg_async(icon_names, max_workers=None):
+    """
+    Async version of get_icons_svg
+    
+    Args:
+        icon_names: Full icon names (prefix:name)
+        max_workers: Maximum number of concurrent requests
+            (defaults to ICONIFY_MAX_WORKERS)
+    
+    Returns:
+        Dictionary of full icon name to SVG data (body, width, height)
+    """
+    cached, uncached = await get_cached_icons_async(icon_names)
+    by_prefix = group_icon_names(uncached)
+    if not by_prefix:
+        return cached
+    
+    semaphore = asyncio.Semaphore(max(1, max_workers or ICONIFY_MAX_WORKERS))
+    
+    async def fetch_prefix(prefix):
+        async with semaphore:
+            try:
+                return await get_collection_icons_data_async(prefix, by_prefix[prefix])
+            except Exception as e:
+                logger.error(f"Error getting {prefix} icons: {str(e)}")
+                return {}
+    
+    async def fetch_icon(icon_name):
+        async with semaphore:
+            return await get_icon_svg_data_async(icon_name)
+    
+    batches = dict(zip(by_prefix, await asyncio.gather(*[fetch_prefix(prefix) for prefix in by_prefix])))
+    results, missing = merge_icon_batches(by_prefix, batches)
+    await cache_icons_async(results)
+    
+    # Fall back to per-icon requests for anything the batch missed
+    if missing:
+        logger.info(f"Falling back to single icon requests for {len(missing)} icons")
+        for full_name, svg_data in zip(missing, await asyncio.gather(*[fetch_icon(name) for name in missing])):
+            results[full_name] = svg_data
+    
+    results.update(cached)
+    return results
+
+async def search_icons_async(query, style=None, limit=20, max_workers=None):
+    """
+    Async version of search_icons
+    
+    Args:
+        query: Search query
+        style: Optional filter for style (fill, stroke)
+        limit: Maximum number of results to return
+        max_workers: Maximum number of concurrent SVG fetches
+            (defaults to ICONIFY_MAX_WORKERS)
+    
+    Returns:
+        List of icons matching the search, in the order returned by the API
+    """
+    try:
+        if await get_local_index_async() is not None:
+            return search_local_icons(query, style, limit)
+        
+        return await iconify_flight.do_async(("search", query, style, limit), search_remote_icons_async, query, style, limit, max_workers)
+    
+    except Exception as e:
+        logger.error(f"Failed to search icons: {str(e)}")
+        raise Exception(f"Failed to search icons: {str(e)}")
+
+async def search_remote_icons_async(query, style=None, limit=20, max_workers=None):
+    """
+    Async version of search_remote_icons
+    
+    Args:
+        query: Search query
+        style: Optional filter for style (fill, stroke)
+        limit: Maximum number of results to return
+        max_workers: Maximum number of concurrent SVG fetches
+    
+    Returns:
+        List of icons matching the search, in the order returned by the API
+    """
+    url = build_search_url(query, style, limit)
+    response = await get_async_client().get(url)
+    
+    if response.status_code != 200:
+        logger.error(f"Failed to search icons: {response.text}")
+        raise Exception(f"Failed to search icons: {response.text}")
+    
+    icon_names = select_search_results(response.json())
+    if not icon_names:
+        logger.info("Returning 0 processed icons")
+        return []
+    
+    # Fetch SVG data in one batched request per collection
+    svg_results = await get_icons_svg_async(icon_names, max_workers)
+    return format_search_results(icon_names, svg_results)
+
+async def get_icon_svg_async(icon_name):
+    """
+    Async version of get_icon_svg
+    
+    Args:
+        icon_name: Full icon name (prefix:name)
+    
+    Returns:
+        SVG data for the icon
+    """
+    try:
+        logger.info(f"Getting SVG data for icon: {icon_name}")
+        return await get_icon_svg_data_async(icon_name)
+    
+    except Exception as e:
+        logger.error(f"Failed to get icon SVG: {str(e)}")
+        raise Exception(f"Failed to get icon SVG: {str(e)}")
+
+async def get_icon_collections_async():
+    """
+    Async version of get_icon_collections
+    
+    Returns:
+        List of icon collections
+    """
+    try:
+        return await iconify_flight.do_async(("collections",), fetch_icon_collections_async)
+    
+    except Exception as e:
+        logger.error(f"Failed to get icon collections: {str(e)}")
+        raise Exception(f"Failed to get icon collections: {str(e)}")
+
+async def fetch_icon_collections_async():
+    """
+    Async version of fetch_icon_collections
+    
+    Returns:
+        List of icon collections
+    """
+    logger.info("Getting icon collections")
+    url = f"{ICONIFY_API_BASE}/collections"
+    response = await get_async_client().get(url)
+    
+    if response.status_code != 200:
+        logger.error(f"Failed to get collections: {response.text}")
+        raise Exception(f"Failed to get collections: {response.text}")
+    
+    collections = response.json()
+    logger.info(f"Retrieved {len(collections)} icon collections")
+    return collections
\ No newline at end of file
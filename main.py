@@ -1,176 +1,545 @@
-import os
-import logging
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger('figma_svg_mcp')
-
-# Import our modules
-from figma_tools import figma_to_react, get_figma_node
-from figma_debug import debug_node_response, log_node_structure, find_node_by_id, improve_node_id
-from iconify_tools import search_icons, get_icon_svg, get_icon_collections
-
-# Create FastAPI app
-app = FastAPI(title="Figma SVG MCP")
-
-# Mount static files directory for the web UI
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-# Define data models
-class FigmaRequest(BaseModel):
-    file_key: str = Field(..., description="Figma file key")
-    node_id: str = Field(..., description="Figma node ID")
-
-class IconSearchRequest(BaseModel):
-    query: str = Field(..., description="Search query")
-    style: Optional[str] = Field(None, description="Filter by style (fill, stroke)")
-    limit: Optional[int] = Field(20, description="Maximum number of results")
-
-class IconRequest(BaseModel):
-    icon_name: str = Field(..., description="Full icon name (prefix:name)")
-
-class MCPResponse(BaseModel):
-    status: str
-    data: Optional[Any] = None
-    error: Optional[str] = None
-
-# Root endpoint to serve the UI
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    return FileResponse("static/index.html")
-
-# Debug endpoint for Figma node
-@app.get("/debug-figma-node", response_model=MCPResponse)
-async def debug_figma_node(file_key: str, node_id: str):
-    try:
-        # Get the node data
-        node_data = get_figma_node(file_key, node_id)
-        
-        # Debug the response
-        debug_info = debug_node_response(node_data)
-        
-        # For each found node, log its structure if it has a document
-        for node_info in debug_info.get("found_nodes", []):
-            if node_info.get("has_document", False):
-                for key, item in node_data.get("nodes", {}).items():
-                    if "document" in item and key == node_info["id"]:
-                        logger.info(f"Logging structure for node {key}:")
-                        log_node_structure(item["document"])
-        
-        return MCPResponse(status="success", data=debug_info)
-    except Exception as e:
-        logger.error(f"Error debugging Figma node: {str(e)}")
-        return MCPResponse(status="error", error=str(e))
-#create a route in your FastAPI application to serve test page
-@app.get("/test-icons", response_class=HTMLResponse)
-async def test_icons():
-    """Test endpoint for icon display troubleshooting"""
-    with open("static/test-icons.html", "r") as f:
-        return f.read()
-
-# Figma to React endpoint
-@app.post("/figma-to-react", response_model=MCPResponse)
-async def api_figma_to_react(request: FigmaRequest):
-    try:
-        logger.info(f"Converting Figma node to React: {request.file_key}, {request.node_id}")
-        react_code = figma_to_react(request.file_key, request.node_id)
-        return MCPResponse(status="success", data={"code": react_code})
-    except Exception as e:
-        logger.error(f"Error converting Figma to React: {str(e)}")
-        return MCPResponse(status="error", error=str(e))
-
-# Icon search endpoint
-@app.post("/search-icons", response_model=MCPResponse)
-async def api_search_icons(request: IconSearchRequest):
-    try:
-        logger.info(f"Searching icons: {request.query}, style={request.style}, limit={request.limit}")
-        icons = search_icons(request.query, request.style, request.limit)
-        return MCPResponse(status="success", data={"icons": icons})
-    except Exception as e:
-        logger.error(f"Error searching icons: {str(e)}")
-        return MCPResponse(status="error", error=str(e))
-
-# GET version for easier testing
-@app.get("/search-icons", response_model=MCPResponse)
-async def get_search_icons(query: str, style: Optional[str] = None, limit: Optional[int] = 20):
-    try:
-        logger.info(f"GET Searching icons: {query}, style={style}, limit={limit}")
-        icons = search_icons(query, style, limit)
-        return MCPResponse(status="success", data={"icons": icons})
-    except Exception as e:
-        logger.error(f"Error searching icons: {str(e)}")
-        return MCPResponse(status="error", error=str(e))
-
-# Get icon SVG endpoint
-@app.get("/icon/{icon_name}", response_model=MCPResponse)
-async def get_icon(icon_name: str):
-    try:
-        svg_data = get_icon_svg(icon_name)
-        return MCPResponse(status="success", data={"svg": svg_data})
-    except Exception as e:
-        logger.error(f"Error getting icon: {str(e)}")
-        return MCPResponse(status="error", error=str(e))
-
-# Get icon collections endpoint
-@app.get("/collections", response_model=MCPResponse)
-async def get_collections():
-    try:
-        collections = get_icon_collections()
-        return MCPResponse(status="success", data={"collections": collections})
-    except Exception as e:
-        logger.error(f"Error getting collections: {str(e)}")
-        return MCPResponse(status="error", error=str(e))
-
-# Error handler for more informative responses
-@app.exception_handler(Exception)
-async def generic_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
-        status_code=500,
-        content={"status": "error", "error": str(exc)}
-    )
-
-# MCP-compatible endpoint
-@app.post("/mcp")
-async def mcp_endpoint(request: dict):
-    try:
-        function_name = request.get("function")
-        params = request.get("params", {})
-        
-        logger.info(f"MCP function call: {function_name}")
-        
-        if function_name == "figma_to_react":
-            figma_request = FigmaRequest(**params)
-            result = await api_figma_to_react(figma_request)
-            return {"result": result}
-        
-        elif function_name == "search_icons":
-            icon_request = IconSearchRequest(**params)
-            result = await api_search_icons(icon_request)
-            return {"result": result}
-        
-        elif function_name == "get_icon":
-            result = await get_icon(params.get("icon_name"))
-            return {"result": result}
-        
-        elif function_name == "get_collections":
-            result = await get_collections()
-            return {"result": result}
-        
-        else:
-            logger.warning(f"Unknown MCP function: {function_name}")
-            return {"error": f"Unknown function: {function_name}"}
-            
-    except Exception as e:
-        logger.error(f"Error in MCP endpoint: {str(e)}")
-        return {"error": str(e)}
-
-# Run the app
-if __name__ == "__main__":
-    import uvicorn
+import os
+import json
+import asyncio
+import logging
+from fastapi import FastAPI, HTTPException, Request, Response, Body
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('figma_svg_mcp')
+
+# Import our modules
+from figma_tools import figma_to_react_etag_async, figma_to_react_batch_async, get_figma_node_async, open_figma_file_stream, iter_figma_response_nodes, invalidate_figma_cache, figma_node_cache, get_node_index, get_code_cache, figma_flight, etag_matches
+from figma_export import COMPONENT_TYPES, export_ndjson, export_zip, zip_results
+from figma_debug import debug_node_response, log_node_structure, find_node_by_id, improve_node_id
+from iconify_tools import search_icons_async, get_icon_svg_async, get_icon_cache, get_local_index_async, iconify_flight
+from collections_snapshot import collections_snapshot
+from figma_scheduler import figma_scheduler
+from icon_raster import render_icon_png, render_sprite_png, get_sprite_layout, close_raster_pool, raster_cache
+from icon_bundle import build_icon_bundle, missing_icons_header, bundle_cache
+from figma_sync import sync_figma_file, get_sync_store
+from figma_jobs import job_queue, get_job_store, close_codegen_pool, SUCCEEDED
+from metrics import render_metrics, RequestMetricsMiddleware
+from http_clients import start_async_client, close_async_client, close_sessions
+
+# Create FastAPI app
+app = FastAPI(title="Figma SVG MCP")
+
+# Share pooled HTTP connections across all requests
+@app.on_event("startup")
+async def startup():
+    await start_async_client()
+    # Serve collections from the persisted snapshot and keep it fresh in the background
+    await asyncio.to_thread(collections_snapshot.load)
+    app.state.collections_refresh = asyncio.create_task(collections_snapshot.run())
+    # Load the offline icon index before serving, off the event loop
+    await get_local_index_async()
+    # Resume jobs interrupted by the last shutdown
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.collections_refresh.cancel()
+    await job_queue.stop()
+    await close_async_client()
+    close_sessions()
+    close_raster_pool()
+    close_codegen_pool()
+
+# Record request latency by route template, through the last body chunk
+app.add_middleware(RequestMetricsMiddleware)
+
+# Mount static files directory for the web UI
+app.mount("/static", StaticFiles(directory="static"), name="static")
+
+# Define data models
+class FigmaRequest(BaseModel):
+    file_key: str = Field(..., description="Figma file key")
+    node_id: str = Field(..., description="Figma node ID")
+
+class FigmaBatchRequest(BaseModel):
+    file_key: str = Field(..., description="Figma file key")
+    node_ids: List[str] = Field(..., description="Figma node IDs")
+
+class FigmaCacheRequest(BaseModel):
+    file_key: Optional[str] = Field(None, description="Figma file key (omit to clear everything)")
+    node_id: Optional[str] = Field(None, description="Figma node ID (omit to clear the whole file)")
+
+class FigmaSyncRequest(BaseModel):
+    file_key: str = Field(..., description="Figma file key")
+    force: bool = Field(False, description="Re-check every component even if the file version is unchanged")
+
+class FigmaJobRequest(BaseModel):
+    kind: str = Field(..., description="Job kind (figma_to_react_batch, figma_export)")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Job parameters (file_key, and node_ids for figma_to_react_batch)")
+
+class IconSearchRequest(BaseModel):
+    query: str = Field(..., description="Search query")
+    style: Optional[str] = Field(None, description="Filter by style (fill, stroke)")
+    limit: Optional[int] = Field(20, description="Maximum number of results")
+
+class IconRequest(BaseModel):
+    icon_name: str = Field(..., description="Full icon name (prefix:name)")
+
+class MCPResponse(BaseModel):
+    status: str
+    data: Optional[Any] = None
+    error: Optional[str] = None
+
+# Root endpoint to serve the UI
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    return FileResponse("static/index.html")
+
+# Debug endpoint for Figma node
+@app.get("/debug-figma-node", response_model=MCPResponse)
+async def debug_figma_node(file_key: str, node_id: str):
+    try:
+        # Get the node data
+        node_data = await get_figma_node_async(file_key, node_id)
+        
+        # Debug the response
+        debug_info = debug_node_response(node_data)
+        
+        # Shares the index cached with the response, so the converter reuses it
+        debug_info["index"] = get_node_index(node_data).summary()
+        
+        # For each found node, log its structure if it has a document
+        for node_info in debug_info.get("found_nodes", []):
+            if node_info.get("has_document", False):
+                for key, item in node_data.get("nodes", {}).items():
+                    if "document" in item and key == node_info["id"]:
+                        logger.info(f"Logging structure for node {key}:")
+                        log_node_structure(item["document"])
+        
+        return MCPResponse(status="success", data=debug_info)
+    except Exception as e:
+        logger.error(f"Error debugging Figma node: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+#create a route in your FastAPI application to serve test page
+@app.get("/test-icons", response_class=HTMLResponse)
+async def test_icons():
+    """Test endpoint for icon display troubleshooting"""
+    with open("static/test-icons.html", "r") as f:
+        return f.read()
+
+# Figma to React endpoint; responses carry an ETag and honor If-None-Match
+@app.post("/figma-to-react", response_model=MCPResponse)
+async def api_figma_to_react(request: FigmaRequest, http_request: Request = None, response: Response = None):
+    try:
+        logger.info(f"Converting Figma node to React: {request.file_key}, {request.node_id}")
+        if_none_match = http_request.headers.get("if-none-match") if http_request else None
+        react_code, etag = await figma_to_react_etag_async(request.file_key, request.node_id, if_none_match)
+        if react_code is None:
+            return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+        if response is not None:
+            response.headers["ETag"] = f'"{etag}"'
+        return MCPResponse(status="success", data={"code": react_code})
+    except Exception as e:
+        logger.error(f"Error converting Figma to React: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Batch Figma to React endpoint
+@app.post("/figma-to-react/batch", response_model=MCPResponse)
+async def api_figma_to_react_batch(request: FigmaBatchRequest):
+    try:
+        logger.info(f"Converting {len(request.node_ids)} Figma nodes to React: {request.file_key}")
+        results = await figma_to_react_batch_async(request.file_key, request.node_ids)
+        return MCPResponse(status="success", data={"results": results})
+    except Exception as e:
+        logger.error(f"Error converting Figma batch to React: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Whole-file component export endpoint, streamed as NDJSON or zip
+@app.get("/figma-export")
+async def api_figma_export(file_key: str, format: str = "ndjson"):
+    try:
+        logger.info(f"Exporting components of Figma file {file_key} as {format}")
+        if format not in ["ndjson", "zip"]:
+            raise Exception(f"Unsupported export format: {format}")
+        # Open the download up front so upstream errors are reported normally;
+        # the body is then parsed incrementally while the export streams
+        response = await run_in_threadpool(open_figma_file_stream, file_key)
+    except Exception as e:
+        logger.error(f"Error exporting Figma file: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+    
+    components = iter_figma_response_nodes(response, types=COMPONENT_TYPES)
+    if format == "zip":
+        return StreamingResponse(
+            export_zip(components),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{file_key}.zip"'}
+        )
+    return StreamingResponse(export_ndjson(components), media_type="application/x-ndjson")
+
+# Incremental Figma sync endpoint: regenerates only components that changed
+@app.post("/figma-sync", response_model=MCPResponse)
+async def api_figma_sync(request: FigmaSyncRequest):
+    try:
+        logger.info(f"Syncing Figma file {request.file_key}")
+        result = await run_in_threadpool(sync_figma_file, request.file_key, request.force)
+        return MCPResponse(status="success", data=result)
+    except Exception as e:
+        logger.error(f"Error syncing Figma file: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Components stored by previous syncs of a file
+@app.get("/figma-sync/{file_key}", response_model=MCPResponse)
+async def api_figma_sync_components(file_key: str):
+    try:
+        store = get_sync_store()
+        components = await run_in_threadpool(store.get_components, file_key)
+        version = await run_in_threadpool(store.get_version, file_key)
+        return MCPResponse(status="success", data={"version": version, "components": components})
+    except Exception as e:
+        logger.error(f"Error getting synced components: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Background jobs: long conversions and exports return a job id right away
+@app.post("/figma-jobs", response_model=MCPResponse)
+async def api_submit_figma_job(request: FigmaJobRequest):
+    try:
+        job = await job_queue.submit(request.kind, request.params)
+        return MCPResponse(status="success", data=job)
+    except Exception as e:
+        logger.error(f"Error submitting job: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Job status and progress
+@app.get("/figma-jobs/{job_id}", response_model=MCPResponse)
+async def api_get_figma_job(job_id: str):
+    try:
+        job = await asyncio.to_thread(get_job_store().get, job_id)
+        if job is None:
+            raise Exception(f"Job not found: {job_id}")
+        return MCPResponse(status="success", data=job)
+    except Exception as e:
+        logger.error(f"Error getting job: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Job results so far, as JSON pages, an NDJSON stream that follows the job, or a zip of a finished job
+@app.get("/figma-jobs/{job_id}/results")
+async def api_figma_job_results(job_id: str, format: str = "json", offset: int = 0, limit: Optional[int] = None, follow: bool = True):
+    try:
+        if format not in ["json", "ndjson", "zip"]:
+            raise Exception(f"Unsupported results format: {format}")
+        store = get_job_store()
+        job = await asyncio.to_thread(store.get, job_id)
+        if job is None:
+            raise Exception(f"Job not found: {job_id}")
+        
+        if format == "zip":
+            if job["status"] != SUCCEEDED:
+                raise Exception(f"Job is {job['status']}; zip downloads need a succeeded job")
+            return StreamingResponse(
+                zip_results(await asyncio.to_thread(store.get_results, job_id)),
+                media_type="application/zip",
+                headers={"Content-Disposition": f'attachment; filename="{job_id}.zip"'}
+            )
+        
+        if format == "ndjson":
+            async def lines():
+                async for result in job_queue.stream_results(job_id, offset, follow):
+                    yield (json.dumps(result) + "\n").encode("utf-8")
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+        
+        results = await asyncio.to_thread(store.get_results, job_id, offset, limit)
+        return MCPResponse(status="success", data={"job": job, "results": results, "next_offset": offset + len(results)})
+    except Exception as e:
+        logger.error(f"Error getting job results: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Job cancellation; a running job stops after its current component
+@app.post("/figma-jobs/{job_id}/cancel", response_model=MCPResponse)
+async def api_cancel_figma_job(job_id: str):
+    try:
+        job = await job_queue.cancel(job_id)
+        if job is None:
+            raise Exception(f"Job not found: {job_id}")
+        return MCPResponse(status="success", data=job)
+    except Exception as e:
+        logger.error(f"Error cancelling job: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Figma node cache invalidation endpoint
+@app.post("/figma-cache/invalidate", response_model=MCPResponse)
+async def api_invalidate_figma_cache(request: FigmaCacheRequest):
+    try:
+        removed = invalidate_figma_cache(request.file_key, request.node_id)
+        logger.info(f"Invalidated {removed} cached Figma node responses")
+        return MCPResponse(status="success", data={"removed": removed})
+    except Exception as e:
+        logger.error(f"Error invalidating Figma cache: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Icon search endpoint
+@app.post("/search-icons", response_model=MCPResponse)
+async def api_search_icons(request: IconSearchRequest):
+    try:
+        logger.info(f"Searching icons: {request.query}, style={request.style}, limit={request.limit}")
+        icons = await search_icons_async(request.query, request.style, request.limit)
+        return MCPResponse(status="success", data={"icons": icons})
+    except Exception as e:
+        logger.error(f"Error searching icons: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# GET version for easier testing
+@app.get("/search-icons", response_model=MCPResponse)
+async def get_search_icons(query: str, style: Optional[str] = None, limit: Optional[int] = 20):
+    try:
+        logger.info(f"GET Searching icons: {query}, style={style}, limit={limit}")
+        icons = await search_icons_async(query, style, limit)
+        return MCPResponse(status="success", data={"icons": icons})
+    except Exception as e:
+        logger.error(f"Error searching icons: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Icon PNG endpoint; registered before /icon/{icon_name} so the suffix is matched first
+@app.get("/icon/{icon_name}.png")
+async def get_icon_png(icon_name: str, size: int = None, color: str = None):
+    try:
+        png = await render_icon_png(icon_name, size, color)
+        return Response(content=png, media_type="image/png", headers={"Cache-Control": "public, max-age=86400"})
+    except Exception as e:
+        logger.error(f"Error rendering icon: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Sprite sheet endpoint; the icon positions come from /icons/sprite.json
+@app.get("/icons/sprite.png")
+async def get_icons_sprite(icons: str, size: int = None, color: str = None, columns: int = None):
+    try:
+        icon_names = [name.strip() for name in icons.split(",") if name.strip()]
+        png = await render_sprite_png(icon_names, size, color, columns)
+        return Response(content=png, media_type="image/png", headers={"Cache-Control": "public, max-age=86400"})
+    except Exception as e:
+        logger.error(f"Error rendering sprite sheet: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Sprite sheet layout, in the body since it can outgrow proxy header limits
+@app.get("/icons/sprite.json", response_model=MCPResponse)
+async def get_icons_sprite_layout(icons: str, size: int = None, columns: int = None):
+    try:
+        icon_names = [name.strip() for name in icons.split(",") if name.strip()]
+        layout = await get_sprite_layout(icon_names, size, columns)
+        return MCPResponse(status="success", data=layout)
+    except Exception as e:
+        logger.error(f"Error building sprite layout: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Icon bundle endpoints: one cacheable request for every icon on a page
+@app.get("/icons/sprite.svg")
+async def get_icons_symbol_sprite(icons: str, http_request: Request = None):
+    return await icon_bundle_response(icons, "svg", "image/svg+xml", http_request)
+
+@app.get("/icons/bundle.js")
+async def get_icons_js_bundle(icons: str, http_request: Request = None):
+    return await icon_bundle_response(icons, "js", "text/javascript", http_request)
+
+async def icon_bundle_response(icons, bundle_format, media_type, http_request=None):
+    try:
+        icon_names = [name.strip() for name in icons.split(",") if name.strip()]
+        headers = {"Cache-Control": "public, max-age=86400"}
+        # The ETag hashes the built content, so the bundle (usually cached) comes first
+        bundle = await build_icon_bundle(icon_names, bundle_format)
+        if bundle["etag"]:
+            headers["ETag"] = f'"{bundle["etag"]}"'
+            if http_request is not None and etag_matches(http_request.headers.get("if-none-match"), bundle["etag"]):
+                return Response(status_code=304, headers=headers)
+        if bundle["missing"]:
+            headers["X-Missing-Icons"] = missing_icons_header(bundle["missing"])
+            headers["X-Missing-Icons-Count"] = str(len(bundle["missing"]))
+        return Response(content=bundle["content"], media_type=media_type, headers=headers)
+    except Exception as e:
+        logger.error(f"Error building icon bundle: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Get icon SVG endpoint
+@app.get("/icon/{icon_name}", response_model=MCPResponse)
+async def get_icon(icon_name: str):
+    try:
+        svg_data = await get_icon_svg_async(icon_name)
+        return MCPResponse(status="success", data={"svg": svg_data})
+    except Exception as e:
+        logger.error(f"Error getting icon: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+def accepts_gzip(accept_encoding):
+    """
+    Check whether an Accept-Encoding header allows a gzip response
+
+    Args:
+        accept_encoding: Header value, e.g. "br, gzip;q=0.8, *;q=0"
+
+    Returns:
+        True if gzip (or x-gzip, or else *) is listed with a non-zero q-value
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
+
+# Get icon collections endpoint, served from the precompressed snapshot
+@app.get("/collections", response_model=MCPResponse)
+async def get_collections(http_request: Request = None):
+    try:
+        snapshot = await collections_snapshot.ensure()
+        if http_request is None:
+            return MCPResponse(status="success", data={"collections": snapshot.collections})
+        if accepts_gzip(http_request.headers.get("accept-encoding", "")):
+            return Response(
+                content=snapshot.gzip_body,
+                media_type="application/json",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+            )
+        return Response(content=snapshot.body, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+    except Exception as e:
+        logger.error(f"Error getting collections: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Icon cache statistics endpoint
+@app.get("/cache-stats", response_model=MCPResponse)
+async def get_cache_stats():
+    try:
+        return MCPResponse(status="success", data={
+            "icons": get_icon_cache().stats(),
+            "figma_nodes": figma_node_cache.stats(),
+            "react_code": get_code_cache().stats(),
+            "collections": collections_snapshot.stats(),
+            "png": raster_cache.stats(),
+            "bundles": bundle_cache.stats(),
+            "single_flight": {
+                "iconify": iconify_flight.stats(),
+                "figma": figma_flight.stats()
+            },
+            "figma_scheduler": figma_scheduler.stats(),
+            "figma_jobs": await asyncio.to_thread(job_queue.stats)
+        })
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {str(e)}")
+        return MCPResponse(status="error", error=str(e))
+
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    caches = {
+        "icons": get_icon_cache().stats(),
+        "figma_nodes": figma_node_cache.stats(),
+        "react_code": get_code_cache().stats(),
+        "png": raster_cache.stats(),
+        "bundles": bundle_cache.stats()
+    }
+    return PlainTextResponse(render_metrics(caches), media_type="text/plain; version=0.0.4")
+
+# Error handler for more informative responses
+@app.exception_handler(Exception)
+async def generic_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Unhandled exception: {str(exc)}")
+    return JSONResponse(
+        status_code=500,
+        content={"status": "error", "error": str(exc)}
+    )
+
+# MCP functions by name; each takes the call's params and returns a coroutine
+MCP_FUNCTIONS = {
+    "figma_to_react": lambda params: api_figma_to_react(FigmaRequest(**params)),
+    "figma_to_react_batch": lambda params: api_figma_to_react_batch(FigmaBatchRequest(**params)),
+    "figma_sync": lambda params: api_figma_sync(FigmaSyncRequest(**params)),
+    "submit_job": lambda params: api_submit_figma_job(FigmaJobRequest(**params)),
+    "get_job": lambda params: api_get_figma_job(params.get("job_id")),
+    "get_job_results": lambda params: api_figma_job_results(params.get("job_id"), "json", params.get("offset", 0), params.get("limit")),
+    "cancel_job": lambda params: api_cancel_figma_job(params.get("job_id")),
+    "search_icons": lambda params: api_search_icons(IconSearchRequest(**params)),
+    "get_icon": lambda params: get_icon(params.get("icon_name")),
+    "get_collections": lambda params: get_collections()
+}
+
+# Limits on batched /mcp requests
+MCP_BATCH_MAX_CALLS = int(os.getenv("MCP_BATCH_MAX_CALLS", "100"))
+MCP_BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "16"))
+
+async def call_mcp_function(call):
+    """Run one MCP call, returning {"result": ...} or {"error": ...}"""
+    try:
+        if not isinstance(call, dict):
+            raise Exception("Each call must be an object with function and params")
+        function_name = call.get("function")
+        params = call.get("params") or {}
+        
+        logger.info(f"MCP function call: {function_name}")
+        
+        function = MCP_FUNCTIONS.get(function_name)
+        if function is None:
+            logger.warning(f"Unknown MCP function: {function_name}")
+            return {"error": f"Unknown function: {function_name}"}
+        
+        return {"result": await function(params)}
+    
+    except Exception as e:
+        logger.error(f"Error in MCP endpoint: {str(e)}")
+        return {"error": str(e)}
+
+async def call_mcp_batch(calls):
+    """Start every call of a batch, at most MCP_BATCH_CONCURRENCY at a time, returning the tasks in call order"""
+    semaphore = asyncio.Semaphore(max(1, MCP_BATCH_CONCURRENCY))
+    
+    async def limited(call):
+        async with semaphore:
+            return await call_mcp_function(call)
+    
+    return [asyncio.ensure_future(limited(call)) for call in calls]
+
+# MCP-compatible endpoint: one call, or an array of independent calls run concurrently
+@app.post("/mcp")
+async def mcp_endpoint(request: Any = Body(...), stream: bool = False):
+    if not isinstance(request, list):
+        return await call_mcp_function(request)
+    
+    if len(request) > MCP_BATCH_MAX_CALLS:
+        return {"error": f"At most {MCP_BATCH_MAX_CALLS} calls per request"}
+    logger.info(f"MCP batch of {len(request)} calls")
+    tasks = await call_mcp_batch(request)
+    
+    if not stream:
+        return await asyncio.gather(*tasks)
+    
+    # One line per call as it completes, tagged with its position in the request
+    async def indexed(index, task):
+        return index, await task
+    
+    async def lines():
+        try:
+            for completed in asyncio.as_completed([indexed(index, task) for index, task in enumerate(tasks)]):
+                index, response = await completed
+                yield (json.dumps({"index": index, **jsonable_encoder(response)}) + "\n").encode("utf-8")
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Run the app
+if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,242 @@
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('metrics')
+
+# Histogram buckets in seconds, from cache lookups (~µs) to slow upstream calls
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def format_labels(labelnames, values):
+    """Format label values as a Prometheus label set"""
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    """
+    Monotonic counter with optional labels
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Label names, in the order values are passed to inc
+    """
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Histogram:
+    """
+    Cumulative histogram with optional labels
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Label names, in the order values are passed to observe
+        buckets: Upper bounds of the buckets, ascending
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (plus +Inf), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket_labels = format_labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_set = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_set} {total}")
+            lines.append(f"{self.name}_count{label_set} {cumulative}")
+        return lines
+
+# Time spent in each processing stage of a request
+stage_seconds = Histogram(
+    "figma_svg_stage_seconds",
+    "Time spent per processing stage",
+    ["stage"]
+)
+
+# End-to-end latency of our own endpoints
+request_seconds = Histogram(
+    "figma_svg_request_seconds",
+    "Request latency by route, until the last body chunk is sent",
+    ["method", "route", "status"]
+)
+
+# Upstream HTTP calls (Iconify, Figma)
+upstream_requests = Counter(
+    "figma_svg_upstream_requests_total",
+    "Upstream HTTP requests by host and status",
+    ["host", "status"]
+)
+upstream_seconds = Histogram(
+    "figma_svg_upstream_request_seconds",
+    "Upstream HTTP request latency until response headers",
+    ["host"]
+)
+
+def timed(stage):
+    """
+    Time a block as one processing stage
+
+    Args:
+        stage: Stage name (e.g. cache_lookup, node_search, style_parsing, codegen)
+    """
+    return stage_seconds.time(stage)
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording request_seconds by route template
+
+    The timer stops when the final body chunk is sent, so streaming
+    responses are measured end to end rather than until their headers.
+    Being plain ASGI, it also avoids the per-request task and body
+    re-streaming of an @app.middleware("http") function.
+
+    Args:
+        app: The ASGI application to wrap
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = None
+        recorded = False
+
+        def record(status):
+            nonlocal recorded
+            recorded = True
+            # The router adds the matched route to the scope, so /icon/{icon_name} is one series
+            route = scope.get("route")
+            request_seconds.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status)
+            )
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not recorded:
+                record(status)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            # Failed or disconnected before the last chunk
+            if not recorded:
+                record(status or 500)
+
+def observe_upstream(host, status, seconds):
+    """
+    Record one upstream HTTP call
+
+    Args:
+        host: Upstream host
+        status: HTTP status code, or "error" when no response was received
+        seconds: Time until the response headers arrived
+    """
+    upstream_requests.inc(host, str(status))
+    upstream_seconds.observe(seconds, host)
+
+def render_cache_stats(caches):
+    """
+    Render hit, miss and hit ratio gauges for caches
+
+    Args:
+        caches: Dictionary of cache name to stats dict (hits, misses), as
+            returned by the caches' stats() methods; tiered caches report
+            one set per tier
+
+    Returns:
+        List of metric lines
+    """
+    hits_lines = ["# HELP figma_svg_cache_hits_total Cache hits", "# TYPE figma_svg_cache_hits_total counter"]
+    misses_lines = ["# HELP figma_svg_cache_misses_total Cache misses", "# TYPE figma_svg_cache_misses_total counter"]
+    ratio_lines = ["# HELP figma_svg_cache_hit_ratio Cache hits over lookups", "# TYPE figma_svg_cache_hit_ratio gauge"]
+    for name, stats in caches.items():
+        tiers = {name: stats} if "hits" in stats else {f"{name}_{tier}": tier_stats for tier, tier_stats in stats.items()}
+        for cache_name, tier_stats in tiers.items():
+            labels = format_labels(("cache",), (cache_name,))
+            hits = tier_stats.get("hits", 0)
+            misses = tier_stats.get("misses", 0)
+            hits_lines.append(f"figma_svg_cache_hits_total{labels} {hits}")
+            misses_lines.append(f"figma_svg_cache_misses_total{labels} {misses}")
+            ratio_lines.append(f"figma_svg_cache_hit_ratio{labels} {hits / (hits + misses) if hits + misses else 0}")
+    return hits_lines + misses_lines + ratio_lines
+
+def render_metrics(caches=None):
+    """
+    Render every metric in the Prometheus text exposition format
+
+    Args:
+        caches: Optional cache stats to include (see render_cache_stats)
+
+    Returns:
+        Metrics text
+    """
+    lines = request_seconds.render() + stage_seconds.render() + upstream_requests.render() + upstream_seconds.render()
+    if caches:
+        lines += render_cache_stats(caches)
+    return "\n".join(lines) + "\n"
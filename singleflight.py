@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('singleflight')
+
+class _Call:
+    """One in-flight synchronous call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one
+
+    While a call for a key is in flight, other callers with the same key
+    wait for it and share its result (or exception) instead of making their
+    own upstream request. Nothing is remembered once the call finishes;
+    caching stays the job of the caches in front of it.
+
+    Synchronous callers (threads) and async callers (coroutines on one event
+    loop) are coalesced separately.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless an identical call is already in flight
+
+        Args:
+            key: Hashable key identifying identical calls
+            fn: Function to run
+
+        Returns:
+            The result of the shared call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """
+        Await fn(*args, **kwargs) unless an identical call is already in flight
+
+        The shared call runs as its own task, so a caller that is cancelled
+        (e.g. a client disconnect) does not cancel it for the others.
+
+        Args:
+            key: Hashable key identifying identical calls
+            fn: Coroutine function to run
+
+        Returns:
+            The result of the shared call
+        """
+        flight_key = (asyncio.get_running_loop(), key)
+        future = self._futures.get(flight_key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._futures[flight_key] = future
+            future.add_done_callback(lambda done: self._finish(flight_key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(future)
+
+    def _finish(self, flight_key, future):
+        self._futures.pop(flight_key, None)
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._calls) + len(self._futures)
+        }
@@ -0,0 +1,90 @@
+import time
+import asyncio
+import sqlite3
+from cache import LRUCache, DiskCache, TieredCache
+
+def table_totals(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+
+    cache.set("a", {"body": "<path/>"})
+
+    assert cache.get("a") == {"body": "<path/>"}
+    assert cache.get("missing", "default") == "default"
+    assert cache.get_many(["a", "missing"]) == {"a": {"body": "<path/>"}}
+    assert (cache.hits, cache.misses) == (2, 2)
+
+def test_disk_cache_tracks_totals_without_scanning(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path)
+
+    cache.set_many([("a", "x" * 10), ("b", "y" * 20), ("a", "z" * 30)])
+    cache.set("b", "y")
+    cache.delete("a")
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == table_totals(path)
+
+def test_disk_cache_totals_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path).set_many([(str(i), i) for i in range(50)])
+
+    stats = DiskCache(path).stats()
+
+    assert (stats["entries"], stats["bytes"]) == table_totals(path)
+
+def test_disk_cache_evicts_least_recently_used_below_budget(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, max_entries=100)
+    cache.set_many([(str(i), i) for i in range(100)])
+    time.sleep(0.01)
+    # Recently read entries survive; their access times are written before evicting
+    assert cache.get_many(["0", "1", "2"]) == {"0": 0, "1": 1, "2": 2}
+
+    cache.set("new", "value")
+
+    assert cache.stats()["entries"] == 90
+    assert table_totals(path)[0] == 90
+    assert cache.get_many(["0", "1", "2", "new"]) == {"0": 0, "1": 1, "2": 2, "new": "value"}
+    assert cache.get("3") is None
+
+def test_disk_cache_evicts_by_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, max_bytes=1000)
+
+    for i in range(30):
+        cache.set(str(i), "x" * 98)
+
+    entries, size = table_totals(path)
+    assert size <= 1000
+    assert cache.stats()["bytes"] == size
+    assert cache.get("29") is not None
+
+def test_disk_cache_expires_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, ttl=0.05)
+    cache.set("old", 1)
+    time.sleep(0.1)
+
+    assert cache.get("old") is None
+    assert cache.get_many(["old"]) == {}
+    assert cache.stats()["entries"] == table_totals(path)[0] == 0
+
+def test_tiered_cache_async_reads_and_writes(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"))
+    cache = TieredCache(LRUCache(10), disk)
+
+    async def scenario():
+        await cache.set_many_async([("a", 1), ("b", 2)])
+        cache.memory.clear()
+        assert await cache.get_async("a") == 1
+        assert await cache.get_many_async(["a", "b", "c"]) == {"a": 1, "b": 2}
+        assert await cache.get_async("c", "default") == "default"
+
+    asyncio.run(scenario())
+    # Disk hits were promoted into memory
+    assert cache.memory.get("b") == 2
+    assert disk.get_many(["a", "b"]) == {"a": 1, "b": 2}
@@ -0,0 +1,132 @@
+import re
+import sys
+import time
+import pytest
+from figma_codegen import generate_react_component, write_node_tree, StyleTable, MAX_INDENT_DEPTH
+
+# Generous limits: these catch accidental quadratic behaviour, not small slowdowns
+SECONDS_PER_1K_NODES = 0.5
+MAX_BYTES_PER_NODE = 2 * (2 * MAX_INDENT_DEPTH + 60)
+
+def rectangle(number):
+    return {
+        "id": f"1:{number}",
+        "type": "RECTANGLE",
+        "name": f"Rectangle {number}",
+        "absoluteBoundingBox": {"x": 0, "y": 0, "width": 10 + number % 7, "height": 10},
+        "fills": [{"type": "SOLID", "color": {"r": 0.5, "g": 0.25, "b": 1, "a": 1}}],
+        "cornerRadius": 2
+    }
+
+def flat_tree(size):
+    """A root with size - 1 leaf children"""
+    return {"id": "0:1", "type": "FRAME", "name": "Root", "children": [rectangle(number) for number in range(size - 1)]}
+
+def wide_tree(size, fan_out=10):
+    """A balanced tree of size nodes, each with up to fan_out children"""
+    root = {"id": "0:1", "type": "FRAME", "name": "Root", "children": []}
+    level = [root]
+    count = 1
+    while count < size:
+        next_level = []
+        for parent in level:
+            for _ in range(min(fan_out, size - count)):
+                child = {"id": f"1:{count}", "type": "FRAME", "name": "Frame", "paddingLeft": count % 5, "children": []}
+                parent["children"].append(child)
+                next_level.append(child)
+                count += 1
+        level = next_level
+    return root
+
+def chain(depth):
+    """depth nested frames with a text node at the bottom"""
+    root = node = {"id": "0:1", "type": "FRAME", "name": "Deep", "children": []}
+    for number in range(depth - 1):
+        child = {"id": f"1:{number}", "type": "FRAME", "name": "Level", "paddingLeft": 4, "children": []}
+        node["children"].append(child)
+        node = child
+    node["children"].append({"id": "2:1", "type": "TEXT", "name": "Label", "characters": "bottom"})
+    return root
+
+def count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get("children", []))
+    return count
+
+def timed_generate(root):
+    start = time.perf_counter()
+    code = generate_react_component(root)
+    return code, time.perf_counter() - start
+
+@pytest.mark.parametrize("build", [flat_tree, wide_tree], ids=["flat", "wide"])
+@pytest.mark.parametrize("size", [1000, 10000])
+def test_large_tree_time_and_size(build, size):
+    root = build(size)
+    assert count_nodes(root) == size
+
+    code, elapsed = timed_generate(root)
+
+    assert elapsed < SECONDS_PER_1K_NODES * size / 1000
+    assert len(code) < MAX_BYTES_PER_NODE * size
+    # Every node is rendered
+    assert code.count("<div") == size
+
+def test_deep_chain_does_not_recurse():
+    depth = 5000
+    assert depth > sys.getrecursionlimit()
+
+    code, elapsed = timed_generate(chain(depth))
+
+    assert elapsed < SECONDS_PER_1K_NODES * depth / 1000
+    # The frames plus the text node at the bottom
+    assert code.count("<div") == depth + 1
+    assert "bottom" in code
+
+def test_deep_chain_indentation_is_capped():
+    code = generate_react_component(chain(5000))
+
+    deepest = max(len(line) - len(line.lstrip(" ")) for line in code.splitlines())
+    assert deepest == 2 * MAX_INDENT_DEPTH
+    assert len(code) < MAX_BYTES_PER_NODE * 5000
+
+def test_deep_chain_output_grows_linearly():
+    small = len(generate_react_component(chain(5000)))
+    large = len(generate_react_component(chain(10000)))
+
+    # Without the indent cap the larger chain would be about four times the size
+    assert large / small == pytest.approx(2, rel=0.05)
+
+def test_style_table_shares_identical_styles():
+    table = StyleTable()
+
+    first = table.name_for({"width": "10px", "height": "10px"})
+    second = table.name_for({"width": "10px", "height": "10px"})
+    other = table.name_for({"width": "20px", "height": "10px"})
+
+    assert first == second
+    assert other != first
+    assert len(table.entries) == 2
+
+def test_generated_component_declares_each_style_once():
+    # 1000 leaves cycling through 7 widths share 7 leaf styles
+    code = generate_react_component(flat_tree(1001))
+
+    declared = re.findall(r"^  (s\d+): \{$", code, re.MULTILINE)
+    assert len(declared) == len(set(declared)) == 7
+    assert code.count("style={styles.") == 1000
+
+def test_write_node_tree_uses_given_style_parser():
+    table = StyleTable()
+    out = []
+
+    class Writer:
+        write = out.append
+
+    write_node_tree(flat_tree(3), Writer(), table, style_parser=lambda node: {"color": "red"})
+
+    assert len(table.entries) == 1
+    assert "".join(out).count("style={styles.s0}") == 3
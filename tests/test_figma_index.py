@@ -0,0 +1,44 @@
+import asyncio
+import figma_tools
+from figma_index import NodeIndex, NodeResponse
+from figma_tools import get_node_index, split_batch_response, response_node_hash_async, node_content_hash
+
+def response():
+    return {"nodes": {"1:1": {"document": {"id": "1:1", "type": "FRAME", "children": [{"id": "1:2", "type": "TEXT"}]}}}}
+
+def test_response_keeps_its_index():
+    node_data = NodeResponse(response())
+
+    index = get_node_index(node_data)
+
+    assert get_node_index(node_data) is index
+    assert index.get("1:2") == {"id": "1:2", "type": "TEXT"}
+    assert index.parent("1:2")["id"] == "1:1"
+    assert node_data == response()
+
+def test_plain_responses_are_indexed_without_caching():
+    node_data = response()
+
+    assert isinstance(get_node_index(node_data), NodeIndex)
+    assert get_node_index(node_data) is not get_node_index(node_data)
+
+def test_split_batch_responses_carry_their_own_index():
+    combined = {"nodes": {"1:1": response()["nodes"]["1:1"], "2:1": {"document": {"id": "2:1"}}}}
+
+    responses = split_batch_response(combined, ["1-1", "2:1"])
+
+    assert all(isinstance(node_data, NodeResponse) for node_data in responses.values())
+    assert "1:2" in get_node_index(responses["1-1"])
+    assert "1:2" not in get_node_index(responses["2:1"])
+
+def test_response_hashes_each_node_once(monkeypatch):
+    node_data = NodeResponse(response())
+    node = node_data["nodes"]["1:1"]["document"]
+    calls = []
+    monkeypatch.setattr(figma_tools, "node_content_hash", lambda node: calls.append(node) or node_content_hash(node))
+
+    first = asyncio.run(response_node_hash_async(node_data, "1:1", node))
+    second = asyncio.run(response_node_hash_async(node_data, "1:1", node))
+
+    assert first == second == node_content_hash(node)
+    assert len(calls) == 1
@@ -0,0 +1,139 @@
+import time
+import asyncio
+import threading
+import pytest
+import figma_jobs
+from figma_jobs import JobStore, JobQueue, iter_in_thread, close_in_thread, RUNNING, SUCCEEDED, CANCELLED
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(figma_jobs, "_job_store", store)
+    return store
+
+def slow_nodes(started, release):
+    """Blocking generator whose second step waits for release"""
+    yield {"id": "1"}
+    started.set()
+    release.wait(5)
+    yield {"id": "2"}
+
+def test_close_waits_for_the_step_in_flight():
+    started, release = threading.Event(), threading.Event()
+    iterator = slow_nodes(started, release)
+    lock = threading.Lock()
+
+    async def consume():
+        async for _ in iter_in_thread(iterator, lock):
+            pass
+
+    async def main():
+        task = asyncio.create_task(consume())
+        await asyncio.to_thread(started.wait, 5)
+        # next() is still running on a worker thread
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        close_in_thread(iterator, lock)
+        release.set()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    with pytest.raises(StopIteration):
+        next(iterator)
+
+def test_store_writes_results_in_batches(store):
+    job = store.create("figma_export", {"file_key": "f"})
+
+    store.add_results(job["job_id"], 0, [{"n": 0}, {"n": 1}])
+    store.add_results(job["job_id"], 2, [{"n": 2}])
+
+    assert store.get(job["job_id"])["progress"]["done"] == 3
+    assert store.get_results(job["job_id"], 1) == [{"n": 1}, {"n": 2}]
+
+async def wait_for_status(store, job_id, status):
+    for _ in range(200):
+        if store.get(job_id)["status"] == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never reached {status}")
+
+def run_queue(store, monkeypatch, runner, scenario):
+    monkeypatch.setitem(figma_jobs.JOB_RUNNERS, "figma_export", runner)
+
+    async def main():
+        queue = JobQueue()
+        await queue.start()
+        try:
+            await scenario(queue)
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+def test_results_are_flushed_when_the_job_finishes(store, monkeypatch):
+    async def runner(job, report, set_total):
+        await set_total(120)
+        for i in range(120):
+            await report({"n": i})
+
+    async def scenario(queue):
+        job = await queue.submit("figma_export", {"file_key": "f"})
+        await wait_for_status(store, job["job_id"], SUCCEEDED)
+        assert [result["n"] for result in store.get_results(job["job_id"])] == list(range(120))
+
+    run_queue(store, monkeypatch, runner, scenario)
+
+def test_cancel_stops_a_running_job_and_keeps_its_results(store, monkeypatch):
+    async def runner(job, report, set_total):
+        await report({"n": 0})
+        await asyncio.sleep(30)
+
+    async def scenario(queue):
+        job = await queue.submit("figma_export", {"file_key": "f"})
+        await wait_for_status(store, job["job_id"], RUNNING)
+        await asyncio.sleep(0.05)
+
+        started = time.monotonic()
+        await queue.cancel(job["job_id"])
+        await wait_for_status(store, job["job_id"], CANCELLED)
+
+        assert time.monotonic() - started < 1
+        assert store.get_results(job["job_id"]) == [{"n": 0}]
+
+    run_queue(store, monkeypatch, runner, scenario)
+
+def test_shutdown_leaves_running_jobs_to_resume(store, monkeypatch):
+    async def runner(job, report, set_total):
+        await asyncio.sleep(30)
+
+    job_ids = []
+
+    async def scenario(queue):
+        job = await queue.submit("figma_export", {"file_key": "f"})
+        job_ids.append(job["job_id"])
+        await wait_for_status(store, job["job_id"], RUNNING)
+
+    run_queue(store, monkeypatch, runner, scenario)
+
+    assert store.get(job_ids[0])["status"] == RUNNING
+    assert store.pending() == job_ids
+
+def test_cancel_of_a_queued_job_is_not_overtaken_by_a_worker(store, monkeypatch):
+    ran = []
+
+    async def runner(job, report, set_total):
+        ran.append(job["job_id"])
+
+    async def scenario(queue):
+        # Stop the workers so the job stays queued, cancel it, then let them pick it up
+        await queue.stop()
+        job = await queue.submit("figma_export", {"file_key": "f"})
+        assert (await queue.cancel(job["job_id"]))["status"] == CANCELLED
+        queue._workers = [asyncio.create_task(queue._work())]
+        await asyncio.sleep(0.1)
+
+        assert store.get(job["job_id"])["status"] == CANCELLED
+        assert ran == []
+
+    run_queue(store, monkeypatch, runner, scenario)
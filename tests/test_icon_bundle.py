@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+import icon_bundle
+from icon_bundle import build_icon_bundle, missing_icons_header, MAX_MISSING_ICONS_HEADER
+
+@pytest.fixture
+def artwork(monkeypatch):
+    """Icon data served to the bundle builder, editable by the test"""
+    icons = {"mdi:home": {"body": "<path d='M1'/>", "width": 24, "height": 24}}
+
+    async def get_icons_svg_async(icon_names):
+        return {name: icons.get(name, {}) for name in icon_names}
+
+    monkeypatch.setattr(icon_bundle, "get_icons_svg_async", get_icons_svg_async)
+    monkeypatch.setattr(icon_bundle, "bundle_cache", icon_bundle.LRUCache(10))
+    return icons
+
+def test_etag_follows_the_content(artwork):
+    first = asyncio.run(build_icon_bundle(["mdi:home"], "svg"))
+
+    artwork["mdi:home"] = {"body": "<path d='M2'/>", "width": 24, "height": 24}
+    icon_bundle.bundle_cache.clear()
+    second = asyncio.run(build_icon_bundle(["mdi:home"], "svg"))
+
+    assert first["etag"] and second["etag"]
+    assert first["etag"] != second["etag"]
+    assert asyncio.run(build_icon_bundle(["mdi:home"], "js"))["etag"] not in (first["etag"], second["etag"])
+
+def test_bundles_with_missing_icons_have_no_etag(artwork):
+    bundle = asyncio.run(build_icon_bundle(["mdi:home", "mdi:missing"], "svg"))
+
+    assert bundle["etag"] is None
+    assert bundle["missing"] == ["mdi:missing"]
+
+def test_missing_icons_header_is_capped():
+    missing = [f"collection:missing-icon-{i}" for i in range(500)]
+
+    value = missing_icons_header(missing)
+
+    assert len(value) <= MAX_MISSING_ICONS_HEADER
+    names = value.split(",")
+    assert names == missing[:len(names)]
+    assert missing_icons_header(missing[:3]) == ",".join(missing[:3])
@@ -0,0 +1,156 @@
+import json
+import random
+import pytest
+from icon_index import IconIndex, tokenize, icon_style, FULL_NAME_WEIGHT, NAME_WEIGHT, PREFIX_WEIGHT, TAG_WEIGHT
+
+FILL = '<path fill="currentColor" d="M0 0h24v24H0z"/>'
+STROKE = '<path fill="none" stroke="currentColor" d="M4 4l16 16"/>'
+
+COLLECTIONS = [
+    {
+        "prefix": "mdi",
+        "info": {"name": "Material Design Icons"},
+        "width": 24,
+        "height": 24,
+        "icons": {
+            "home": {"body": FILL},
+            "home-outline": {"body": FILL},
+            "home-account": {"body": FILL},
+            "account": {"body": FILL},
+            "arrow-left": {"body": FILL},
+            "arrow-right": {"body": FILL},
+            "arrow-left-bold": {"body": FILL},
+            "secret-home": {"body": FILL, "hidden": True}
+        },
+        "aliases": {
+            "house": {"parent": "home"}
+        },
+        "categories": {
+            "Navigation": ["arrow-left", "arrow-right", "arrow-left-bold"],
+            "Places": ["home", "home-outline"]
+        }
+    },
+    {
+        "prefix": "lucide",
+        "info": {"name": "Lucide"},
+        "icons": {
+            "home": {"body": STROKE},
+            "arrow-left": {"body": STROKE},
+            "user": {"body": STROKE}
+        }
+    }
+]
+
+@pytest.fixture
+def index(tmp_path):
+    for data in COLLECTIONS:
+        (tmp_path / f"{data['prefix']}.json").write_text(json.dumps(data))
+    # Not a collection; skipped by load_directory
+    (tmp_path / "package.json").write_text(json.dumps({"name": "@iconify/json"}))
+
+    index = IconIndex()
+    index.load_directory(str(tmp_path))
+    return index
+
+def test_exact_match_ranks_first(index):
+    results = index.search("home")
+
+    assert results[:2] == ["mdi:home", "lucide:home"]
+    assert set(results) == {"mdi:home", "lucide:home", "mdi:home-outline", "mdi:home-account"}
+
+def test_prefix_match(index):
+    assert set(index.search("acc")) == {"mdi:account", "mdi:home-account"}
+    assert index.search("hou") == ["mdi:house"]
+    assert index.search("zzz") == []
+
+def test_multi_term_query_requires_every_term(index):
+    assert index.search("arrow left") == ["mdi:arrow-left", "lucide:arrow-left", "mdi:arrow-left-bold"]
+    assert index.search("home acc") == ["mdi:home-account"]
+    assert index.search("home zzz") == []
+
+def test_tags_and_collection_names_match(index):
+    assert set(index.search("navigation")) == {"mdi:arrow-left", "mdi:arrow-right", "mdi:arrow-left-bold"}
+    assert index.search("lucide user") == ["lucide:user"]
+
+def test_prefix_filter(index):
+    assert index.search("home", prefix="lucide") == ["lucide:home"]
+    assert index.search("arrow", prefix="mdi") == ["mdi:arrow-left", "mdi:arrow-right", "mdi:arrow-left-bold"]
+    assert index.search("user", prefix="mdi") == []
+
+def test_style_filter(index):
+    assert index.search("home", style="stroke") == ["lucide:home"]
+    assert "lucide:home" not in index.search("home", style="fill")
+
+def test_limit(index):
+    assert index.search("arrow", limit=2) == ["mdi:arrow-left", "mdi:arrow-right"]
+    assert index.search("arrow", limit=0) == []
+
+def test_hidden_icons_are_not_returned_but_resolve(index):
+    assert "mdi:secret-home" not in index.search("secret home")
+    assert index.get_icon("mdi:secret-home")["body"] == FILL
+
+def test_alias_resolves_to_parent(index):
+    assert index.get_icon("mdi:house") == {"body": FILL, "width": 24, "height": 24}
+    assert index.get_icon("mdi:missing") is None
+
+def brute_force_search(index, query, limit, prefix=None):
+    """Reference ranking: score every icon against every term, then sort everything"""
+    terms = tokenize(query)
+    ranked = []
+    for full_name in index._names:
+        icon_id = index._ids[full_name]
+        if icon_id in index._hidden or (prefix and not full_name.startswith(f"{prefix}:")):
+            continue
+        total = 0
+        for term in terms:
+            best = 0
+            for token, postings in index._postings.items():
+                if token.startswith(term) and icon_id in postings:
+                    best = max(best, postings[icon_id] * (2 if token == term else 1))
+            if not best:
+                break
+            total += best
+        else:
+            ranked.append((-total, len(full_name), full_name))
+    return [full_name for _, _, full_name in sorted(ranked)[:limit]]
+
+def random_collection(rng, prefix, size):
+    words = ["arrow", "home", "user", "file", "folder", "chart", "bell", "cog", "lock", "star", "alpha", "al"]
+    icons = {}
+    for i in range(size):
+        name = "-".join(rng.sample(words, rng.randint(1, 3)) + [f"v{i}"])
+        icons[name] = {"body": FILL, "hidden": rng.random() < 0.05}
+    return {"prefix": prefix, "info": {"name": f"{prefix} icons"}, "icons": icons}
+
+def test_search_matches_brute_force_ranking():
+    rng = random.Random(7)
+    index = IconIndex()
+    for prefix in ["aa", "bb", "cc"]:
+        index.add_collection(random_collection(rng, prefix, 400))
+
+    queries = ["arrow", "a", "al", "ar ho", "user v1", "v", "v1", "folder chart lock", "cc star", "nothing"]
+    for query in queries:
+        for limit in [1, 5, 50]:
+            assert index.search(query, limit=limit) == brute_force_search(index, query, limit), query
+            assert index.search(query, limit=limit, prefix="bb") == brute_force_search(index, query, limit, "bb"), query
+
+def test_prefix_expansion_is_not_capped():
+    # Each icon gets its own "v<n>" token, so "v" expands to 2000 tokens
+    index = IconIndex()
+    index.add_collection({"prefix": "x", "icons": {f"v{i}": {"body": FILL} for i in range(2000)}})
+
+    assert len(index.search("v", limit=5000)) == 2000
+
+def test_field_weights():
+    index = IconIndex()
+    index.add_collection({
+        "prefix": "p",
+        "info": {"name": "Tagged"},
+        "icons": {"tagged": {"body": FILL}, "other": {"body": FILL}},
+        "categories": {"Tagged": ["other"]}
+    })
+
+    # "tagged" is the whole name of one icon and only the collection/tag of the other
+    assert index.search("tagged") == ["p:tagged", "p:other"]
+    assert FULL_NAME_WEIGHT > NAME_WEIGHT > PREFIX_WEIGHT > TAG_WEIGHT
+    assert icon_style(STROKE) == "stroke" and icon_style(FILL) == "fill"
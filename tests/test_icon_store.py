@@ -0,0 +1,103 @@
+import json
+import random
+import pytest
+from icon_index import IconIndex
+from icon_store import IconStore, build_store, main, STORE_MAGIC_V1
+from test_icon_index import COLLECTIONS, FILL, random_collection
+
+QUERIES = ["home", "acc", "hou", "arrow left", "home acc", "navigation", "lucide user", "secret home", "zzz"]
+
+def write_collections(directory, collections):
+    directory.mkdir(exist_ok=True)
+    for data in collections:
+        (directory / f"{data['prefix']}.json").write_text(json.dumps(data))
+    return str(directory)
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return write_collections(tmp_path / "json", COLLECTIONS)
+
+@pytest.fixture
+def store(tmp_path, data_dir):
+    path = str(tmp_path / "icons.store")
+    build_store(data_dir, path)
+    store = IconStore(path)
+    yield store
+    store.close()
+
+def memory_index(data_dir):
+    index = IconIndex()
+    index.load_directory(data_dir)
+    return index
+
+def test_store_search_matches_memory_index(store, data_dir):
+    index = memory_index(data_dir)
+
+    assert store.searchable
+    for query in QUERIES:
+        for prefix in [None, "mdi", "lucide"]:
+            for style in [None, "fill", "stroke"]:
+                assert store.search(query, style, 20, prefix) == index.search(query, style, 20, prefix), (query, prefix, style)
+
+def test_store_search_matches_memory_index_on_random_collections(tmp_path):
+    rng = random.Random(11)
+    collections = [random_collection(rng, prefix, 300) for prefix in ["aa", "bb", "cc"]]
+    data_dir = write_collections(tmp_path / "json", collections)
+    build_store(data_dir, str(tmp_path / "icons.store"))
+    store = IconStore(str(tmp_path / "icons.store"))
+    index = memory_index(data_dir)
+
+    for query in ["arrow", "a", "al", "ar ho", "user v1", "v", "folder chart lock", "cc star"]:
+        for limit in [1, 5, 50]:
+            assert store.search(query, limit=limit) == index.search(query, limit=limit), query
+            assert store.search(query, limit=limit, prefix="bb") == index.search(query, limit=limit, prefix="bb"), query
+    store.close()
+
+def test_index_searches_store_in_place(store, data_dir):
+    index = IconIndex()
+
+    assert index.add_store(store) == len(store)
+    # Nothing was copied into the in-memory postings
+    assert index._postings == {}
+    assert len(index) == len(store)
+
+    expected = memory_index(data_dir)
+    for query in QUERIES:
+        assert index.search(query) == expected.search(query), query
+        assert index.search(query, prefix="mdi", limit=2) == expected.search(query, prefix="mdi", limit=2), query
+    assert index.get_icon("mdi:house") == {"body": FILL, "width": 24, "height": 24}
+
+def test_index_merges_store_and_collections_without_duplicates(store, data_dir):
+    index = memory_index(data_dir)
+    index.add_store(store)
+    expected = memory_index(data_dir)
+
+    for query in QUERIES:
+        for limit in [1, 2, 20]:
+            assert index.search(query, limit=limit) == expected.search(query, limit=limit), query
+
+def test_store_without_search_index_is_indexed_in_memory(tmp_path, data_dir):
+    path = tmp_path / "old.store"
+    build_store(data_dir, str(path))
+    # Stores written before the search index differ only by their magic
+    raw = bytearray(path.read_bytes())
+    raw[:8] = STORE_MAGIC_V1
+    path.write_bytes(bytes(raw))
+
+    store = IconStore(str(path))
+    index = IconIndex()
+    index.add_store(store)
+
+    assert not store.searchable
+    assert store.search("home") == []
+    assert index.search("home") == memory_index(data_dir).search("home")
+    assert store.get("mdi:home")["body"] == FILL
+    store.close()
+
+def test_hidden_icons_are_stored_but_not_searchable(store):
+    assert store.get("mdi:secret-home")["body"] == FILL
+    assert "mdi:secret-home" not in store.search("secret")
+
+def test_search_command(store, capsys):
+    assert main(["search", store.path, "arrow left", "--limit", "2"]) == 0
+    assert capsys.readouterr().out.split() == ["mdi:arrow-left", "lucide:arrow-left"]
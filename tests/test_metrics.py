@@ -0,0 +1,30 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from metrics import Histogram, RequestMetricsMiddleware
+import metrics
+
+def test_streaming_requests_are_timed_until_the_last_chunk(monkeypatch):
+    histogram = Histogram("test_request_seconds", "Test", ["method", "route", "status"])
+    monkeypatch.setattr(metrics, "request_seconds", histogram)
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/stream/{name}")
+    async def stream(name: str):
+        async def chunks():
+            for _ in range(3):
+                await asyncio.sleep(0.05)
+                yield b"x"
+        return StreamingResponse(chunks())
+
+    client = TestClient(app)
+    assert client.get("/stream/a").text == "xxx"
+    assert client.get("/missing").status_code == 404
+
+    lines = histogram.render()
+    assert 'test_request_seconds_count{method="GET",route="/stream/{name}",status="200"} 1' in lines
+    assert 'test_request_seconds_count{method="GET",route="unmatched",status="404"} 1' in lines
+    total = next(line for line in lines if line.startswith('test_request_seconds_sum{method="GET",route="/stream/{name}"'))
+    assert float(total.split()[-1]) >= 0.15
@@ -0,0 +1,187 @@
+import math
+import random
+import pytest
+from figma_codegen import parse_node_styles, parse_node_styles_bulk
+
+def solid(r, g, b, a=1, **extra):
+    return {"type": "SOLID", "color": {"r": r, "g": g, "b": b, "a": a}, **extra}
+
+FIXTURE_NODES = [
+    {},
+    {"id": "1:1", "type": "FRAME", "name": "Empty frame"},
+    {
+        "id": "1:2",
+        "type": "FRAME",
+        "name": "Card",
+        "absoluteBoundingBox": {"x": 0, "y": 0, "width": 320, "height": 200},
+        "fills": [solid(1, 1, 1)],
+        "strokes": [solid(0.85, 0.85, 0.85)],
+        "strokeWeight": 1,
+        "cornerRadius": 8,
+        "paddingLeft": 16,
+        "paddingRight": 16,
+        "paddingTop": 12,
+        "paddingBottom": 12,
+        "opacity": 0.95,
+        "effects": [{"type": "DROP_SHADOW", "color": {"r": 0, "g": 0, "b": 0, "a": 0.25}, "offset": {"x": 0, "y": 4}, "radius": 12}]
+    },
+    {
+        "id": "1:3",
+        "type": "TEXT",
+        "name": "Label",
+        "characters": "Hello",
+        "absoluteBoundingBox": {"x": 0, "y": 0, "width": 41.5, "height": 19.0},
+        "fills": [solid(0.2, 0.2, 0.2, 1.0)]
+    },
+    {
+        "id": "1:4",
+        "type": "RECTANGLE",
+        "name": "Hidden layers",
+        "fills": [solid(1, 0, 0, visible=False), {"type": "GRADIENT_LINEAR"}, solid(0, 1, 0)],
+        "strokes": [solid(0, 0, 1, visible=False)],
+        "effects": [
+            {"type": "DROP_SHADOW", "visible": False, "color": {"r": 1, "g": 0, "b": 0, "a": 1}},
+            {"type": "INNER_SHADOW", "color": {"r": 0, "g": 1, "b": 0, "a": 1}},
+            {"type": "DROP_SHADOW", "color": {"r": 0, "g": 0, "b": 1, "a": 0.5}, "radius": 3}
+        ]
+    },
+    {
+        "id": "1:5",
+        "type": "RECTANGLE",
+        "name": "Missing keys",
+        "absoluteBoundingBox": {},
+        "fills": [{"type": "SOLID"}],
+        "strokes": [{"type": "SOLID", "color": {}}],
+        "effects": [{"type": "DROP_SHADOW"}]
+    },
+    {"id": "1:6", "type": "RECTANGLE", "name": "Empty lists", "fills": [], "strokes": [], "effects": []},
+    {"id": "1:7", "type": "RECTANGLE", "name": "Only invisible", "fills": [solid(1, 1, 1, visible=False)], "strokes": [solid(0, 0, 0, visible=False)]}
+]
+
+def outcome(parse):
+    """The styles produced, or the type of the exception raised"""
+    try:
+        return parse()
+    except Exception as e:
+        return type(e)
+
+def assert_equivalent(nodes):
+    for node in nodes:
+        expected = outcome(lambda: parse_node_styles(node))
+        actual = outcome(lambda: parse_node_styles_bulk([node])[0])
+        assert actual == expected, node
+
+    # Shared memo tables across a batch must not change any node's output
+    expected = [outcome(lambda: parse_node_styles(node)) for node in nodes]
+    if not any(isinstance(result, type) for result in expected):
+        assert parse_node_styles_bulk(nodes) == expected
+
+def test_fixture_nodes():
+    assert_equivalent(FIXTURE_NODES)
+
+def test_fixture_nodes_as_one_batch():
+    assert parse_node_styles_bulk(FIXTURE_NODES) == [parse_node_styles(node) for node in FIXTURE_NODES]
+
+@pytest.mark.parametrize("alphas", [
+    (1, 1.0, True),
+    (0, 0.0, -0.0, False),
+    (0.5, 0.50, 1 / 2)
+])
+def test_alpha_values_that_compare_equal_keep_their_own_formatting(alphas):
+    nodes = [{"fills": [solid(0.5, 0.5, 0.5, alpha)]} for alpha in alphas]
+
+    results = parse_node_styles_bulk(nodes)
+
+    assert results == [parse_node_styles(node) for node in nodes]
+    assert [result["backgroundColor"] for result in results] == [f"rgba(127, 127, 127, {alpha})" for alpha in alphas]
+
+@pytest.mark.parametrize("values", [
+    (10, 10.0, True),
+    (0, 0.0, -0.0, False, None, "")
+])
+def test_pixel_values_that_compare_equal_keep_their_own_formatting(values):
+    nodes = [{"cornerRadius": value, "paddingLeft": value, "absoluteBoundingBox": {"width": value}} for value in values]
+
+    assert parse_node_styles_bulk(nodes) == [parse_node_styles(node) for node in nodes]
+
+def test_nan_values():
+    nan = float("nan")
+    nodes = [
+        {"cornerRadius": nan, "paddingTop": float("nan"), "opacity": nan},
+        {"absoluteBoundingBox": {"width": nan, "height": math.inf}},
+        {"fills": [solid(0, 0, 0, nan)]},
+        {"effects": [{"type": "DROP_SHADOW", "color": {"a": nan}, "offset": {"x": nan}}]}
+    ]
+
+    assert_equivalent(nodes)
+
+def test_nan_color_channels_fail_the_same_way():
+    assert_equivalent([{"fills": [solid(float("nan"), 0, 0)]}, {"strokes": [solid(0, float("nan"), 0)]}])
+
+def test_unhashable_values():
+    nodes = [
+        {"cornerRadius": [4, 4, 0, 0]},
+        {"paddingLeft": {"value": 4}},
+        {"absoluteBoundingBox": {"width": [1], "height": {"h": 2}}},
+        {"fills": [solid(0, 0, 0, [1])]},
+        {"strokes": [solid(1, 1, 1, {"alpha": 1})], "strokeWeight": [2]},
+        {"effects": [{"type": "DROP_SHADOW", "color": {"a": [0.5]}, "offset": {"x": [1], "y": {}}}]}
+    ]
+
+    assert_equivalent(nodes)
+
+NUMBERS = [0, 1, -1, 2, 0.0, -0.0, 1.0, 0.5, 0.25, 1 / 3, 12.75, 255, True, False]
+
+def random_number(rng):
+    return rng.choice(NUMBERS) if rng.random() < 0.7 else round(rng.uniform(-2, 400), rng.randrange(4))
+
+def random_color(rng):
+    color = {}
+    for channel in "rgba":
+        if rng.random() < 0.9:
+            color[channel] = rng.choice([0, 1, 0.0, 1.0, -0.0, True, False, 0.5]) if rng.random() < 0.5 else rng.random()
+    return color
+
+def random_paint(rng, types):
+    paint = {"type": rng.choice(types)}
+    if rng.random() < 0.9:
+        paint["color"] = random_color(rng)
+    if rng.random() < 0.3:
+        paint["visible"] = rng.random() < 0.5
+    return paint
+
+def random_node(rng):
+    node = {"id": f"{rng.randrange(100)}:{rng.randrange(100)}", "type": rng.choice(["FRAME", "RECTANGLE", "TEXT"])}
+    if rng.random() < 0.7:
+        node["absoluteBoundingBox"] = {key: random_number(rng) for key in ("width", "height") if rng.random() < 0.9}
+    if rng.random() < 0.6:
+        node["fills"] = [random_paint(rng, ["SOLID", "SOLID", "IMAGE"]) for _ in range(rng.randrange(4))]
+    if rng.random() < 0.4:
+        node["strokes"] = [random_paint(rng, ["SOLID", "GRADIENT_LINEAR"]) for _ in range(rng.randrange(3))]
+    if rng.random() < 0.3:
+        node["strokeWeight"] = random_number(rng)
+    if rng.random() < 0.4:
+        node["cornerRadius"] = random_number(rng)
+    for key in ("paddingLeft", "paddingRight", "paddingTop", "paddingBottom"):
+        if rng.random() < 0.3:
+            node[key] = random_number(rng)
+    if rng.random() < 0.3:
+        node["opacity"] = random_number(rng)
+    if rng.random() < 0.4:
+        effects = []
+        for _ in range(rng.randrange(3)):
+            effect = random_paint(rng, ["DROP_SHADOW", "INNER_SHADOW", "LAYER_BLUR"])
+            if rng.random() < 0.8:
+                effect["offset"] = {key: random_number(rng) for key in ("x", "y") if rng.random() < 0.9}
+            if rng.random() < 0.8:
+                effect["radius"] = random_number(rng)
+            effects.append(effect)
+        node["effects"] = effects
+    return node
+
+@pytest.mark.parametrize("seed", range(20))
+def test_randomized_nodes(seed):
+    rng = random.Random(seed)
+    nodes = [random_node(rng) for _ in range(250)]
+
+    assert_equivalent(nodes)